@@ -0,0 +1,351 @@
+"""
+Per-stream analysis shared by every runtime mode.
+
+FrameAnalyzer owns the detection scheduler, the skipped-frame propagator and
+the behavior detectors for one stream, and exposes the two per-frame steps:
+infer() (detect / coast / propagate) and analyze() (behavior + scoring).
+
+AnalysisPipeline runs them as a staged pipeline
+    capture → preprocess → inference → behavior
+with one worker thread and a bounded queue per stage, so decode, resize,
+the forward pass and behavior analysis of consecutive frames overlap. With an
+InferenceProcessPool backend the forward pass is split into dispatch (submit
+to the worker processes) and inference (collect in order + track), so several
+frames are inferred in parallel.
+"""
+import queue
+import time
+
+import cv2
+
+import config
+from utils.capture import LatestFrameGrabber
+from utils.clock import VideoClock
+from utils.pipeline import END, Pipeline
+from detection.detections import Detections
+from detection.scheduler import DetectionScheduler
+from detection.propagation import TrackPropagator
+from behavior.loitering import LoiteringDetector
+from behavior.conflict_detection import ConflictDetector
+from behavior.scoring import ThreatScorer
+from behavior.abandoned_object import AbandonedObjectDetector
+
+
+class FrameAnalyzer:
+    def __init__(self, detector, stream_id=0, cfg=None):
+        self.detector = detector
+        self.stream_id = stream_id
+        # A new analyzer is a new stream: never inherit tracks from a previous video.
+        # detector=None: replaying cached detections only (apply_tracked + analyze)
+        if detector is not None:
+            detector.reset_stream(stream_id)
+        self.scheduler = DetectionScheduler()
+        self.cfg = cfg if cfg is not None else config
+        self.propagator = TrackPropagator(cfg=cfg)
+        # Behavior timers run on the analyzed footage's time, set per frame in analyze()
+        self.clock = VideoClock()
+        # Behavior settings: the config module unless overridden (threshold sweeps)
+        self.loiter_detector = LoiteringDetector(clock=self.clock, cfg=cfg)
+        self.abandon_detector = AbandonedObjectDetector(clock=self.clock, cfg=cfg)
+        self.conflict_detector = ConflictDetector(clock=self.clock, cfg=cfg)
+        self.scorer = ThreatScorer(cfg=cfg)
+        self.last_tracked_objects = Detections.empty()
+        self.recorder = None   # DetectionRecorder filling the detection cache, if any
+
+    def reset_tracking(self, scheduler=True):
+        """Drop tracker/scheduler state (e.g. after a seek jump)."""
+        self.last_tracked_objects = Detections.empty()
+        if self.detector is not None:
+            self.detector.reset_stream(self.stream_id)
+        if scheduler:
+            self.scheduler.reset()
+        self.propagator.reset()
+
+    def reset_behavior(self):
+        """Clear time/history-dependent detector state after a seek jump."""
+        self.loiter_detector.person_state.clear()
+        self.abandon_detector.reset()
+        self.conflict_detector.reset()
+        self.scorer.instant_scores.clear()
+
+    def infer(self, frame, video_timestamp):
+        """
+        Run detection when the DetectionScheduler asks for it; skipped frames
+        get tracks extrapolated by the TrackPropagator (or the last result when
+        propagation is off).
+        """
+        detections = None
+        if self.scheduler.should_detect(frame, video_timestamp):
+            detections = self.detector.predict(frame)
+        return self.update_tracks(detections, video_timestamp)
+
+    def update_tracks(self, detections, video_timestamp):
+        """
+        Track one frame's raw FrameDetections, or coast/propagate when
+        `detections` is None (frame skipped by the scheduler).
+        """
+        if detections is None:
+            self.detector.coast(self.stream_id)
+            return self.apply_tracked(None, video_timestamp)
+        return self.apply_tracked(self.detector.parse_tracked_objects(
+            self.detector.track(self.stream_id, detections)), video_timestamp)
+
+    def apply_tracked(self, tracked_objects, video_timestamp):
+        """
+        Feed one frame's tracked objects to the scheduler and propagator
+        (None = skipped frame → propagated tracks). Also the entry point for
+        replaying cached detections without a model.
+        """
+        if self.recorder is not None:
+            self.recorder.record(video_timestamp, tracked_objects)
+
+        if tracked_objects is not None:
+            self.scheduler.observe(tracked_objects, video_timestamp)
+            self.propagator.observe(tracked_objects, video_timestamp)
+            self.last_tracked_objects = tracked_objects
+            return tracked_objects
+
+        if self.cfg.PROPAGATE_SKIPPED_FRAMES:
+            return self.propagator.predict(video_timestamp)
+        return self.last_tracked_objects
+
+    def analyze(self, tracked_objects, video_timestamp):
+        """
+        Run every behavior detector + scorer on one frame's tracked objects.
+        `video_timestamp` drives every behavior timer (capture time for live feeds).
+        """
+        self.clock.set(video_timestamp)
+        suspicious_ids = self.loiter_detector.update(tracked_objects)
+        suspicious_bags = self.abandon_detector.update(tracked_objects)
+        conflict_alert, pair_scores = self.conflict_detector.update(tracked_objects, video_timestamp)
+        instant_scores, session_scores = self.scorer.update(
+            tracked_objects, suspicious_ids, suspicious_bags, conflict_alert, pair_scores
+        )
+        return {
+            "tracked_objects": tracked_objects,
+            "suspicious_ids":  suspicious_ids,
+            "suspicious_bags": suspicious_bags,
+            "conflict_alert":  conflict_alert,
+            "pair_scores":     dict(pair_scores),
+            # Per-frame snapshots so consumers on other threads do not iterate
+            # over dicts that are being mutated by the analysis thread.
+            "instant_scores":  dict(instant_scores),
+            "session_scores":  dict(session_scores),
+        }
+
+
+def _apply_seek_commands(cap, control_queue):
+    """Apply queued seek commands to `cap`. Returns True if the position changed."""
+    seeked = False
+    while True:
+        try:
+            command = control_queue.get_nowait()
+        except queue.Empty:
+            return seeked
+
+        if command.get("type") != "seek":
+            continue
+
+        seek_seconds = float(command.get("seconds", 0.0))
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps <= 0:
+            fps = 30.0
+
+        current_frame = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        target_frame = current_frame + int(seek_seconds * fps)
+
+        if total_frames > 0:
+            target_frame = max(0, min(target_frame, total_frames - 1))
+        else:
+            target_frame = max(0, target_frame)
+
+        cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
+        seeked = True
+
+
+class AnalysisPipeline:
+    """
+    Staged capture → preprocess → inference → behavior pipeline for one stream.
+
+    Every packet carries the seek "generation" it was captured in. A seek bumps
+    the generation; each stage drops packets from older generations (flushing
+    whatever was in flight) and resets its own state on the first packet of a
+    new one, so no stage depends on a particular packet surviving the queues.
+    """
+
+    def __init__(self, cap, analyzer, control_queue=None, live=False, stop_event=None,
+                 drop_policies=None):
+        self.cap = cap
+        self.analyzer = analyzer
+        self.control_queue = control_queue if control_queue is not None else queue.Queue()
+        self.live = live
+        self.generation = 0
+        self._seen = {"dispatch": 0, "inference": 0, "behavior": 0}
+        # Asynchronous backend (InferenceProcessPool): keep frames in flight
+        self.async_inference = hasattr(analyzer.detector.backend, "submit")
+        # Live camera: drain the device on its own thread, always process the newest frame
+        self.grabber = LatestFrameGrabber(cap) if live and config.LIVE_GRAB_LATEST_FRAME else None
+        self._latency_total = 0.0   # capture → tracked objects, summed over frames
+        self._latency_frames = 0
+
+        policies = dict(config.PIPELINE_DROP_POLICIES)
+        if drop_policies:
+            policies.update(drop_policies)
+        if live:
+            # Never fall behind a live camera: newest frame wins
+            policies["capture"] = "drop_oldest"
+
+        size = config.PIPELINE_QUEUE_SIZE
+        self.pipeline = Pipeline(stop_event)
+        self.pipeline.add_stage("capture", self._capture, size, policies["capture"])
+        self.pipeline.add_stage("preprocess", self._preprocess, size, policies["preprocess"])
+        if self.async_inference:
+            # Never drop here: every submitted ticket must be collected to free its slot
+            self.pipeline.add_stage("dispatch", self._dispatch, size, "block")
+        self.pipeline.add_stage("inference", self._inference, size, policies["inference"])
+        self.pipeline.add_stage("behavior", self._behavior,
+                                config.PIPELINE_RESULT_QUEUE_SIZE, policies["behavior"])
+
+    # ── Stages ──────────────────────────────────────────────────────────────
+
+    def _capture(self):
+        if self.grabber is not None:
+            return self._grab_latest()
+
+        if _apply_seek_commands(self.cap, self.control_queue):
+            self.generation += 1
+
+        frame_index = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+        ret, frame = self.cap.read()
+        if not ret:
+            return END
+
+        return {
+            "frame": frame,
+            "frame_index": frame_index,
+            # Video timestamp — used for accurate velocity dt regardless of
+            # how fast/slow we process frames
+            "video_timestamp": self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0,
+            "capture_time": time.monotonic(),
+            "generation": self.generation,
+        }
+
+    def _grab_latest(self):
+        # No seeking on a live device
+        ok, frame, video_timestamp, capture_time = self.grabber.read()
+        if not ok:
+            return END
+        if frame is None:
+            return None   # no new frame yet
+        return {
+            "frame": frame,
+            "frame_index": None,   # camera frames have no stable index
+            "video_timestamp": video_timestamp,
+            "capture_time": capture_time,
+            "generation": self.generation,
+        }
+
+    def _preprocess(self, packet):
+        if self.is_stale(packet):
+            return None
+        packet["frame"] = cv2.resize(packet["frame"], (config.FRAME_WIDTH, config.FRAME_HEIGHT))
+        return packet
+
+    def _new_generation(self, stage, packet):
+        if packet["generation"] != self._seen[stage]:
+            self._seen[stage] = packet["generation"]
+            return True
+        return False
+
+    def _dispatch(self, packet):
+        if self.is_stale(packet):
+            return None
+        if self._new_generation("dispatch", packet):
+            self.analyzer.scheduler.reset()
+        packet["ticket"] = None
+        if self.analyzer.scheduler.should_detect(packet["frame"], packet["video_timestamp"]):
+            packet["ticket"] = self.analyzer.detector.submit(packet["frame"])
+        return packet
+
+    def _inference(self, packet):
+        if self.async_inference:
+            return self._collect(packet)
+        if self.is_stale(packet):
+            return None
+        if self._new_generation("inference", packet):
+            self.analyzer.reset_tracking()
+        packet["tracked_objects"] = self.analyzer.infer(packet["frame"], packet["video_timestamp"])
+        self._record_latency(packet)
+        return packet
+
+    def _collect(self, packet):
+        # Packets arrive in capture order, so results are re-sequenced here
+        # whatever order the workers finish in
+        backend = self.analyzer.detector.backend
+        ticket = packet.pop("ticket")
+        if self.is_stale(packet):
+            if ticket is not None:
+                backend.discard(ticket)
+            return None
+        if self._new_generation("inference", packet):
+            self.analyzer.reset_tracking(scheduler=False)
+        detections = backend.result(ticket) if ticket is not None else None
+        packet["tracked_objects"] = self.analyzer.update_tracks(detections, packet["video_timestamp"])
+        self._record_latency(packet)
+        return packet
+
+    def _record_latency(self, packet):
+        self._latency_total += time.monotonic() - packet["capture_time"]
+        self._latency_frames += 1
+
+    def _behavior(self, packet):
+        if self.is_stale(packet):
+            return None
+        seek_applied = self._new_generation("behavior", packet)
+        if seek_applied:
+            self.analyzer.reset_behavior()
+
+        # Live feeds: behavior timers follow the capture clock (camera POS_MSEC is unreliable)
+        clock_time = packet["capture_time"] if self.live else packet["video_timestamp"]
+        result = self.analyzer.analyze(packet["tracked_objects"], clock_time)
+        result["frame"] = packet["frame"]
+        result["frame_index"] = packet["frame_index"]
+        result["video_timestamp"] = packet["video_timestamp"]
+        result["capture_time"] = packet["capture_time"]
+        result["clock_time"] = clock_time
+        result["generation"] = packet["generation"]
+        result["seek_applied"] = seek_applied
+        return result
+
+    # ── Control ─────────────────────────────────────────────────────────────
+
+    def is_stale(self, packet):
+        return packet["generation"] != self.generation
+
+    @property
+    def output(self):
+        return self.pipeline.output
+
+    @property
+    def stop_event(self):
+        return self.pipeline.stop_event
+
+    def start(self):
+        if self.grabber is not None:
+            self.grabber.start()
+        self.pipeline.start()
+
+    def stop(self, timeout=2):
+        self.pipeline.stop(timeout)
+        if self.grabber is not None:
+            self.grabber.stop(timeout)
+
+    def summary(self):
+        lines = [self.pipeline.summary()]
+        if self._latency_frames:
+            avg_ms = 1000.0 * self._latency_total / self._latency_frames
+            lines.append(f"Capture → detection latency: {avg_ms:.1f} ms avg")
+        if self.grabber is not None:
+            lines.append(self.grabber.summary())
+        return "\n".join(lines)
@@ -1,72 +1,75 @@
-import time
+import numpy as np
+
 import config
-from utils.geometry import get_center, distance
+from detection.detections import Detections
+from utils.clock import SystemClock
+from utils.geometry import PointGrid
 
 
 class AbandonedObjectDetector:
-    def __init__(self):
-        self.bag_state = {}
+    def __init__(self, clock=None, cfg=None):
+        self.clock = clock if clock is not None else SystemClock()
+        self.cfg = cfg if cfg is not None else config
+        self.reset()
+
+    def reset(self):
+        """Forget every bag (e.g. after a seek jump)."""
+        # Bag state as parallel arrays, rows sorted by bag ID
+        self.bag_ids = np.empty(0, dtype=int)
+        self.last_seen = np.empty(0)
+        self.last_near_time = np.empty(0)
+        self.abandoned = np.empty(0, dtype=bool)
+
+    def _rows(self, bag_ids, current_time):
+        """State rows of this frame's bags; unseen bags get a fresh row."""
+        new_ids = np.setdiff1d(bag_ids, self.bag_ids)
+        if len(new_ids):
+            ids = np.concatenate([self.bag_ids, new_ids])
+            order = np.argsort(ids, kind="stable")
+            self.bag_ids = ids[order]
+            self.last_seen = np.concatenate([self.last_seen, np.full(len(new_ids), current_time)])[order]
+            self.last_near_time = np.concatenate(
+                [self.last_near_time, np.full(len(new_ids), current_time)])[order]
+            self.abandoned = np.concatenate([self.abandoned, np.zeros(len(new_ids), dtype=bool)])[order]
+        return np.searchsorted(self.bag_ids, bag_ids)
 
     def update(self, tracked_objects):
-        current_time = time.time()
-        suspicious_bags = []
-
-        persons = []
-        bags = []
-
-        for obj in tracked_objects:
-            if obj["class"] == config.PERSON:
-                persons.append(obj)
-            elif obj["class"] in [config.BACKPACK, config.HANDBAG]:
-                bags.append(obj)
-
-        active_bag_ids = []
-
-        for bag in bags:
-            bag_id = bag["id"]
-            active_bag_ids.append(bag_id)
-
-            bag_center = get_center(bag["bbox"])
-            nearest_person_dist = float("inf")
-
-            for person in persons:
-                person_center = get_center(person["bbox"])
-                dist = distance(bag_center, person_center)
-                if dist < nearest_person_dist:
-                    nearest_person_dist = dist
-
-            if bag_id not in self.bag_state:
-                self.bag_state[bag_id] = {
-                    "last_seen": current_time,
-                    "last_near_time": current_time,
-                    "abandoned": False
-                }
-
-            state = self.bag_state[bag_id]
-            state["last_seen"] = current_time
-
-            # If someone is near bag
-            if nearest_person_dist < config.ABANDON_DISTANCE:
-                state["last_near_time"] = current_time
-                state["abandoned"] = False
-
-            else:
-                time_away = current_time - state["last_near_time"]
-
-                if time_away > config.ABANDON_TIME:
-                    state["abandoned"] = True
-
-            if state["abandoned"]:
-                suspicious_bags.append(bag_id)
-
-        # Grace period for flicker (IMPORTANT)
-        GRACE_PERIOD = 0.7  # seconds
-
-        for saved_id in list(self.bag_state.keys()):
-            state = self.bag_state[saved_id]
-
-            # If bag not seen recently
-            if current_time - state["last_seen"] > GRACE_PERIOD:
-                del self.bag_state[saved_id]
-
-        return suspicious_bags
\ No newline at end of file
+        """
+        One frame: a Detections container (read column-wise), or any iterable
+        of object dicts like the other detectors take. Returns abandoned bag IDs.
+        """
+        if not isinstance(tracked_objects, Detections):
+            tracked_objects = Detections.from_dicts(tracked_objects)
+        current_time = self.clock.now()
+
+        cls = tracked_objects.cls
+        is_bag = np.isin(cls, (self.cfg.BACKPACK, self.cfg.HANDBAG))
+        bag_ids = tracked_objects.ids[is_bag]
+        rows = self._rows(bag_ids, current_time)
+
+        # Nearest person to every bag, via a grid over this frame's person centers
+        grid = PointGrid(tracked_objects.centers[cls == self.cfg.PERSON], self.cfg.ABANDON_DISTANCE)
+        near = grid.nearest_distance(tracked_objects.centers[is_bag]) < self.cfg.ABANDON_DISTANCE
+
+        self.last_seen[rows] = current_time
+
+        # Nobody near the bag: abandoned once it has been alone long enough
+        far = rows[~near]
+        time_away = current_time - self.last_near_time[far]
+        self.abandoned[far] |= time_away > self.cfg.ABANDON_TIME
+
+        # Someone is near the bag
+        self.last_near_time[rows[near]] = current_time
+        self.abandoned[rows[near]] = False
+
+        suspicious_bags = bag_ids[self.abandoned[rows]].tolist()
+
+        # Grace period for flicker (IMPORTANT): drop bags not seen recently
+        keep = current_time - self.last_seen <= self.cfg.GRACE_PERIOD
+        if not keep.all():
+            self.bag_ids = self.bag_ids[keep]
+            self.last_seen = self.last_seen[keep]
+            self.last_near_time = self.last_near_time[keep]
+            self.abandoned = self.abandoned[keep]
+
+        return suspicious_bags
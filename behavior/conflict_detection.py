@@ -1,7 +1,7 @@
 import config
-import time
 import math
 import numpy as np
+from utils.clock import SystemClock
 
 
 # COCO keypoint indices
@@ -19,216 +19,230 @@ _KP_SMOOTH_ALPHA      = 0.4   # EMA weight for keypoint positions
 _KP_CONF_SMOOTH_ALPHA = 0.35  # EMA weight for keypoint confidences (slightly slower — stability)
 
 
-def _kp(kps, confs, idx):
-    """Return keypoint (x, y) if smoothed confidence is above threshold, else None."""
-    if kps is None or confs is None:
-        return None
-    if confs[idx] >= config.KP_CONF_MIN:
-        return (float(kps[idx][0]), float(kps[idx][1]))
-    return None
-
-
-def _pose_signals(
-    personA,
-    personB,
-    rel_wrist_vel_A=None,
-    rel_wrist_vel_B=None,
-    raw_rel_wrist_vel_A=None,
-    raw_rel_wrist_vel_B=None,
-    windup_speed_A=0.0,
-    windup_speed_B=0.0,
-):
+_WRISTS = (_L_WRIST, _R_WRIST)
+
+
+def _mean_y(kp, valid, a, b):
+    """Mean y of keypoints a and b over the valid ones → (mean_y (N,), any_valid (N,))."""
+    va, vb = valid[:, a], valid[:, b]
+    total = np.where(va, kp[:, a, 1], 0.0) + np.where(vb, kp[:, b, 1], 0.0)
+    return total / np.maximum(va.astype(np.float64) + vb, 1.0), va | vb
+
+
+class PoseBatch:
     """
-    Analyse smoothed keypoints for two people and return:
-      conflict_boost (bool) — pose clearly indicates aggression
-      suppress       (bool) — pose clearly indicates friendly contact
-      fight_score    (float) — continuous aggression signal for session scoring
+    Pose signals of a batch of person pairs (ia[k], ib[k]), evaluated with
+    array operations over all pairs at once (see evaluate_pose_signals()).
 
-    rel_wrist_vel_A/B: relative wrist speed (wrist vel minus hip vel) for each person.
-    Falls back gracefully when keypoints or relative velocity are unavailable.
+    Per pair: conflict_boost / suppress / fast_track (bool) and fight_score
+    (float). The per-side flags that produced them are kept so that the
+    debug labels can be rebuilt later (labels()) instead of being formatted
+    for every pair on every frame.
     """
-    kpA, kcA = personA.get("_smooth_kp"), personA.get("_smooth_conf")
-    kpB, kcB = personB.get("_smooth_kp"), personB.get("_smooth_conf")
-
-    # Fall back to raw keypoints if smoothed not yet available
-    if kpA is None:
-        kpA, kcA = personA.get("keypoints"), personA.get("kp_conf")
-    if kpB is None:
-        kpB, kcB = personB.get("keypoints"), personB.get("kp_conf")
-
-    if kpA is None or kpB is None:
-        return False, False, 0.0, [], [], False
-
-    # --- Extract key points for A ---
-    wL_A = _kp(kpA, kcA, _L_WRIST)
-    wR_A = _kp(kpA, kcA, _R_WRIST)
-    sL_A = _kp(kpA, kcA, _L_SHOULDER)
-    sR_A = _kp(kpA, kcA, _R_SHOULDER)
-    hL_A = _kp(kpA, kcA, _L_HIP)
-    hR_A = _kp(kpA, kcA, _R_HIP)
-    wrists_A    = [w for w in [wL_A, wR_A] if w]
-    shoulders_A = [s for s in [sL_A, sR_A] if s]
-    hips_A      = [h for h in [hL_A, hR_A] if h]
-
-    # --- Extract key points for B ---
-    wL_B = _kp(kpB, kcB, _L_WRIST)
-    wR_B = _kp(kpB, kcB, _R_WRIST)
-    sL_B = _kp(kpB, kcB, _L_SHOULDER)
-    sR_B = _kp(kpB, kcB, _R_SHOULDER)
-    hL_B = _kp(kpB, kcB, _L_HIP)
-    hR_B = _kp(kpB, kcB, _R_HIP)
-    nose_B      = _kp(kpB, kcB, _NOSE)
-    nose_A      = _kp(kpA, kcA, _NOSE)
-    wrists_B    = [w for w in [wL_B, wR_B] if w]
-    shoulders_B = [s for s in [sL_B, sR_B] if s]
-    hips_B      = [h for h in [hL_B, hR_B] if h]
-
-    conflict_boost = False
-    suppress       = False
-    fast_track     = False
-    fight_score    = 0.0
-
-    # debug_signals: per-person event labels for the drawing layer.
-    # Format: (person_ref, label_string) so drawing.py can attach to correct person.
-    signals_A = []
-    signals_B = []
+
+    def __init__(self, ia, ib, ok, conflict_boost, suppress, fight_score, fast_track,
+                 strike, body, raised, rel_hit, fast, windup_hit, handshake,
+                 sync, symmetry, rel_vel, raw_rel_vel, windup):
+        self.ia, self.ib = ia, ib
+        self.ok = ok
+        self.conflict_boost = conflict_boost
+        self.suppress = suppress
+        self.fight_score = fight_score
+        self.fast_track = fast_track
+        self.strike = strike          # (2, P, 2): side, pair, wrist — wrist near opponent nose
+        self.body = body              # (2, P, 2): wrist near opponent torso
+        self.raised = raised          # (N, 2): wrist raised above own shoulders
+        self.rel_hit = rel_hit        # (N,) per-person flags ...
+        self.fast = fast
+        self.windup_hit = windup_hit
+        self.handshake = handshake
+        self.sync = sync              # (P,)
+        self.symmetry = symmetry
+        self.rel_vel = rel_vel        # (N,) ... and the values shown in the labels
+        self.raw_rel_vel = raw_rel_vel
+        self.windup = windup
+
+    def _person(self, k, side):
+        return (self.ia if side == 0 else self.ib)[k]
+
+    def has(self, k, side, kind):
+        """Whether side 0 (A) / 1 (B) of pair k raised a "strike", "arm_raised" or "suppress" signal."""
+        if not self.ok[k]:
+            return False
+        if kind == "strike":
+            return bool(self.strike[side, k].any())
+        person = self._person(k, side)
+        if kind == "arm_raised":
+            return bool(self.raised[person].any())
+        if kind == "suppress":
+            return bool(self.handshake[person])
+        raise ValueError(f"Unknown pose signal: {kind}")
+
+    def labels(self, k, side):
+        """Debug labels of side 0 (A) / 1 (B) of pair k, in evaluation order."""
+        if not self.ok[k]:
+            return []
+        person = self._person(k, side)
+        other = "B" if side == 0 else "A"
+        out = []
+        for w, w_idx in enumerate(_WRISTS):
+            if self.strike[side, k, w]:
+                out.append(f"KP{w_idx}→nose[{other}]: STRIKE ZONE")
+        for w, w_idx in enumerate(_WRISTS):
+            if self.body[side, k, w]:
+                out.append(f"KP{w_idx}→torso[{other}]: BODY HIT")
+        for w, w_idx in enumerate(_WRISTS):
+            if self.raised[person, w]:
+                out.append(f"KP{w_idx}<KP5/6: ARM RAISED")
+        if self.rel_hit[person]:
+            out.append(f"KP9/10 rel-vel: {self.rel_vel[person]:.0f}px/s")
+        if self.fast[person]:
+            out.append(f"FAST raw-rel: {self.raw_rel_vel[person]:.0f}px/s")
+        if self.windup_hit[person]:
+            out.append(f"WIND-UP: {self.windup[person]:.0f}px/s")
+        if self.handshake[person]:
+            out.append("KP9/10≈KP11/12: HANDSHAKE SUPPRESS")
+        if self.sync[k]:
+            out.append(f"SYNC: {self.symmetry[k]:.2f}")
+        return out
+
+
+class PoseSignals:
+    """
+    The pose signals one person took part in this frame, stored as
+    (PoseBatch, pair, side) references. Iterating yields the debug label
+    strings, which are only built at that point (the drawing layer with
+    DEBUG_KEYPOINTS on); has() answers the overlay's flag queries directly.
+    """
+    __slots__ = ("_refs",)
+
+    def __init__(self):
+        self._refs = []
+
+    def add(self, batch, k, side):
+        self._refs.append((batch, k, side))
+
+    def has(self, kind):
+        return any(batch.has(k, side, kind) for batch, k, side in self._refs)
+
+    def __iter__(self):
+        for batch, k, side in self._refs:
+            yield from batch.labels(k, side)
+
+    def __bool__(self):
+        return any(batch.ok[k] for batch, k, _ in self._refs)
+
+
+def evaluate_pose_signals(kp, kc, has_kp, boxes, rel_vel, raw_rel_vel, windup, ia, ib, cfg=config):
+    """
+    Analyse smoothed keypoints for every pair (ia[k], ib[k]) at once.
+
+    kp (N, 17, 2) / kc (N, 17): smoothed keypoints and confidences per person,
+    has_kp (N,): whether the person has keypoints at all, boxes (N, 4) xyxy,
+    rel_vel / raw_rel_vel / windup (N,): smoothed and raw relative wrist speed
+    (wrist vel minus hip vel) and elbow wind-up speed.
+    cfg: settings source (the detector's cfg; defaults to the config module).
+
+    Returns a PoseBatch with, per pair:
+      conflict_boost — pose clearly indicates aggression
+      suppress       — pose clearly indicates friendly contact
+      fight_score    — continuous aggression signal for session scoring
+      fast_track     — raw velocity spike (quick punch)
+    Pairs where either person has no keypoints get no signals.
+    """
+    kp = kp.astype(np.float64)
+    valid = kc >= cfg.KP_CONF_MIN
+    ok = has_kp[ia] & has_kp[ib]
+
+    wrist    = kp[:, _WRISTS]                 # (N, 2, 2)
+    wrist_ok = valid[:, _WRISTS]              # (N, 2)
+    nose     = kp[:, _NOSE]
+    nose_ok  = valid[:, _NOSE]
+    sh_y, sh_ok   = _mean_y(kp, valid, _L_SHOULDER, _R_SHOULDER)
+    hip_y, hip_ok = _mean_y(kp, valid, _L_HIP, _R_HIP)
 
     # Opponent torso centers for light punch/shove detection.
-    x1A, y1A, x2A, y2A = personA["bbox"]
-    x1B, y1B, x2B, y2B = personB["bbox"]
-    torso_A = ((x1A + x2A) / 2.0, (y1A + y2A) / 2.0)
-    torso_B = ((x1B + x2B) / 2.0, (y1B + y2B) / 2.0)
-    torso_r_A = max(15.0, min(x2A - x1A, y2A - y1A) * config.TORSO_STRIKE_RADIUS_RATIO)
-    torso_r_B = max(15.0, min(x2B - x1B, y2B - y1B) * config.TORSO_STRIKE_RADIUS_RATIO)
-    head_radius_A = max(15.0, (y2A - y1A) * 0.12)
-    head_radius_B = max(15.0, (y2B - y1B) * 0.12)
-
-    # ── Conflict signal 1: wrist of A near nose of B (strike zone) ──
-    if nose_B and wrists_A:
-        for w_idx, w in zip([_L_WRIST, _R_WRIST], [wL_A, wR_A]):
-            if w and math.hypot(w[0] - nose_B[0], w[1] - nose_B[1]) < head_radius_B:
-                conflict_boost = True
-                fight_score += 3.0
-                signals_A.append(f"KP{w_idx}→nose[B]: STRIKE ZONE")
-
-    # ── Conflict signal 1 (reciprocal): wrist of B near nose of A ──
-    if nose_A and wrists_B:
-        for w_idx, w in zip([_L_WRIST, _R_WRIST], [wL_B, wR_B]):
-            if w and math.hypot(w[0] - nose_A[0], w[1] - nose_A[1]) < head_radius_A:
-                conflict_boost = True
-                fight_score += 3.0
-                signals_B.append(f"KP{w_idx}→nose[A]: STRIKE ZONE")
-
-    # ── Conflict signal 1b: wrist of A/B entering opponent torso strike zone ──
-    if wrists_A:
-        for w_idx, w in zip([_L_WRIST, _R_WRIST], [wL_A, wR_A]):
-            if w and math.hypot(w[0] - torso_B[0], w[1] - torso_B[1]) < torso_r_B:
-                conflict_boost = True
-                fight_score += 1.8
-                signals_A.append(f"KP{w_idx}→torso[B]: BODY HIT")
-
-    if wrists_B:
-        for w_idx, w in zip([_L_WRIST, _R_WRIST], [wL_B, wR_B]):
-            if w and math.hypot(w[0] - torso_A[0], w[1] - torso_A[1]) < torso_r_A:
-                conflict_boost = True
-                fight_score += 1.8
-                signals_B.append(f"KP{w_idx}→torso[A]: BODY HIT")
+    x1, y1, x2, y2 = boxes.T
+    torso = np.stack([(x1 + x2) / 2.0, (y1 + y2) / 2.0], axis=1)
+    torso_r = np.maximum(15.0, np.minimum(x2 - x1, y2 - y1) * cfg.TORSO_STRIKE_RADIUS_RATIO)
+    head_r  = np.maximum(15.0, (y2 - y1) * 0.12)
+
+    # ── Conflict signal 1: wrist near opponent nose (strike zone), both directions ──
+    # ── Conflict signal 1b: wrist entering opponent torso strike zone ──
+    strike = np.empty((2, len(ia), 2), dtype=bool)
+    body   = np.empty((2, len(ia), 2), dtype=bool)
+    for side, (actor, target) in enumerate(((ia, ib), (ib, ia))):
+        to_nose  = wrist[actor] - nose[target][:, None]
+        to_torso = wrist[actor] - torso[target][:, None]
+        strike[side] = (wrist_ok[actor] & nose_ok[target][:, None] &
+                        (np.hypot(to_nose[..., 0], to_nose[..., 1]) < head_r[target][:, None]))
+        body[side] = (wrist_ok[actor] &
+                      (np.hypot(to_torso[..., 0], to_torso[..., 1]) < torso_r[target][:, None]))
 
     # ── Conflict signal 2: wrist raised well above own shoulder ──
-    if shoulders_A and wrists_A:
-        avg_sh_y = sum(s[1] for s in shoulders_A) / len(shoulders_A)
-        for w_idx, w in zip([_L_WRIST, _R_WRIST], [wL_A, wR_A]):
-            if w and w[1] < avg_sh_y - 20:
-                conflict_boost = True
-                fight_score += 1.5
-                signals_A.append(f"KP{w_idx}<KP5/6: ARM RAISED")
-
-    if shoulders_B and wrists_B:
-        avg_sh_y = sum(s[1] for s in shoulders_B) / len(shoulders_B)
-        for w_idx, w in zip([_L_WRIST, _R_WRIST], [wL_B, wR_B]):
-            if w and w[1] < avg_sh_y - 20:
-                conflict_boost = True
-                fight_score += 1.5
-                signals_B.append(f"KP{w_idx}<KP5/6: ARM RAISED")
+    raised = wrist_ok & sh_ok[:, None] & (wrist[..., 1] < sh_y[:, None] - 20)
 
     # ── Conflict signal 3: high relative wrist velocity (body-motion corrected) ──
-    rel_vel_thresh = config.RELATIVE_WRIST_VEL_THRESHOLD
-    if rel_wrist_vel_A is not None and rel_wrist_vel_A > rel_vel_thresh:
-        fight_score += min(rel_wrist_vel_A / rel_vel_thresh, 2.0)
-        if rel_wrist_vel_A > rel_vel_thresh * 1.5:
-            conflict_boost = True
-        signals_A.append(f"KP9/10 rel-vel: {rel_wrist_vel_A:.0f}px/s")
-    if rel_wrist_vel_B is not None and rel_wrist_vel_B > rel_vel_thresh:
-        fight_score += min(rel_wrist_vel_B / rel_vel_thresh, 2.0)
-        if rel_wrist_vel_B > rel_vel_thresh * 1.5:
-            conflict_boost = True
-        signals_B.append(f"KP9/10 rel-vel: {rel_wrist_vel_B:.0f}px/s")
+    rel_vel_thresh = cfg.RELATIVE_WRIST_VEL_THRESHOLD
+    rel_hit   = rel_vel > rel_vel_thresh
+    rel_score = np.where(rel_hit, np.minimum(rel_vel / rel_vel_thresh, 2.0), 0.0)
+    rel_boost = rel_vel > rel_vel_thresh * 1.5
 
     # ── Fast-track trigger: raw (unsmoothed) velocity spike catches quick punches ──
-    raw_fast_thresh = rel_vel_thresh * config.FAST_TRACK_RAW_MULTIPLIER
-    if raw_rel_wrist_vel_A is not None and raw_rel_wrist_vel_A > raw_fast_thresh:
-        conflict_boost = True
-        fast_track = True
-        fight_score += config.FAST_TRACK_IMPACT_SCORE
-        signals_A.append(f"FAST raw-rel: {raw_rel_wrist_vel_A:.0f}px/s")
-    if raw_rel_wrist_vel_B is not None and raw_rel_wrist_vel_B > raw_fast_thresh:
-        conflict_boost = True
-        fast_track = True
-        fight_score += config.FAST_TRACK_IMPACT_SCORE
-        signals_B.append(f"FAST raw-rel: {raw_rel_wrist_vel_B:.0f}px/s")
+    fast = raw_rel_vel > rel_vel_thresh * cfg.FAST_TRACK_RAW_MULTIPLIER
 
     # ── Anticipation signal: elbow retracts toward shoulder (wind-up) ──
-    if windup_speed_A > config.WINDUP_SHRINK_SPEED_THRESHOLD:
-        conflict_boost = True
-        fight_score += 1.2
-        signals_A.append(f"WIND-UP: {windup_speed_A:.0f}px/s")
-    if windup_speed_B > config.WINDUP_SHRINK_SPEED_THRESHOLD:
-        conflict_boost = True
-        fight_score += 1.2
-        signals_B.append(f"WIND-UP: {windup_speed_B:.0f}px/s")
+    windup_hit = windup > cfg.WINDUP_SHRINK_SPEED_THRESHOLD
 
     # ── Friendly signal: handshake — wrists near own hip level ──
-    if hips_A and wrists_A:
-        avg_hip_y = sum(h[1] for h in hips_A) / len(hips_A)
-        if all(abs(w[1] - avg_hip_y) < config.HIP_TOLERANCE for w in wrists_A):
-            suppress = True
-            signals_A.append("KP9/10≈KP11/12: HANDSHAKE SUPPRESS")
-
-    if hips_B and wrists_B:
-        avg_hip_y = sum(h[1] for h in hips_B) / len(hips_B)
-        if all(abs(w[1] - avg_hip_y) < config.HIP_TOLERANCE for w in wrists_B):
-            suppress = True
-            signals_B.append("KP9/10≈KP11/12: HANDSHAKE SUPPRESS")
+    handshake = hip_ok & wrist_ok.any(axis=1) & np.all(
+        ~wrist_ok | (np.abs(wrist[..., 1] - hip_y[:, None]) < cfg.HIP_TOLERANCE), axis=1)
+
+    # Scores are summed one signal at a time, in a fixed order
+    fight_score = np.zeros(len(ia))
+    for column in (
+        3.0 * strike[0, :, 0], 3.0 * strike[0, :, 1], 3.0 * strike[1, :, 0], 3.0 * strike[1, :, 1],
+        1.8 * body[0, :, 0],   1.8 * body[0, :, 1],   1.8 * body[1, :, 0],   1.8 * body[1, :, 1],
+        1.5 * raised[ia, 0],   1.5 * raised[ia, 1],   1.5 * raised[ib, 0],   1.5 * raised[ib, 1],
+        rel_score[ia], rel_score[ib],
+        cfg.FAST_TRACK_IMPACT_SCORE * fast[ia], cfg.FAST_TRACK_IMPACT_SCORE * fast[ib],
+        1.2 * windup_hit[ia], 1.2 * windup_hit[ib],
+    ):
+        fight_score = fight_score + column
+
+    conflict_boost = (
+        strike.any(axis=(0, 2)) | body.any(axis=(0, 2)) | raised[ia].any(axis=1) | raised[ib].any(axis=1) |
+        rel_boost[ia] | rel_boost[ib] | fast[ia] | fast[ib] | windup_hit[ia] | windup_hit[ib]
+    )
+    fast_track = fast[ia] | fast[ib]
+    suppress = handshake[ia] | handshake[ib]
 
     # ── Symmetry heuristic: mirrored/similar movement is often non-violent contact ──
-    if rel_wrist_vel_A is not None and rel_wrist_vel_B is not None:
-        hi = max(rel_wrist_vel_A, rel_wrist_vel_B, 1e-6)
-        if hi > 20.0:
-            lo = min(rel_wrist_vel_A, rel_wrist_vel_B)
-            symmetry = lo / hi
-            if symmetry >= config.SYMMETRY_SCORE_THRESHOLD and not fast_track and not conflict_boost:
-                suppress = True
-                fight_score = max(0.0, fight_score - 0.8)
-                signals_A.append(f"SYNC: {symmetry:.2f}")
-                signals_B.append(f"SYNC: {symmetry:.2f}")
+    hi = np.maximum(np.maximum(rel_vel[ia], rel_vel[ib]), 1e-6)
+    symmetry = np.minimum(rel_vel[ia], rel_vel[ib]) / hi
+    sync = (hi > 20.0) & (symmetry >= cfg.SYMMETRY_SCORE_THRESHOLD) & ~fast_track & ~conflict_boost
+    suppress |= sync
+    fight_score = np.where(sync, np.maximum(0.0, fight_score - 0.8), fight_score)
 
     # A conflict boost always overrides a suppress signal
-    if conflict_boost:
-        suppress = False
-        fight_score = max(fight_score, 2.0)
+    suppress &= ~conflict_boost
+    fight_score = np.where(conflict_boost, np.maximum(fight_score, 2.0), fight_score)
+    fight_score = np.where(suppress | ~ok, 0.0, fight_score)
 
-    if suppress:
-        fight_score = 0.0
-
-    return conflict_boost, suppress, fight_score, signals_A, signals_B, fast_track
+    return PoseBatch(ia, ib, ok, conflict_boost & ok, suppress & ok, fight_score, fast_track & ok,
+                     strike, body, raised, rel_hit, fast, windup_hit, handshake,
+                     sync, symmetry, rel_vel, raw_rel_vel, windup)
 
 
 class ConflictDetector:
-    def __init__(self):
-        # Per-pair state keyed by tuple(sorted((idA, idB)))
-        self.history = {}
-        # Per-person keypoint smoothing state keyed by person ID
-        self.person_kp = {}
+    def __init__(self, clock=None, cfg=None):
+        # Per-instance settings (threshold sweeps); defaults to the config module
+        self.cfg = cfg if cfg is not None else config
+        # Used when update() is not given a video_timestamp (see utils/clock.py)
+        self.clock = clock if clock is not None else SystemClock()
+        # Per-pair state keyed by tuple(sorted((idA, idB))), plus the
+        # per-person keypoint smoothing slots
+        self.reset()
 
     def compute_center(self, bbox):
         x1, y1, x2, y2 = bbox
@@ -238,303 +252,400 @@ class ConflictDetector:
         x1, y1, x2, y2 = bbox
         return (x2 - x1) * (y2 - y1)
 
-    def _smooth_person(self, pid, kp_xy, kp_conf, current_time):
+    # ── Keypoint smoothing state (one slot per person, stacked arrays) ──────
+
+    def reset(self):
+        """Forget all pair and keypoint smoothing state (e.g. after a seek jump)."""
+        self.history = {}
+        self._kp_slot = {}      # person ID → row in the arrays below
+        self._free_slots = []
+        self._alloc_slots(16)
+
+    def _alloc_slots(self, capacity):
+        old = len(self._kp_slot) + len(self._free_slots)
+        fields = {
+            "_smooth_kp":     ((capacity, 17, 2), np.float32),
+            "_smooth_conf":   ((capacity, 17),    np.float32),
+            "_prev_wrist":    ((capacity, 2),     np.float32),   # average wrist position
+            "_prev_hip":      ((capacity, 2),     np.float32),   # average hip position
+            "_has_prev_wrist": (capacity,         bool),
+            "_prev_arm_dist": (capacity,          np.float64),
+            "_has_prev_arm":  (capacity,          bool),
+            "_kp_prev_time":  (capacity,          np.float64),
+            "_kp_last_seen":  (capacity,          np.float64),
+            "_rel_wrist_vel": (capacity,          np.float64),
+            "_raw_rel_wrist_vel": (capacity,      np.float64),
+            "_windup_speed":  (capacity,          np.float64),
+        }
+        for name, (shape, dtype) in fields.items():
+            arr = np.zeros(shape, dtype=dtype)
+            if old:
+                arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+        self._free_slots.extend(range(capacity - 1, old - 1, -1))
+
+    def _slot_for(self, pid):
+        if not self._free_slots:
+            self._alloc_slots(2 * (len(self._kp_slot) + len(self._free_slots)))
+        slot = self._free_slots.pop()
+        self._kp_slot[pid] = slot
+        return slot
+
+    def _smooth_persons(self, persons, current_time):
         """
-        Apply per-keypoint EMA to positions and confidences for a person.
-        Returns (smooth_kp, smooth_conf, rel_wrist_vel, raw_rel_wrist_vel, windup_speed)
-        where rel_wrist_vel is smoothed body-motion-corrected wrist speed,
-        raw_rel_wrist_vel is the instantaneous unsmoothed value, and
-        windup_speed is elbow-to-shoulder shrink speed used for anticipation.
+        Apply per-keypoint EMA to positions and confidences of every person.
+        Returns one (smooth_kp, smooth_conf, rel_wrist_vel, raw_rel_wrist_vel,
+        windup_speed) tuple per person, where rel_wrist_vel is smoothed
+        body-motion-corrected wrist speed, raw_rel_wrist_vel is the
+        instantaneous unsmoothed value, and windup_speed is elbow-to-shoulder
+        shrink speed used for anticipation.
         """
-        if kp_xy is None or kp_conf is None:
-            return None, None, None, None, 0.0
-
-        if pid not in self.person_kp:
-            # First observation — initialise with raw values
-            self.person_kp[pid] = {
-                "smooth_kp":   kp_xy.copy(),
-                "smooth_conf": kp_conf.copy(),
-                "prev_wrist":  None,   # average wrist position
-                "prev_hip":    None,   # average hip position
-                "prev_time":   current_time,
-                "last_seen_active": current_time,
-                "rel_wrist_vel": 0.0,
-                "raw_rel_wrist_vel": 0.0,
-                "prev_arm_dist": None,
-                "windup_speed": 0.0,
-            }
-            return kp_xy, kp_conf, 0.0, 0.0, 0.0
-
-        state = self.person_kp[pid]
-        dt = current_time - state["prev_time"]
+        out = [(None, None, None, None, 0.0)] * len(persons)
+        pending = [k for k, p in enumerate(persons)
+                   if p.get("keypoints") is not None and p.get("kp_conf") is not None]
+        while pending:
+            # A repeated ID sees the state its first occurrence just wrote
+            batch, seen, pending_next = [], set(), []
+            for k in pending:
+                (pending_next if persons[k]["id"] in seen else batch).append(k)
+                seen.add(persons[k]["id"])
+            for k, res in zip(batch, self._smooth_batch([persons[k] for k in batch], current_time)):
+                out[k] = res
+            pending = pending_next
+        return out
+
+    def _smooth_batch(self, persons, current_time):
+        kp_xy   = np.array([p["keypoints"] for p in persons], dtype=np.float32)
+        kp_conf = np.array([p["kp_conf"] for p in persons], dtype=np.float32)
+        known   = np.array([p["id"] in self._kp_slot for p in persons], dtype=bool)
+        slots   = np.array([self._kp_slot[p["id"]] if p["id"] in self._kp_slot
+                            else self._slot_for(p["id"]) for p in persons], dtype=int)
+
+        # First observation — initialise with raw values
+        new = slots[~known]
+        self._smooth_kp[new]      = kp_xy[~known]
+        self._smooth_conf[new]    = kp_conf[~known]
+        self._has_prev_wrist[new] = False
+        self._has_prev_arm[new]   = False
+        self._kp_prev_time[new]   = current_time
+        self._rel_wrist_vel[new]  = 0.0
+        self._raw_rel_wrist_vel[new] = 0.0
+        self._windup_speed[new]   = 0.0
+
+        dt = current_time - self._kp_prev_time[slots]
+        smooth_kp   = self._smooth_kp[slots]
+        smooth_conf = self._smooth_conf[slots]
 
         # ── EMA on positions (only where current conf is adequate) ──
-        new_smooth_kp   = state["smooth_kp"].copy()
-        new_smooth_conf = state["smooth_conf"].copy()
-
-        for idx in range(17):
-            # Confidence EMA — smooths flickering confidence scores
-            new_smooth_conf[idx] = (
-                _KP_CONF_SMOOTH_ALPHA * kp_conf[idx] +
-                (1 - _KP_CONF_SMOOTH_ALPHA) * state["smooth_conf"][idx]
-            )
-            # Position EMA — only blend when raw detection has decent confidence
-            if kp_conf[idx] >= config.KP_CONF_MIN * 0.7:
-                new_smooth_kp[idx] = (
-                    _KP_SMOOTH_ALPHA * kp_xy[idx] +
-                    (1 - _KP_SMOOTH_ALPHA) * state["smooth_kp"][idx]
-                )
-            # else: keep previous smooth position (occlusion/low-conf frame)
+        new_conf = (_KP_CONF_SMOOTH_ALPHA * kp_conf + (1 - _KP_CONF_SMOOTH_ALPHA) * smooth_conf)
+        # Position EMA — only blend when raw detection has decent confidence,
+        # otherwise keep previous smooth position (occlusion/low-conf frame)
+        blend = kp_conf >= self.cfg.KP_CONF_MIN * 0.7
+        new_kp = np.where(blend[..., None], _KP_SMOOTH_ALPHA * kp_xy + (1 - _KP_SMOOTH_ALPHA) * smooth_kp,
+                          smooth_kp)
+        new_kp[~known]   = kp_xy[~known]
+        new_conf[~known] = kp_conf[~known]
+
+        moving = known & (dt > 0)
+        valid  = new_conf >= self.cfg.KP_CONF_MIN
+
+        def masked_mean(a, b):
+            """Mean of keypoints a and b over the ones that are valid."""
+            va, vb = valid[:, a], valid[:, b]
+            total = np.where(va[:, None], new_kp[:, a], 0) + np.where(vb[:, None], new_kp[:, b], 0)
+            count = (va.astype(np.float32) + vb)[:, None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return total / count, va | vb
 
         # ── Relative wrist velocity (wrist speed minus hip speed) ──
-        rel_wrist_vel = state["rel_wrist_vel"]  # carry previous if can't compute
-        raw_rel_wrist_vel = state["raw_rel_wrist_vel"]
-        windup_speed = state["windup_speed"]
-        if dt > 0:
-            # Average wrist position
-            wrist_indices = [_L_WRIST, _R_WRIST]
-            hip_indices   = [_L_HIP,   _R_HIP]
-
-            valid_wrists = [new_smooth_kp[i] for i in wrist_indices
-                            if new_smooth_conf[i] >= config.KP_CONF_MIN]
-            valid_hips   = [new_smooth_kp[i] for i in hip_indices
-                            if new_smooth_conf[i] >= config.KP_CONF_MIN]
-
-            if valid_wrists and valid_hips and state["prev_wrist"] is not None:
-                curr_wrist = np.mean(valid_wrists, axis=0)
-                curr_hip   = np.mean(valid_hips,   axis=0)
-                prev_wrist = state["prev_wrist"]
-                prev_hip   = state["prev_hip"]
-
-                wrist_speed = math.hypot(*(curr_wrist - prev_wrist)) / dt
-                hip_speed   = math.hypot(*(curr_hip   - prev_hip))   / dt
-
-                # Relative speed: how fast the wrist moves relative to the body
-                raw_rel = max(wrist_speed - hip_speed, 0.0)
-                raw_rel_wrist_vel = raw_rel
-
-                # EMA smooth the relative velocity to prevent 1-frame spikes
-                rel_wrist_vel = (
-                    0.45 * raw_rel +
-                    0.55 * state["rel_wrist_vel"]
-                )
-
-                state["prev_wrist"] = curr_wrist
-                state["prev_hip"]   = curr_hip
-            elif valid_wrists and valid_hips:
-                # First frame with valid wrists and hips — initialise positions
-                state["prev_wrist"] = np.mean(valid_wrists, axis=0)
-                state["prev_hip"]   = np.mean(valid_hips,   axis=0)
-
-            # Elbow-to-shoulder shrink speed (wind-up anticipation)
-            arm_pairs = [(_L_SHOULDER, _L_ELBOW), (_R_SHOULDER, _R_ELBOW)]
-            arm_distances = []
-            for sh_idx, el_idx in arm_pairs:
-                if (
-                    new_smooth_conf[sh_idx] >= config.KP_CONF_MIN and
-                    new_smooth_conf[el_idx] >= config.KP_CONF_MIN
-                ):
-                    sh = new_smooth_kp[sh_idx]
-                    el = new_smooth_kp[el_idx]
-                    arm_distances.append(math.hypot(float(el[0] - sh[0]), float(el[1] - sh[1])))
-
-            if arm_distances:
-                curr_arm_dist = float(np.mean(arm_distances))
-                if state["prev_arm_dist"] is not None:
-                    # Positive value means elbow is pulling inward toward shoulder.
-                    windup_speed = max((state["prev_arm_dist"] - curr_arm_dist) / dt, 0.0)
-                state["prev_arm_dist"] = curr_arm_dist
-
-        state["smooth_kp"]     = new_smooth_kp
-        state["smooth_conf"]   = new_smooth_conf
-        state["prev_time"]     = current_time
-        state["last_seen_active"] = current_time
-        state["rel_wrist_vel"] = rel_wrist_vel
-        state["raw_rel_wrist_vel"] = raw_rel_wrist_vel
-        state["windup_speed"] = windup_speed
-
-        return new_smooth_kp, new_smooth_conf, rel_wrist_vel, raw_rel_wrist_vel, windup_speed
+        rel_wrist_vel     = self._rel_wrist_vel[slots]   # carry previous if can't compute
+        raw_rel_wrist_vel = self._raw_rel_wrist_vel[slots]
+        curr_wrist, any_wrist = masked_mean(_L_WRIST, _R_WRIST)
+        curr_hip,   any_hip   = masked_mean(_L_HIP,   _R_HIP)
+        has_wrist_hip = moving & any_wrist & any_hip
+        has_prev = self._has_prev_wrist[slots]
+
+        step = has_wrist_hip & has_prev
+        if step.any():
+            wrist_delta = (curr_wrist[step] - self._prev_wrist[slots[step]]).astype(np.float64)
+            hip_delta   = (curr_hip[step]   - self._prev_hip[slots[step]]).astype(np.float64)
+            wrist_speed = np.hypot(wrist_delta[:, 0], wrist_delta[:, 1]) / dt[step]
+            hip_speed   = np.hypot(hip_delta[:, 0],   hip_delta[:, 1])   / dt[step]
+
+            # Relative speed: how fast the wrist moves relative to the body
+            raw_rel = np.maximum(wrist_speed - hip_speed, 0.0)
+            raw_rel_wrist_vel[step] = raw_rel
+            # EMA smooth the relative velocity to prevent 1-frame spikes
+            rel_wrist_vel[step] = 0.45 * raw_rel + 0.55 * rel_wrist_vel[step]
+
+        # Initialise on the first frame with valid wrists and hips, advance otherwise
+        self._prev_wrist[slots[has_wrist_hip]] = curr_wrist[has_wrist_hip]
+        self._prev_hip[slots[has_wrist_hip]]   = curr_hip[has_wrist_hip]
+        self._has_prev_wrist[slots[has_wrist_hip]] = True
+
+        # ── Elbow-to-shoulder shrink speed (wind-up anticipation) ──
+        windup_speed = self._windup_speed[slots]
+        arm_dist = []
+        arm_valid = []
+        for sh_idx, el_idx in ((_L_SHOULDER, _L_ELBOW), (_R_SHOULDER, _R_ELBOW)):
+            delta = (new_kp[:, el_idx] - new_kp[:, sh_idx]).astype(np.float64)
+            arm_dist.append(np.hypot(delta[:, 0], delta[:, 1]))
+            arm_valid.append(valid[:, sh_idx] & valid[:, el_idx])
+        arms = moving & (arm_valid[0] | arm_valid[1])
+        curr_arm_dist = (
+            (np.where(arm_valid[0], arm_dist[0], 0.0) + np.where(arm_valid[1], arm_dist[1], 0.0))
+            / np.maximum(arm_valid[0].astype(np.float64) + arm_valid[1], 1.0)
+        )
+        step = arms & self._has_prev_arm[slots]
+        # Positive value means elbow is pulling inward toward shoulder.
+        windup_speed[step] = np.maximum(
+            (self._prev_arm_dist[slots[step]] - curr_arm_dist[step]) / dt[step], 0.0)
+        self._prev_arm_dist[slots[arms]] = curr_arm_dist[arms]
+        self._has_prev_arm[slots[arms]]  = True
+
+        self._smooth_kp[slots]     = new_kp
+        self._smooth_conf[slots]   = new_conf
+        self._kp_prev_time[slots]  = current_time
+        self._kp_last_seen[slots]  = current_time
+        self._rel_wrist_vel[slots] = rel_wrist_vel
+        self._raw_rel_wrist_vel[slots] = raw_rel_wrist_vel
+        self._windup_speed[slots]  = windup_speed
+
+        return list(zip(new_kp, new_conf, rel_wrist_vel.tolist(),
+                        raw_rel_wrist_vel.tolist(), windup_speed.tolist()))
+
+    def _drop_stale_persons(self, active_ids, current_time):
+        """Free smoothing slots of persons unseen for a short grace period, so flickering IDs can recover."""
+        for pid, slot in list(self._kp_slot.items()):
+            if pid not in active_ids and current_time - self._kp_last_seen[slot] > 1.5:
+                del self._kp_slot[pid]
+                self._free_slots.append(slot)
+
+    def _near_pairs(self, persons):
+        """
+        Person pairs within PROXIMITY_DISTANCE as (i, j, dist), i < j, in
+        row-major order. A NumPy distance matrix discards far pairs in one
+        step; the survivors (plus a hair of margin) get the exact math.hypot
+        distance the threshold is applied to, so rounding can never move a
+        pair across the boundary.
+        """
+        if len(persons) < 2:
+            return []
+        centers = np.array([p["center"] for p in persons], dtype=np.float32)
+        dx = centers[:, None, 0] - centers[None, :, 0]    # float32, same as per-pair subtraction
+        dy = centers[:, None, 1] - centers[None, :, 1]
+        limit = self.cfg.PROXIMITY_DISTANCE
+        d2 = dx.astype(np.float64) ** 2 + dy.astype(np.float64) ** 2
+        candidates = np.triu(d2 <= (limit * (1 + 1e-6) + 1e-6) ** 2, k=1)
+
+        near = []
+        for i, j in zip(*np.nonzero(candidates)):
+            dist = math.hypot(dx[i, j], dy[i, j])
+            if dist <= limit:
+                near.append((int(i), int(j), dist))
+        return near
+
+    def _pair_motion(self, pairs, current_time):
+        """
+        Distance velocity/acceleration and bbox area change of every known
+        pair at once. Returns per-pair columns (dt, velocity and the boolean
+        motion tests used by update()); areas stay float32 like the per-object
+        values they come from.
+        """
+        states = [self.history[key] for _, _, key, _, _, _ in pairs]
+        dist       = np.array([p[3] for p in pairs], dtype=np.float64)
+        areaA      = np.array([p[4] for p in pairs], dtype=np.float32)
+        areaB      = np.array([p[5] for p in pairs], dtype=np.float32)
+        prev_dist  = np.array([s["prev_distance"] for s in states], dtype=np.float64)
+        prev_vel   = np.array([s["prev_velocity"] for s in states], dtype=np.float64)
+        prev_time  = np.array([s["prev_time"] for s in states], dtype=np.float64)
+        prev_areaA = np.array([s["prev_areaA"] for s in states], dtype=np.float32)
+        prev_areaB = np.array([s["prev_areaB"] for s in states], dtype=np.float32)
+
+        dt = current_time - prev_time
+        with np.errstate(divide="ignore", invalid="ignore"):   # dt <= 0 rows are skipped by update()
+            velocity     = (dist - prev_dist) / dt
+            acceleration = (velocity - prev_vel) / dt
+        area_changeA = np.abs(areaA - prev_areaA) / (prev_areaA + 1e-5)
+        area_changeB = np.abs(areaB - prev_areaB) / (prev_areaB + 1e-5)
+
+        # ── Raw bbox conflict signal ──
+        bbox_conflict = (
+            (
+                (np.abs(velocity)     > self.cfg.DISTANCE_VELOCITY_THRESHOLD) &
+                (np.abs(acceleration) > self.cfg.ACCELERATION_THRESHOLD)
+            ) | (
+                (area_changeA > self.cfg.AREA_CHANGE_THRESHOLD) |
+                (area_changeB > self.cfg.AREA_CHANGE_THRESHOLD)
+            )
+        )
+        is_struggling = (area_changeA > 0.25) | (area_changeB > 0.25)
+        is_calm_motion = np.abs(velocity) < self.cfg.CALM_VELOCITY_THRESHOLD
+        is_separating = velocity > 15.0  # Tweak: slightly higher threshold for a clean separation
+        is_violent_motion = np.abs(velocity) > self.cfg.DISTANCE_VELOCITY_THRESHOLD * 2
+
+        return (dt.tolist(), velocity.tolist(), bbox_conflict.tolist(), is_struggling.tolist(),
+                is_calm_motion.tolist(), is_separating.tolist(), is_violent_motion.tolist())
+
+    def _pose_batch(self, persons, smoothed, pairs):
+        """Stack the persons' smoothed keypoints and motion and evaluate the pose signals of all pairs."""
+        n = len(persons)
+        kp = np.zeros((n, 17, 2), dtype=np.float32)
+        kc = np.zeros((n, 17), dtype=np.float32)
+        has_kp = np.array([sk is not None for sk, _, _, _, _ in smoothed], dtype=bool)
+        if has_kp.any():
+            kp[has_kp] = [sk for sk, _, _, _, _ in smoothed if sk is not None]
+            kc[has_kp] = [sc for _, sc, _, _, _ in smoothed if sc is not None]
+        rel_vel     = np.array([rv or 0.0 for _, _, rv, _, _ in smoothed], dtype=np.float64)
+        raw_rel_vel = np.array([raw or 0.0 for _, _, _, raw, _ in smoothed], dtype=np.float64)
+        windup      = np.array([w for _, _, _, _, w in smoothed], dtype=np.float64)
+        boxes = np.array([p["bbox"] for p in persons], dtype=np.float32).reshape(-1, 4)
+        ia = np.array([pair[0] for pair in pairs], dtype=int)
+        ib = np.array([pair[1] for pair in pairs], dtype=int)
+        return evaluate_pose_signals(kp, kc, has_kp, boxes, rel_vel, raw_rel_vel, windup, ia, ib, cfg=self.cfg)
 
     def update(self, tracked_objects, video_timestamp=None):
-        if not config.ENABLE_CONFLICT_DETECTION:
+        if not self.cfg.ENABLE_CONFLICT_DETECTION:
             return False, {}
 
-        persons = [obj for obj in tracked_objects if obj["class"] == config.PERSON]
+        persons = [obj for obj in tracked_objects if obj["class"] == self.cfg.PERSON]
         if len(persons) < 2:
             # Still smooth single-person keypoints so state is ready when a second appears
-            current_time = video_timestamp if video_timestamp is not None else time.time()
-            for p in persons:
-                sk, sc, _, _, _ = self._smooth_person(
-                    p["id"], p.get("keypoints"), p.get("kp_conf"), current_time)
+            current_time = video_timestamp if video_timestamp is not None else self.clock.now()
+            for p, (sk, sc, _, _, _) in zip(persons, self._smooth_persons(persons, current_time)):
                 p["_smooth_kp"]   = sk
                 p["_smooth_conf"] = sc
 
-        current_time = video_timestamp if video_timestamp is not None else time.time()
+        current_time = video_timestamp if video_timestamp is not None else self.clock.now()
 
         # ── Smooth keypoints for all persons ──
-        rel_wrist_vels = {}
-        raw_rel_wrist_vels = {}
-        windup_speeds = {}
-        for p in persons:
-            sk, sc, rv, raw_rv, windup_speed = self._smooth_person(
-                p["id"], p.get("keypoints"), p.get("kp_conf"), current_time)
+        smoothed = self._smooth_persons(persons, current_time)
+        for p, (sk, sc, rv, _, _) in zip(persons, smoothed):
             p["_smooth_kp"]      = sk
             p["_smooth_conf"]    = sc
             p["_rel_wrist_vel"]  = rv if rv is not None else 0.0
-            p["_signals"]        = []   # reset signal list each frame
-            rel_wrist_vels[p["id"]] = rv
-            raw_rel_wrist_vels[p["id"]] = raw_rv
-            windup_speeds[p["id"]] = windup_speed
+            p["_signals"]        = PoseSignals()   # reset signal list each frame
 
         any_confirmed  = False
         active_pairs   = set()
         pair_scores    = {}   # pair_key → cumulative fight score for this update
 
-        for i in range(len(persons)):
-            for j in range(i + 1, len(persons)):
-                idA = persons[i]["id"]
-                idB = persons[j]["id"]
-
-                centerA = self.compute_center(persons[i]["bbox"])
-                centerB = self.compute_center(persons[j]["bbox"])
-                areaA   = self.compute_area(persons[i]["bbox"])
-                areaB   = self.compute_area(persons[j]["bbox"])
-
-                dist = math.hypot(centerA[0] - centerB[0], centerA[1] - centerB[1])
-
-                if dist > config.PROXIMITY_DISTANCE:
-                    continue
-
-                pair_key = tuple(sorted((idA, idB)))
-                active_pairs.add(pair_key)
-
-                # ── Initialise per-pair state ──
-                if pair_key not in self.history:
-                    self.history[pair_key] = {
-                        "prev_distance":  dist,
-                        "prev_velocity":  0.0,
-                        "prev_areaA":     areaA,
-                        "prev_areaB":     areaB,
-                        "prev_time":      current_time,
-                        "last_seen_active": current_time,
-                        "confirm_count":  0,
-                        "calm_count":     0,
-                        "conflict_start": None,
-                        "close_since":    current_time,
-                        "calm_contact":   False,
-                        "fight_session":  0.0,   # cumulative fight score for this pair
-                    }
-                    continue
-
-                prev = self.history[pair_key]
-                dt = current_time - prev["prev_time"]
-                if dt <= 0:
-                    continue
-
-                velocity     = (dist - prev["prev_distance"]) / dt
-                acceleration = (velocity - prev["prev_velocity"]) / dt
-
-                area_changeA = abs(areaA - prev["prev_areaA"]) / (prev["prev_areaA"] + 1e-5)
-                area_changeB = abs(areaB - prev["prev_areaB"]) / (prev["prev_areaB"] + 1e-5)
-
-                # ── Pose-based signals (using smoothed keypoints + relative velocity) ──
-                conflict_boost, pose_suppress, fight_score, sig_A, sig_B, fast_track = _pose_signals(
-                    persons[i], persons[j],
-                    rel_wrist_vel_A=rel_wrist_vels.get(idA),
-                    rel_wrist_vel_B=rel_wrist_vels.get(idB),
-                    raw_rel_wrist_vel_A=raw_rel_wrist_vels.get(idA),
-                    raw_rel_wrist_vel_B=raw_rel_wrist_vels.get(idB),
-                    windup_speed_A=windup_speeds.get(idA, 0.0),
-                    windup_speed_B=windup_speeds.get(idB, 0.0),
-                )
-                # Write signal labels back into person dicts for drawing layer
-                persons[i].setdefault("_signals", [])
-                persons[j].setdefault("_signals", [])
-                persons[i]["_signals"].extend(sig_A)
-                persons[j]["_signals"].extend(sig_B)
-
-                # ── Raw bbox conflict signal ──
-                bbox_conflict = (
-                    (
-                        abs(velocity)     > config.DISTANCE_VELOCITY_THRESHOLD and
-                        abs(acceleration) > config.ACCELERATION_THRESHOLD
-                    ) or (
-                        area_changeA > config.AREA_CHANGE_THRESHOLD or
-                        area_changeB > config.AREA_CHANGE_THRESHOLD
-                    )
-                )
-
-                raw_conflict = bbox_conflict or conflict_boost
-
-                # ── Calm contact suppression ──
-                time_close = current_time - prev["close_since"]
-                is_separating = velocity > 15.0  # Tweak: slightly higher threshold for a clean separation
-                is_struggling = area_changeA > 0.25 or area_changeB > 0.25
-
-                # Capture the state before we modify it.
-                was_calm = prev["calm_contact"]
-
-                if (
-                    abs(velocity) < config.CALM_VELOCITY_THRESHOLD and
-                    time_close > config.CALM_CONTACT_TIME
-                    and not is_struggling
-                ):
-                    prev["calm_contact"] = True
-
-                if pose_suppress and not is_struggling:
-                    prev["calm_contact"] = True
-
-                # The fix: only allow pose-based conflict to break calm state if they are not stepping back.
-                if (conflict_boost and not is_separating) or (abs(velocity) > config.DISTANCE_VELOCITY_THRESHOLD * 2 and not is_separating):
-                    prev["calm_contact"] = False
-
-                # Grace period: if they were calm and are currently separating, enforce the calm state.
-                if was_calm and is_separating:
-                    prev["calm_contact"] = True
-                    fight_score = 0.0  # Zero out temporary threat spikes from arm retraction.
-
-                # ── Per-pair confirmation ──
-                if raw_conflict and not prev["calm_contact"]:
-                    prev["calm_count"] = 0
-                    if prev["confirm_count"] == 0:
-                        prev["conflict_start"] = current_time
-                    prev["confirm_count"] += 1
-                else:
-                    prev["calm_count"] += 1
-                    if prev["calm_count"] >= config.CONFLICT_CALM_FRAMES:
-                        prev["confirm_count"] = 0
-                        prev["conflict_start"] = None
-
-                duration_ok = (
-                    prev["conflict_start"] is not None and
-                    (current_time - prev["conflict_start"]) >= config.CONFLICT_MIN_DURATION
-                )
-                if prev["confirm_count"] >= config.CONFLICT_CONFIRM_FRAMES and duration_ok:
-                    any_confirmed = True
-
-                # ── Per-pair fight session score ──
-                # Accumulates when both persons are in proximity with active signals.
-                # Decays slowly when no conflict signal present.
-                if raw_conflict and not prev["calm_contact"]:
-                    prev["fight_session"] += fight_score * dt
-                    if fast_track:
-                        prev["fight_session"] += config.FAST_TRACK_IMPACT_SCORE
-                else:
-                    prev["fight_session"] = max(0.0, prev["fight_session"] - 0.5 * dt)
-
-                pair_scores[pair_key] = prev["fight_session"]
-
-                # Proactive score gate: trigger as soon as pair score crosses threshold.
-                if prev["fight_session"] >= config.FIGHT_SESSION_TRIGGER:
-                    any_confirmed = True
-
-                # ── Update history ──
-                prev["prev_distance"] = dist
-                prev["prev_velocity"] = velocity
-                prev["prev_areaA"]    = areaA
-                prev["prev_areaB"]    = areaB
-                prev["prev_time"]     = current_time
-                prev["last_seen_active"] = current_time
+        # ── New pairs start their history; known pairs are collected for the array step ──
+        pairs = []   # (i, j, pair_key, dist, areaA, areaB) of pairs with history
+        for i, j, dist in self._near_pairs(persons):
+            pair_key = tuple(sorted((persons[i]["id"], persons[j]["id"])))
+            if pair_key in active_pairs:
+                continue   # duplicate id in this frame: its state was already touched (dt would be 0)
+            active_pairs.add(pair_key)
+            areaA = persons[i]["area"]
+            areaB = persons[j]["area"]
+
+            if pair_key not in self.history:
+                self.history[pair_key] = {
+                    "prev_distance":  dist,
+                    "prev_velocity":  0.0,
+                    "prev_areaA":     areaA,
+                    "prev_areaB":     areaB,
+                    "prev_time":      current_time,
+                    "last_seen_active": current_time,
+                    "confirm_count":  0,
+                    "calm_count":     0,
+                    "conflict_start": None,
+                    "close_since":    current_time,
+                    "calm_contact":   False,
+                    "fight_session":  0.0,   # cumulative fight score for this pair
+                }
+                continue
+            pairs.append((i, j, pair_key, dist, areaA, areaB))
+
+        if pairs:
+            motion = self._pair_motion(pairs, current_time)
+            # ── Pose-based signals (using smoothed keypoints + relative velocity) ──
+            pose = self._pose_batch(persons, smoothed, pairs)
+            pose_columns = (pose.conflict_boost.tolist(), pose.suppress.tolist(),
+                            pose.fight_score.tolist(), pose.fast_track.tolist())
+
+        for k, (i, j, pair_key, dist, areaA, areaB) in enumerate(pairs):
+            dt, velocity, bbox_conflict, is_struggling, is_calm_motion, is_separating, is_violent_motion = (
+                column[k] for column in motion)
+            if dt <= 0:
+                continue
+            prev = self.history[pair_key]
+
+            conflict_boost, pose_suppress, fight_score, fast_track = (column[k] for column in pose_columns)
+            # Hand the pair's signals to both persons for the drawing layer
+            persons[i]["_signals"].add(pose, k, 0)
+            persons[j]["_signals"].add(pose, k, 1)
+
+            raw_conflict = bbox_conflict or conflict_boost
+
+            # ── Calm contact suppression ──
+            time_close = current_time - prev["close_since"]
+
+            # Capture the state before we modify it.
+            was_calm = prev["calm_contact"]
+
+            if (
+                is_calm_motion and
+                time_close > self.cfg.CALM_CONTACT_TIME
+                and not is_struggling
+            ):
+                prev["calm_contact"] = True
+
+            if pose_suppress and not is_struggling:
+                prev["calm_contact"] = True
+
+            # The fix: only allow pose-based conflict to break calm state if they are not stepping back.
+            if (conflict_boost and not is_separating) or (is_violent_motion and not is_separating):
+                prev["calm_contact"] = False
+
+            # Grace period: if they were calm and are currently separating, enforce the calm state.
+            if was_calm and is_separating:
+                prev["calm_contact"] = True
+                fight_score = 0.0  # Zero out temporary threat spikes from arm retraction.
+
+            # ── Per-pair confirmation ──
+            if raw_conflict and not prev["calm_contact"]:
+                prev["calm_count"] = 0
+                if prev["confirm_count"] == 0:
+                    prev["conflict_start"] = current_time
+                prev["confirm_count"] += 1
+            else:
+                prev["calm_count"] += 1
+                if prev["calm_count"] >= self.cfg.CONFLICT_CALM_FRAMES:
+                    prev["confirm_count"] = 0
+                    prev["conflict_start"] = None
+
+            duration_ok = (
+                prev["conflict_start"] is not None and
+                (current_time - prev["conflict_start"]) >= self.cfg.CONFLICT_MIN_DURATION
+            )
+            if prev["confirm_count"] >= self.cfg.CONFLICT_CONFIRM_FRAMES and duration_ok:
+                any_confirmed = True
+
+            # ── Per-pair fight session score ──
+            # Accumulates when both persons are in proximity with active signals.
+            # Decays slowly when no conflict signal present.
+            if raw_conflict and not prev["calm_contact"]:
+                prev["fight_session"] += fight_score * dt
+                if fast_track:
+                    prev["fight_session"] += self.cfg.FAST_TRACK_IMPACT_SCORE
+            else:
+                prev["fight_session"] = max(0.0, prev["fight_session"] - 0.5 * dt)
+
+            pair_scores[pair_key] = prev["fight_session"]
+
+            # Proactive score gate: trigger as soon as pair score crosses threshold.
+            if prev["fight_session"] >= self.cfg.FIGHT_SESSION_TRIGGER:
+                any_confirmed = True
+
+            # ── Update history ──
+            prev["prev_distance"] = dist
+            prev["prev_velocity"] = velocity
+            prev["prev_areaA"]    = areaA
+            prev["prev_areaB"]    = areaB
+            prev["prev_time"]     = current_time
+            prev["last_seen_active"] = current_time
 
         # Clean up pairs that left proximity after a short grace period.
         for k in list(self.history.keys()):
@@ -542,11 +653,6 @@ class ConflictDetector:
                 if current_time - self.history[k].get("last_seen_active", self.history[k]["prev_time"]) > 1.5:
                     del self.history[k]
 
-        # Clean up person state after a short grace period so flickering IDs can recover.
-        active_person_ids = {p["id"] for p in persons}
-        for k in list(self.person_kp.keys()):
-            if k not in active_person_ids:
-                if current_time - self.person_kp[k].get("last_seen_active", self.person_kp[k]["prev_time"]) > 1.5:
-                    del self.person_kp[k]
+        self._drop_stale_persons({p["id"] for p in persons}, current_time)
 
         return any_confirmed, pair_scores
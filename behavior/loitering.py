@@ -1,25 +1,26 @@
-import time
 import config
-from utils.geometry import get_center, distance
+from utils.clock import SystemClock
+from utils.geometry import distance
 
 
 class LoiteringDetector:
-    def __init__(self):
+    def __init__(self, clock=None, cfg=None):
+        self.clock = clock if clock is not None else SystemClock()
+        self.cfg = cfg if cfg is not None else config
         self.person_state = {}
 
     def update(self, tracked_objects):
-        current_time = time.time()
+        current_time = self.clock.now()
         suspicious_ids = []
 
         for obj in tracked_objects:
             obj_id = obj["id"]
             cls = obj["class"]
-            bbox = obj["bbox"]
 
-            if cls != config.PERSON:
+            if cls != self.cfg.PERSON:
                 continue
 
-            cx, cy = get_center(bbox)
+            cx, cy = obj["center"]
 
             if obj_id not in self.person_state:
                 self.person_state[obj_id] = {
@@ -35,13 +36,13 @@ class LoiteringDetector:
 
             move_dist = distance(prev_pos, (cx, cy))
 
-            if move_dist > config.LOITER_MOVEMENT_THRESHOLD:
+            if move_dist > self.cfg.LOITER_MOVEMENT_THRESHOLD:
                 state["last_move_time"] = current_time
                 state["last_position"] = (cx, cy)
 
             stationary_time = current_time - state["last_move_time"]
 
-            if stationary_time > config.LOITER_TIME:
+            if stationary_time > self.cfg.LOITER_TIME:
                 state["loiter_flag"] = True
                 suspicious_ids.append(obj_id)
 
@@ -1,10 +1,12 @@
 import config
-import time
+from utils.clock import SystemClock
 import math
 
 
 class PhoneBehaviorDetector:
-    def __init__(self):
+    def __init__(self, clock=None, cfg=None):
+        self.clock = clock if clock is not None else SystemClock()
+        self.cfg = cfg if cfg is not None else config
         self.prev_phone_positions = {}
         self.confirm_counter = {}
 
@@ -15,23 +17,23 @@ class PhoneBehaviorDetector:
         relative_y = phone_center_y - y1
         ratio = relative_y / height
 
-        if ratio < config.PHONE_FACE_ZONE:
+        if ratio < self.cfg.PHONE_FACE_ZONE:
             return "ACTIVE"
-        elif ratio < config.PHONE_TORSO_ZONE:
+        elif ratio < self.cfg.PHONE_TORSO_ZONE:
             return "HOLDING"
         else:
             return "POCKET"
 
     def update(self, tracked_objects):
 
-        if not config.ENABLE_PHONE_BEHAVIOR:
+        if not self.cfg.ENABLE_PHONE_BEHAVIOR:
             return {}
 
-        persons = [o for o in tracked_objects if o["class"] == config.PERSON]
-        phones = [o for o in tracked_objects if o["class"] == config.CELL_PHONE]
+        persons = [o for o in tracked_objects if o["class"] == self.cfg.PERSON]
+        phones = [o for o in tracked_objects if o["class"] == self.cfg.CELL_PHONE]
 
         results = {}
-        current_time = time.time()
+        current_time = self.clock.now()
 
         for person in persons:
             pid = person["id"]
@@ -70,7 +72,7 @@ class PhoneBehaviorDetector:
                 if dt > 0:
                     velocity_y = (prev["pos"][1] - phone_center[1]) / dt
 
-                    if velocity_y > config.PHONE_RAISE_SPEED_THRESHOLD:
+                    if velocity_y > self.cfg.PHONE_RAISE_SPEED_THRESHOLD:
                         misuse = True
 
             self.prev_phone_positions[pid] = {
@@ -86,7 +88,7 @@ class PhoneBehaviorDetector:
             else:
                 self.confirm_counter[pid] = 0
 
-            if self.confirm_counter.get(pid, 0) >= config.PHONE_MISUSE_CONFIRM_FRAMES:
+            if self.confirm_counter.get(pid, 0) >= self.cfg.PHONE_MISUSE_CONFIRM_FRAMES:
                 misuse = True
             else:
                 misuse = False
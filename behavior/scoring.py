@@ -2,12 +2,13 @@ import config
 
 
 class ThreatScorer:
-    def __init__(self):
+    def __init__(self, cfg=None):
+        self.cfg = cfg if cfg is not None else config
         self.instant_scores = {}
         self.session_scores = {}
 
     def update(self, tracked_objects, loiter_ids, abandoned_bags, conflict_flag, pair_scores=None):
-        persons = [o for o in tracked_objects if o["class"] == config.PERSON]
+        persons = [o for o in tracked_objects if o["class"] == self.cfg.PERSON]
         pair_scores = pair_scores or {}
 
         # Build per-person fight score from pair_scores:
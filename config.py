@@ -23,6 +23,14 @@ WINDOW_HEIGHT = 800
 # Scale factor applied ONLY to display (not detection)
 DISPLAY_SCALE = 1.6  # 1.0 = original, 1.5 = 150%, etc.
 
+# GUI rendering runs on its own thread (utils/renderer.py): at most this many
+# composed frames per second (0 = as fast as results arrive). With skip-under-load
+# a result that is not rendered before the next one arrives is skipped (the alert
+# state machine still sees every result); False renders every result, and offline
+# playback is slowed down to the renderer's pace instead.
+RENDER_TARGET_FPS = 30
+RENDER_SKIP_UNDER_LOAD = True
+
 # Video control step for seeking in playback mode.
 SEEK_STEP_SECONDS = 5
 
@@ -31,23 +39,121 @@ BOX_THICKNESS = 2
 FONT_SCALE = 0.7
 FONT_THICKNESS = 2
 
+# Processed video export (utils/video_writer.py), encoded off the render thread.
+# Backend: "ffmpeg" (libx264 subprocess), "opencv" (cv2.VideoWriter) or "auto" (ffmpeg if on PATH).
+VIDEO_EXPORT_BACKEND = "auto"
+VIDEO_EXPORT_PRESET = "veryfast"   # ffmpeg only
+VIDEO_EXPORT_CRF = 23              # ffmpeg only: lower = better quality, bigger file
+VIDEO_EXPORT_SIZE = None           # None = native composite resolution, or (width, height)
+VIDEO_EXPORT_QUEUE_SIZE = 16       # frames buffered ahead of the encoder
+VIDEO_EXPORT_FULL = True           # False = no full-session video, only the alert clips below
+VIDEO_EXPORT_BLOCK = False         # full buffer: False = drop the frame, True = wait (backpressure)
+
+# Alert clips (utils/clip_recorder.py): the seconds around each CONFLICT / ABANDONED alert,
+# cut from an in-memory ring of JPEG-compressed rendered frames
+ALERT_CLIPS = True
+CLIP_DIR = "saves/clips"
+CLIP_PRE_SECONDS = 5.0
+CLIP_POST_SECONDS = 5.0
+CLIP_MEMORY_BUDGET_MB = 200        # cap on the pre-event ring (~60 KB per frame at quality 85)
+CLIP_JPEG_QUALITY = 85
+
 # Auto-save configuration
 SAVE_FRAMES = False
 SAVE_CONFIDENCE = 0.5
-MOVEMENT_THRESHOLD = 30  # pixels
+
+# Snapshot writer (utils/snapshot_writer.py): SAVE_FRAMES snapshots go to saves/YYYY-MM-DD/
+SNAPSHOT_WORKERS = 2
+SNAPSHOT_QUEUE_SIZE = 16           # frames waiting for the workers; further snapshots are dropped
+SNAPSHOT_BATCH_SIZE = 4            # snapshots a worker takes off the queue at once
+SNAPSHOT_TRACK_INTERVAL = 0.5      # seconds between snapshots of the same track
+SNAPSHOT_HASH_DISTANCE = 4         # dHash bits: snapshots this close to a recent one are duplicates
+SNAPSHOT_JPEG_QUALITY = 90
+
+# Headless mode (--headless): per-track score records every N seconds of video
+SCORE_EVENT_INTERVAL = 1.0
+
+# Detection cache (--cache): tracked detections per video + model/detection config,
+# replayed into the behavior layer without inference (detection/cache.py)
+DETECTION_CACHE = False
+DETECTION_CACHE_DIR = "saves/detection_cache"
+# Threshold sweep (python -m offline.sweep): seconds a predicted event may fall
+# outside a labeled interval and still count as a hit
+SWEEP_MATCH_TOLERANCE = 2.0
+
+# Chunked headless mode (--headless --jobs N): one process per video segment
+CHUNK_SECONDS = 600                # segment length
+CHUNK_WARMUP_SECONDS = 10          # extra lead-in per segment to prime tracker + behavior timers
+CHUNK_ID_MATCH_IOU = 0.5           # box overlap to carry a track id across a segment boundary
 
 MODEL_PATH = "yolov8n-pose.pt"  # pose model — gives keypoints for accurate conflict detection
-                                 # export with: YOLO("yolov8n-pose.pt").export(format="onnx", imgsz=320)
-                                 # then switch to "yolov8n-pose.onnx" for faster CPU inference
+                                 # export with: python export_model.py (FP32 + calibrated INT8 + report)
+                                 # then switch to "yolov8n-pose.onnx" / "yolov8n-pose-int8.onnx"
+                                 # for faster CPU inference
 
 CONFIDENCE = 0.2
 IOU_THRESHOLD = 0.5
 IMG_SIZE = 320  # reduced from 416 for CPU performance (~40% faster inference)
 
+# Inference backend: "torch" (ultralytics), "onnxruntime", or "auto"
+# ("auto" = onnxruntime for .onnx models, torch otherwise). Overridable with --backend.
+INFERENCE_BACKEND = "auto"
+
+# ONNX Runtime session settings (onnxruntime backend only)
+ORT_INTRA_OP_THREADS = 0           # 0 = let ONNX Runtime pick (one per physical core)
+ORT_GRAPH_OPTIMIZATION = "all"     # "disable", "basic", "extended", "all"
+ORT_PROVIDERS = ["CPUExecutionProvider"]  # e.g. ["OpenVINOExecutionProvider", "CPUExecutionProvider"]
+ORT_WARMUP_RUNS = 2                # dummy passes at session creation for stable first-frame latency
+
+# Multi-process inference (0 = run the model in-process)
+INFERENCE_WORKERS = 0
+INFERENCE_WORKER_THREADS = 1       # intra-op threads per worker process
+INFERENCE_WORKER_START_TIMEOUT = 120  # seconds to wait for each worker to load its model
+FRAME_RING_SLOTS = 8               # shared-memory frame slots (= max frames in flight)
+
 # Frame skipping: run full detection every N frames; intermediate frames reuse last result.
 # N=1 = no skipping. N=2 roughly doubles display FPS on CPU (10 FPS detect → ~17 FPS display).
 DETECT_EVERY_N = 1
 
+# Tracker (detection/tracker.py, ByteTrack) — one instance per stream
+TRACK_HIGH_THRESH = 0.25   # first association pass: detections at or above this score
+TRACK_LOW_THRESH = 0.1     # second pass recovers occluded tracks with low-score detections
+NEW_TRACK_THRESH = 0.25    # minimum score to start a new track
+TRACK_BUFFER = 30          # frames a lost track is kept for re-identification
+TRACK_MATCH_THRESH = 0.8   # max (1 - IoU) cost accepted in the first pass
+TRACK_FUSE_SCORE = True    # weight IoU by detection score in the first pass
+TRACK_FRAME_RATE = 30
+
+# Adaptive detection scheduling (detection/scheduler.py). DETECT_EVERY_N stays the
+# fastest cadence; static or empty scenes are detected far less often.
+ADAPTIVE_DETECTION = True
+MOTION_GATE_WIDTH = 160        # px — frame is downscaled to this width for the motion diff
+MOTION_PIXEL_DELTA = 25        # grey-level change for a pixel to count as moving
+MOTION_AREA_RATIO = 0.002      # fraction of moving pixels that counts as scene motion
+STATIC_DETECT_EVERY_N = 5      # people in view but static scene → refresh every N frames
+IDLE_AFTER_SECONDS = 5.0       # no person tracked for this long → idle cadence
+IDLE_DETECT_EVERY_N = 15       # idle heartbeat (empty + static scene)
+
+# Skipped frames: extrapolate boxes/keypoints with a per-track constant-velocity
+# model (detection/propagation.py) instead of re-using the frozen last result.
+PROPAGATE_SKIPPED_FRAMES = True
+PROPAGATION_VELOCITY_ALPHA = 0.6   # EMA weight of the newest velocity measurement
+PROPAGATION_MAX_SECONDS = 0.5      # never extrapolate further than this past the last detection
+
+# Staged analysis pipeline (capture → preprocess → inference → behavior → display).
+# One worker thread per stage with a bounded queue after each stage. Drop policies:
+# "block" (backpressure), "drop_oldest" (keep freshest), "drop_newest".
+PIPELINE_QUEUE_SIZE = 4
+PIPELINE_RESULT_QUEUE_SIZE = 8     # behavior → display loop (drained every iteration; rendering is decoupled)
+PIPELINE_DROP_POLICIES = {
+    "capture":    "block",         # offline: never skip frames (live mode forces "drop_oldest")
+    "preprocess": "block",
+    "inference":  "block",
+    "behavior":   "drop_oldest",   # display always gets the freshest result
+}
+# Live mode: a grabber thread drains the camera and only the newest frame is processed
+LIVE_GRAB_LATEST_FRAME = True
+
 # Classes (COCO indices)
 PERSON = 0
 BACKPACK = 24
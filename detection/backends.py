@@ -0,0 +1,270 @@
+"""
+Inference backends behind Detector.
+
+Every backend turns a list of BGR frames into a list of FrameDetections
+(plain NumPy arrays, not yet tracked). Tracking stays in Detector so the
+same per-stream trackers are used whichever runtime produced the boxes.
+"""
+import ast
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+import config
+
+# xyxy (N, 4) float32, conf (N,), cls (N,) int,
+# kp_xy (N, 17, 2) / kp_conf (N, 17) for pose models, None otherwise
+FrameDetections = namedtuple("FrameDetections", ["xyxy", "conf", "cls", "kp_xy", "kp_conf"])
+
+_MAX_DET = 300
+_MAX_WH = 7680  # class offset for class-aware NMS (same trick ultralytics uses)
+_LETTERBOX_COLOR = (114, 114, 114)
+
+
+class TorchBackend:
+    """Ultralytics YOLO (.pt, or any format ultralytics can load itself)."""
+
+    name = "torch"
+
+    def __init__(self, model_path):
+        # Imported here so ONNX Runtime deployments never load torch.
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+        # fuse() only applies to PyTorch models
+        if not str(model_path).endswith(".onnx"):
+            self.model.fuse()
+        self.names = self.model.names
+        self.is_pose = self.model.task == "pose"
+
+    def predict(self, frames, classes):
+        results = self.model.predict(
+            list(frames),
+            imgsz=config.IMG_SIZE,
+            conf=config.CONFIDENCE,
+            iou=config.IOU_THRESHOLD,
+            classes=classes,
+            verbose=False,
+        )
+        return [self._to_detections(r) for r in results]
+
+    @staticmethod
+    def _to_detections(result):
+        boxes = result.boxes
+        kp_xy = None
+        kp_conf = None
+        if result.keypoints is not None and result.keypoints.conf is not None:
+            kp_xy   = result.keypoints.xy.cpu().numpy()
+            kp_conf = result.keypoints.conf.cpu().numpy()
+        return FrameDetections(
+            xyxy=boxes.xyxy.cpu().numpy(),
+            conf=boxes.conf.cpu().numpy(),
+            cls=boxes.cls.cpu().numpy().astype(int),
+            kp_xy=kp_xy,
+            kp_conf=kp_conf,
+        )
+
+
+# Sessions are shared between Detector instances that load the same model
+# with the same settings (one per stream, batch runners, ...).
+_SESSION_CACHE = {}
+
+
+class OnnxRuntimeBackend:
+    """
+    YOLOv8 ONNX export (detect or pose) run directly on an ONNX Runtime
+    session. Pre/post-processing (letterbox, decode, NMS) is done with
+    OpenCV + NumPy so neither torch nor ultralytics is imported.
+    """
+
+    name = "onnxruntime"
+
+    _GRAPH_OPT_LEVELS = {
+        "disable":  "ORT_DISABLE_ALL",
+        "basic":    "ORT_ENABLE_BASIC",
+        "extended": "ORT_ENABLE_EXTENDED",
+        "all":      "ORT_ENABLE_ALL",
+    }
+
+    def __init__(self, model_path):
+        self.session = self._get_session(str(model_path))
+
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        # Static exports have int dims; dynamic ones have symbolic names.
+        self.fixed_batch = inp.shape[0] if isinstance(inp.shape[0], int) else None
+        self.imgsz = inp.shape[2] if isinstance(inp.shape[2], int) else config.IMG_SIZE
+
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(meta["names"]) if "names" in meta else {0: "person"}
+        kpt_shape = ast.literal_eval(meta["kpt_shape"]) if "kpt_shape" in meta else None
+        self.num_kpts = kpt_shape[0] if kpt_shape else 0
+        self.kpt_dims = kpt_shape[1] if kpt_shape else 0
+        self.is_pose = self.num_kpts > 0
+
+    def _get_session(self, model_path):
+        import onnxruntime as ort
+
+        key = (model_path, config.ORT_INTRA_OP_THREADS,
+               config.ORT_GRAPH_OPTIMIZATION, tuple(config.ORT_PROVIDERS))
+        session = _SESSION_CACHE.get(key)
+        if session is not None:
+            return session
+
+        opts = ort.SessionOptions()
+        if config.ORT_INTRA_OP_THREADS > 0:
+            opts.intra_op_num_threads = config.ORT_INTRA_OP_THREADS
+        # One model graph, run sequentially — inter-op threads only add jitter
+        opts.inter_op_num_threads = 1
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        level = self._GRAPH_OPT_LEVELS[config.ORT_GRAPH_OPTIMIZATION]
+        opts.graph_optimization_level = getattr(ort.GraphOptimizationLevel, level)
+
+        session = ort.InferenceSession(model_path, sess_options=opts,
+                                       providers=list(config.ORT_PROVIDERS))
+        _SESSION_CACHE[key] = session
+        self._warmup(session)
+        return session
+
+    @staticmethod
+    def _warmup(session):
+        """Run a few dummy passes so the first real frame doesn't pay for allocator/kernel setup."""
+        inp = session.get_inputs()[0]
+        shape = [d if isinstance(d, int) else (1 if i == 0 else config.IMG_SIZE)
+                 for i, d in enumerate(inp.shape)]
+        dummy = np.zeros(shape, dtype=np.float32)
+        for _ in range(config.ORT_WARMUP_RUNS):
+            session.run(None, {inp.name: dummy})
+
+    def _letterbox(self, frame):
+        h, w = frame.shape[:2]
+        s = self.imgsz
+        gain = min(s / h, s / w)
+        new_w, new_h = int(round(w * gain)), int(round(h * gain))
+        pad_x = (s - new_w) / 2
+        pad_y = (s - new_h) / 2
+
+        if (new_w, new_h) != (w, h):
+            frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+        left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+        img = cv2.copyMakeBorder(frame, top, bottom, left, right,
+                                 cv2.BORDER_CONSTANT, value=_LETTERBOX_COLOR)
+        return img, gain, (left, top)
+
+    def preprocess(self, frames):
+        """Letterbox + BGR→RGB + /255 + NCHW. Returns (blob, [(gain, pad), ...])."""
+        imgs = []
+        meta = []
+        for frame in frames:
+            img, gain, pad = self._letterbox(frame)
+            imgs.append(img)
+            meta.append((gain, pad))
+        blob = cv2.dnn.blobFromImages(imgs, scalefactor=1.0 / 255, swapRB=True)
+        return blob, meta
+
+    def predict(self, frames, classes):
+        frames = list(frames)
+        if not frames:
+            return []
+        blob, meta = self.preprocess(frames)
+
+        if self.fixed_batch == 1 and len(frames) > 1:
+            outputs = np.concatenate(
+                [self.session.run(None, {self.input_name: blob[i:i + 1]})[0]
+                 for i in range(len(frames))], axis=0)
+        else:
+            outputs = self.session.run(None, {self.input_name: blob})[0]
+
+        return [
+            self._postprocess(outputs[i], frame.shape[:2], gain, pad, classes)
+            for i, (frame, (gain, pad)) in enumerate(zip(frames, meta))
+        ]
+
+    def _postprocess(self, output, frame_shape, gain, pad, classes):
+        # output: (4 + nc + nk*kd, anchors) → one row per anchor
+        pred = output.T
+        nc = pred.shape[1] - 4 - self.num_kpts * self.kpt_dims
+        cls_scores = pred[:, 4:4 + nc]
+        conf = cls_scores.max(axis=1)
+        cls = cls_scores.argmax(axis=1)
+
+        keep = conf > config.CONFIDENCE
+        if classes is not None:
+            keep &= np.isin(cls, classes)
+        pred, conf, cls = pred[keep], conf[keep], cls[keep]
+
+        cx, cy, bw, bh = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+        xyxy = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+
+        order = _nms(xyxy + (cls[:, None] * _MAX_WH), conf, config.IOU_THRESHOLD)[:_MAX_DET]
+        xyxy, conf, cls, pred = xyxy[order], conf[order], cls[order], pred[order]
+
+        h, w = frame_shape
+        pad_x, pad_y = pad
+        xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad_x) / gain).clip(0, w)
+        xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad_y) / gain).clip(0, h)
+
+        kp_xy = None
+        kp_conf = None
+        if self.is_pose:
+            kpts = pred[:, 4 + nc:].reshape(len(pred), self.num_kpts, self.kpt_dims)
+            kp_xy = np.empty((len(pred), self.num_kpts, 2), dtype=np.float32)
+            kp_xy[..., 0] = (kpts[..., 0] - pad_x) / gain
+            kp_xy[..., 1] = (kpts[..., 1] - pad_y) / gain
+            if self.kpt_dims == 3:
+                kp_conf = kpts[..., 2].astype(np.float32)
+            else:
+                kp_conf = np.ones((len(pred), self.num_kpts), dtype=np.float32)
+
+        return FrameDetections(
+            xyxy=xyxy.astype(np.float32),
+            conf=conf.astype(np.float32),
+            cls=cls.astype(int),
+            kp_xy=kp_xy,
+            kp_conf=kp_conf,
+        )
+
+
+def _nms(boxes, scores, iou_threshold):
+    """Greedy NMS over (N, 4) xyxy boxes. Returns kept indices, best score first."""
+    order = scores.argsort()[::-1]
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        iw = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        ih = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = iw * ih
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=int)
+
+
+BACKENDS = {
+    TorchBackend.name:       TorchBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+}
+
+
+def resolve_backend_name(name, model_path):
+    """"auto" → ONNX Runtime for .onnx files, torch otherwise; other names unchanged."""
+    if name == "auto":
+        return OnnxRuntimeBackend.name if str(model_path).endswith(".onnx") else TorchBackend.name
+    return name
+
+
+def create_backend(name, model_path):
+    """
+    Build the inference backend called `name` ("torch", "onnxruntime" or
+    "auto" — ONNX Runtime for .onnx files, torch otherwise).
+    """
+    name = resolve_backend_name(name, model_path)
+    if name not in BACKENDS:
+        raise ValueError(f"Invalid INFERENCE_BACKEND: {name}")
+    return BACKENDS[name](model_path)
@@ -0,0 +1,156 @@
+"""
+On-disk cache of tracked detections, for replaying a video into the behavior
+layer without decoding or running the model again.
+
+One .npz file per (video content, model, detection/tracking/scheduling
+settings). It stores, for every frame, its timestamp and — on frames the
+scheduler sent to the detector — the parse_tracked_objects() arrays (ids,
+boxes, classes, confidences, keypoints). Skipped frames are stored as
+skipped: on replay they are coasted/propagated by FrameAnalyzer exactly as
+in a live run, so propagation settings can change without invalidating the
+cache. Behavior thresholds are not part of the key; tuning them is what the
+cache is for.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import config
+from detection.backends import resolve_backend_name
+from detection.detections import Detections
+
+# Settings that change which boxes/ids come out of the inference stage
+KEY_SETTINGS = (
+    "IMG_SIZE", "CONFIDENCE", "IOU_THRESHOLD", "DETECTION_CLASSES", "FRAME_WIDTH", "FRAME_HEIGHT",
+    "TRACK_HIGH_THRESH", "TRACK_LOW_THRESH", "NEW_TRACK_THRESH", "TRACK_BUFFER",
+    "TRACK_MATCH_THRESH", "TRACK_FUSE_SCORE", "TRACK_FRAME_RATE",
+    "DETECT_EVERY_N", "ADAPTIVE_DETECTION", "MOTION_GATE_WIDTH", "MOTION_PIXEL_DELTA",
+    "MOTION_AREA_RATIO", "STATIC_DETECT_EVERY_N", "IDLE_AFTER_SECONDS", "IDLE_DETECT_EVERY_N",
+)
+
+_HASH_BLOCK = 4 * 1024 * 1024
+
+
+def video_fingerprint(path):
+    """
+    Content hash of a video file: size plus 4 MB blocks from the start, middle
+    and end. Re-encoded or edited files change it; a renamed or copied file
+    does not. Hashing every byte of multi-GB footage would cost more than a
+    short replay.
+    """
+    # An int would be taken as a file descriptor (camera index 0 → stdin)
+    if not isinstance(path, (str, bytes, os.PathLike)):
+        raise TypeError(f"video_fingerprint needs a file path, got {type(path).__name__}: {path!r}")
+    size = os.path.getsize(path)
+    h = hashlib.sha1(str(size).encode())
+    with open(path, "rb") as f:
+        for offset in sorted({0, max(0, size // 2 - _HASH_BLOCK // 2), max(0, size - _HASH_BLOCK)}):
+            f.seek(offset)
+            h.update(f.read(_HASH_BLOCK))
+    return h.hexdigest()
+
+
+class DetectionRecorder:
+    """Collects one run's per-frame inference output (see FrameAnalyzer.apply_tracked)."""
+
+    def __init__(self):
+        self.timestamps = []
+        self.frames = []      # Detections, or None for frames the scheduler skipped
+        self.names = {}
+
+    def record(self, timestamp, tracked_objects):
+        self.timestamps.append(timestamp)
+        self.frames.append(tracked_objects)
+        if tracked_objects is not None and tracked_objects.names:
+            self.names = tracked_objects.names
+
+
+class CachedRun:
+    """Replayable frames of one cache entry: iterate → (frame_index, timestamp, Detections or None)."""
+
+    def __init__(self, data):
+        self.timestamps = data["timestamps"]
+        self.detected = data["detected"]
+        self._offsets = np.concatenate([[0], np.cumsum(data["counts"])])
+        self._data = data
+        self.names = {int(k): v for k, v in json.loads(str(data["names"])).items()}
+        self.has_keypoints = "kp_xy" in data
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self):
+        d = self._data
+        for i, ts in enumerate(self.timestamps):
+            if not self.detected[i]:
+                yield i, float(ts), None
+                continue
+            a, b = self._offsets[i], self._offsets[i + 1]
+            keypoints = self.has_keypoints and b > a
+            yield i, float(ts), Detections(
+                d["ids"][a:b], d["xyxy"][a:b], d["cls"][a:b], d["conf"][a:b],
+                kp_xy=d["kp_xy"][a:b] if keypoints else None,
+                kp_conf=d["kp_conf"][a:b] if keypoints else None,
+                names=self.names,
+            )
+
+
+def load_cached_run(path):
+    with np.load(path) as npz:
+        return CachedRun({name: npz[name] for name in npz.files})
+
+
+class DetectionCache:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or config.DETECTION_CACHE_DIR
+
+    def key(self, source, model_path=None, backend=None):
+        """Cache key of `source` analyzed with this model/backend and the current config."""
+        model_path = model_path or config.MODEL_PATH
+        settings = {name: getattr(config, name) for name in KEY_SETTINGS}
+        settings["model"] = os.path.abspath(model_path)
+        settings["backend"] = resolve_backend_name(backend or config.INFERENCE_BACKEND, model_path)
+        blob = json.dumps([video_fingerprint(source), settings], sort_keys=True)
+        return hashlib.sha1(blob.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def load(self, key):
+        """CachedRun for `key`, or None on a miss (or an unreadable entry)."""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return load_cached_run(path)
+        except Exception as e:
+            print(f"[Cache Error] ignoring unreadable entry {path}: {e!r}")
+            return None
+
+    def save(self, key, recorder):
+        detected = [d for d in recorder.frames if d is not None]
+        arrays = {
+            "timestamps": np.asarray(recorder.timestamps, dtype=np.float64),
+            "detected": np.array([d is not None for d in recorder.frames], dtype=bool),
+            "counts": np.array([len(d) if d is not None else 0 for d in recorder.frames], dtype=np.int64),
+            "names": np.array(json.dumps({str(k): v for k, v in recorder.names.items()})),
+            "ids": np.concatenate([d.ids for d in detected]) if detected else np.empty(0, dtype=int),
+            "xyxy": np.concatenate([d.xyxy for d in detected]) if detected else np.empty((0, 4), np.float32),
+            "cls": np.concatenate([d.cls for d in detected]) if detected else np.empty(0, dtype=int),
+            "conf": np.concatenate([d.conf for d in detected]) if detected else np.empty(0, np.float32),
+        }
+        # Pose model: frames without tracks carry no keypoint arrays at all
+        with_kp = [d for d in detected if d.kp_xy is not None]
+        if with_kp:
+            arrays["kp_xy"] = np.concatenate([d.kp_xy for d in with_kp])
+            arrays["kp_conf"] = np.concatenate([d.kp_conf for d in with_kp])
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(key)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+        return path
@@ -0,0 +1,150 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+class Detections:
+    """
+    Structure-of-arrays container for one frame's tracked objects.
+
+    All per-object data lives in contiguous NumPy arrays (ids, xyxy, cls,
+    conf, kp_xy, kp_conf) plus precomputed box centers and areas, so
+    behavior code can work on whole columns at once. Iterating (or indexing
+    with an int) yields DetectionView rows that behave like the old per-object
+    dicts, for callers that still want `obj["bbox"]` style access. Views are
+    created lazily on first use and cached, so values written into a view
+    (e.g. `_smooth_kp` from ConflictDetector) stay attached to that row.
+    """
+
+    def __init__(self, ids, xyxy, cls, conf, kp_xy=None, kp_conf=None,
+                 names=None, propagated=False):
+        self.ids     = np.asarray(ids, dtype=int)
+        self.xyxy    = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.cls     = np.asarray(cls, dtype=int)
+        self.conf    = np.asarray(conf, dtype=np.float32)
+        self.kp_xy   = kp_xy      # (N, 17, 2) float32, or None (detection model)
+        self.kp_conf = kp_conf    # (N, 17) float32, or None
+        self.names   = names if names is not None else {}
+        self.propagated = propagated
+
+        x1, y1, x2, y2 = self.xyxy[:, 0], self.xyxy[:, 1], self.xyxy[:, 2], self.xyxy[:, 3]
+        self.centers = np.stack([(x1 + x2) / 2, (y1 + y2) / 2], axis=1)   # (N, 2)
+        self.areas   = (x2 - x1) * (y2 - y1)                              # (N,)
+        self._views  = None
+
+    @classmethod
+    def empty(cls, names=None):
+        return cls(np.empty(0, dtype=int), np.empty((0, 4), dtype=np.float32),
+                   np.empty(0, dtype=int), np.empty(0, dtype=np.float32), names=names)
+
+    @classmethod
+    def from_dicts(cls, objects, names=None):
+        """Build the container from per-object dicts with the DetectionView keys (id, bbox, class, conf, ...)."""
+        objects = list(objects)
+        if not objects:
+            return cls.empty(names)
+        if isinstance(objects[0], DetectionView) and all(o._dets is objects[0]._dets for o in objects):
+            source = objects[0]._dets
+            return source.select(np.array([o._i for o in objects], dtype=int))
+        has_kp = all(o.get("keypoints") is not None for o in objects)
+        if names is None:
+            names = {int(o["class"]): o["name"] for o in objects if "name" in o}
+        return cls(
+            [o["id"] for o in objects], [o["bbox"] for o in objects],
+            [o["class"] for o in objects], [o.get("conf", 1.0) for o in objects],
+            kp_xy=np.asarray([o["keypoints"] for o in objects], dtype=np.float32) if has_kp else None,
+            kp_conf=np.asarray([o["kp_conf"] for o in objects], dtype=np.float32)
+            if has_kp and all(o.get("kp_conf") is not None for o in objects) else None,
+            names=names,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def __getitem__(self, i):
+        return self.views[i]
+
+    @property
+    def views(self):
+        if self._views is None:
+            self._views = [DetectionView(self, i) for i in range(len(self.ids))]
+        return self._views
+
+    def select(self, mask):
+        """New Detections holding only the rows where `mask` is true (or the given indices)."""
+        return Detections(
+            self.ids[mask], self.xyxy[mask], self.cls[mask], self.conf[mask],
+            kp_xy=self.kp_xy[mask] if self.kp_xy is not None else None,
+            kp_conf=self.kp_conf[mask] if self.kp_conf is not None else None,
+            names=self.names, propagated=self.propagated,
+        )
+
+
+class DetectionView(MutableMapping):
+    """
+    Dict-like row of a Detections container. Core keys are read straight from
+    the parent arrays; any other key written to the view is kept on the view.
+    """
+
+    __slots__ = ("_dets", "_i", "_extra")
+
+    _CORE_KEYS = ("id", "class", "bbox", "conf", "name", "keypoints", "kp_conf",
+                  "center", "area", "propagated")
+
+    def __init__(self, dets, i):
+        self._dets = dets
+        self._i = i
+        self._extra = {}
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        d, i = self._dets, self._i
+        if key == "id":
+            return d.ids[i]
+        if key == "class":
+            return d.cls[i]
+        if key == "bbox":
+            x1, y1, x2, y2 = d.xyxy[i]
+            return (x1, y1, x2, y2)
+        if key == "conf":
+            return float(d.conf[i])
+        if key == "name":
+            return d.names.get(d.cls[i], str(d.cls[i]))
+        if key == "keypoints":
+            return d.kp_xy[i] if d.kp_xy is not None else None      # (17, 2)
+        if key == "kp_conf":
+            return d.kp_conf[i] if d.kp_conf is not None else None  # (17,)
+        if key == "center":
+            return (d.centers[i, 0], d.centers[i, 1])
+        if key == "area":
+            return d.areas[i]
+        if key == "propagated":
+            return d.propagated
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        del self._extra[key]
+
+    def __iter__(self):
+        yield from self._CORE_KEYS
+        for key in self._extra:
+            if key not in self._CORE_KEYS:
+                yield key
+
+    def __len__(self):
+        return len(self._CORE_KEYS) + sum(1 for k in self._extra if k not in self._CORE_KEYS)
+
+    # Rows are entities, not values: compare/hash by identity like the old dicts
+    # were used (`other is obj`), and never compare keypoint arrays elementwise.
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"DetectionView(id={self['id']}, class={self['class']}, bbox={self['bbox']})"
@@ -1,65 +1,109 @@
-from ultralytics import YOLO
+from collections import namedtuple
+
 import numpy as np
 import config
+from detection.backends import create_backend
+from detection.detections import Detections
+from detection.tracker import ByteTracker
+
+# Output of Detector.track(): detections that survived tracking, with track ids
+TrackedFrame = namedtuple("TrackedFrame", ["ids", "xyxy", "cls", "conf", "kp_xy", "kp_conf"])
 
 
 class Detector:
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, backend=None):
         if model_path is None:
             model_path = config.MODEL_PATH
+        if backend is None:
+            backend = config.INFERENCE_BACKEND
         self.model_path = str(model_path)
-        self.model = YOLO(model_path)
-        self.is_pose = "pose" in self.model_path
-        # fuse() only applies to PyTorch models
-        if not self.model_path.endswith(".onnx"):
-            self.model.fuse()
+        # Either a backend name or a ready backend object (e.g. InferenceProcessPool)
+        if isinstance(backend, str):
+            backend = create_backend(backend, self.model_path)
+        self.backend = backend
+        self.names = self.backend.names
+        self.is_pose = self.backend.is_pose
         # Pose model only detects persons; detection model uses full class list
         self._classes = [config.PERSON] if self.is_pose else config.DETECTION_CLASSES
+        # One ByteTracker instance per stream; detect() uses stream 0
+        self._stream_trackers = {}
 
-    def detect(self, frame):
-        results = self.model.track(
-            frame,
-            imgsz=config.IMG_SIZE,
-            conf=config.CONFIDENCE,
-            iou=config.IOU_THRESHOLD,
-            classes=self._classes,
-            persist=True,
-            tracker="bytetrack.yaml",
-            verbose=False,
-        )
-        return results[0]
+    def detect(self, frame, stream_id=0):
+        return self.track(stream_id, self.predict(frame))
+
+    def predict(self, frame):
+        """Untracked FrameDetections for one frame."""
+        return self.backend.predict([frame], self._classes)[0]
 
-    def parse_tracked_objects(self, results):
+    def submit(self, frame):
         """
-        Extract tracked objects + keypoints (when pose model) from a results object.
-        Returns a list of dicts ready for behavior detectors.
+        Queue a frame on an asynchronous backend (InferenceProcessPool).
+        Returns a ticket; backend.result(ticket) gives its FrameDetections.
         """
-        boxes = results.boxes
-        if boxes.id is None:
+        return self.backend.submit(frame, self._classes)
+
+    def detect_batch(self, frames, stream_ids):
+        """
+        Run a single forward pass over a stack of frames (several cameras, or
+        consecutive frames of one video) and track each frame with the tracker
+        owned by its stream. Frames of the same stream must appear in capture
+        order. Returns one parse_tracked_objects() list per input frame.
+        """
+        if len(frames) != len(stream_ids):
+            raise ValueError("frames and stream_ids must have the same length")
+        if not frames:
             return []
 
-        ids         = boxes.id.cpu().numpy().astype(int)
-        xyxy        = boxes.xyxy.cpu().numpy()
-        classes     = boxes.cls.cpu().numpy().astype(int)
-        confidences = boxes.conf.cpu().numpy()
+        batch_detections = self.backend.predict(frames, self._classes)
+        return [
+            self.parse_tracked_objects(self.track(stream_id, detections))
+            for stream_id, detections in zip(stream_ids, batch_detections)
+        ]
 
-        # Keypoints: shape (N, 17, 2) and (N, 17) — only present for pose model
-        kp_xy   = None
-        kp_conf = None
-        if self.is_pose and results.keypoints is not None:
-            kp_xy   = results.keypoints.xy.cpu().numpy()    # (N, 17, 2)
-            kp_conf = results.keypoints.conf.cpu().numpy()  # (N, 17)
+    def track(self, stream_id, detections):
+        """Associate one frame's FrameDetections with the stream's existing tracks."""
+        tracks = self._stream_tracker(stream_id).update(detections)
+        if len(tracks) == 0:
+            return TrackedFrame(
+                ids=np.empty(0, dtype=int), xyxy=np.empty((0, 4), dtype=np.float32),
+                cls=np.empty(0, dtype=int), conf=np.empty(0, dtype=np.float32),
+                kp_xy=None, kp_conf=None,
+            )
 
-        objects = []
-        for i in range(len(ids)):
-            x1, y1, x2, y2 = xyxy[i]
-            objects.append({
-                "id":        ids[i],
-                "class":     classes[i],
-                "bbox":      (x1, y1, x2, y2),
-                "conf":      float(confidences[i]),
-                "name":      results.names[classes[i]],
-                "keypoints": kp_xy[i]   if kp_xy   is not None else None,  # (17, 2)
-                "kp_conf":   kp_conf[i] if kp_conf is not None else None,  # (17,)
-            })
-        return objects
+        # Tracks rows: x1, y1, x2, y2, track_id, score, cls, det_index
+        idx = tracks[:, -1].astype(int)
+        return TrackedFrame(
+            ids=tracks[:, 4].astype(int),
+            xyxy=tracks[:, :4].astype(np.float32),
+            cls=tracks[:, 6].astype(int),
+            conf=tracks[:, 5].astype(np.float32),
+            kp_xy=detections.kp_xy[idx] if detections.kp_xy is not None else None,
+            kp_conf=detections.kp_conf[idx] if detections.kp_conf is not None else None,
+        )
+
+    def coast(self, stream_id=0):
+        """Advance the stream's tracker over a frame the detector skipped."""
+        self._stream_tracker(stream_id).coast()
+
+    def _stream_tracker(self, stream_id):
+        if stream_id not in self._stream_trackers:
+            self._stream_trackers[stream_id] = ByteTracker()
+        return self._stream_trackers[stream_id]
+
+    def reset_stream(self, stream_id):
+        """Drop the tracker state of one stream (e.g. after a seek jump)."""
+        self._stream_trackers.pop(stream_id, None)
+
+    def parse_tracked_objects(self, tracked):
+        """
+        Wrap a TrackedFrame (ids + boxes + keypoints when pose model) in a
+        Detections container ready for behavior detectors. No per-object work
+        happens here; rows are materialized lazily when iterated.
+        """
+        return Detections(
+            tracked.ids, tracked.xyxy, tracked.cls, tracked.conf,
+            # Keypoints: shape (N, 17, 2) and (N, 17) — only present for pose model
+            kp_xy=tracked.kp_xy if self.is_pose else None,
+            kp_conf=tracked.kp_conf if self.is_pose else None,
+            names=self.names,
+        )
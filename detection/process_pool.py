@@ -0,0 +1,208 @@
+"""
+Inference in a pool of worker processes.
+
+Frames travel through a SharedFrameRing (no pickling); each worker holds its
+own backend and returns only the compact FrameDetections arrays. Tracking
+stays in the coordinating process, so frames of one stream may be inferred
+by any worker while track ids remain consistent.
+
+The pool implements the backend interface (names, is_pose, predict), so it
+can be handed straight to Detector(backend=pool), plus an asynchronous
+submit()/result() API that lets a pipeline keep several frames in flight.
+
+Each worker has its own task queue and submit() hands a frame to the live
+worker with the fewest frames in flight, so the pool always knows which
+tickets a worker holds: if it reports a fatal error or dies (OOM, SIGKILL),
+those tickets fail with a RuntimeError and their ring slots are released.
+"""
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+import config
+from utils.shm_ring import SharedFrameRing
+
+
+def create_worker_backend(backend_name, model_path, threads):
+    """
+    Backend for one of several inference processes, capped at `threads`
+    intra-op threads — N workers × all-core thread pools would oversubscribe the CPU.
+    """
+    from detection.backends import create_backend
+
+    config.ORT_INTRA_OP_THREADS = threads
+    backend = create_backend(backend_name, model_path)
+    if getattr(backend, "name", None) == "torch":
+        import torch
+        torch.set_num_threads(threads)
+    return backend
+
+
+def _worker_main(index, ring_name, slots, shape, model_path, backend_name, threads, task_q, result_q):
+    ring = SharedFrameRing.attach(ring_name, slots, shape)
+    try:
+        backend = create_worker_backend(backend_name, model_path, threads)
+        result_q.put(("ready", backend.name, backend.names, backend.is_pose))
+        while True:
+            task = task_q.get()
+            if task is None:
+                break
+            ticket, slot, classes = task
+            try:
+                detections = backend.predict([ring.frames[slot]], classes)[0]
+                result_q.put(("done", ticket, slot, detections))
+            except Exception as e:
+                result_q.put(("error", ticket, slot, repr(e)))
+    except Exception as e:
+        result_q.put(("fatal", index, repr(e)))
+    finally:
+        ring.frames = None
+        ring.shm.close()
+
+
+class InferenceProcessPool:
+
+    def __init__(self, num_workers=None, model_path=None, backend=None, slots=None):
+        num_workers = num_workers or config.INFERENCE_WORKERS
+        model_path = model_path or config.MODEL_PATH
+        backend = backend or config.INFERENCE_BACKEND
+        slots = slots or config.FRAME_RING_SLOTS
+        shape = (config.FRAME_HEIGHT, config.FRAME_WIDTH, 3)
+
+        self.ring = SharedFrameRing(slots, shape)
+        # spawn: workers start clean instead of inheriting our threads/locks
+        ctx = mp.get_context("spawn")
+        self._task_qs = [ctx.Queue() for _ in range(num_workers)]
+        self._result_q = ctx.Queue()
+        self._workers = [
+            ctx.Process(
+                target=_worker_main,
+                args=(i, self.ring.name, slots, shape, model_path, backend,
+                      config.INFERENCE_WORKER_THREADS, self._task_qs[i], self._result_q),
+                daemon=True,
+            )
+            for i in range(num_workers)
+        ]
+        for w in self._workers:
+            w.start()
+
+        # Every worker reports in once its model is loaded
+        for _ in self._workers:
+            msg = self._result_q.get(timeout=config.INFERENCE_WORKER_START_TIMEOUT)
+            if msg[0] == "fatal":
+                self.close()
+                raise RuntimeError(f"Inference worker failed to start: {msg[2]}")
+            # Reported as the workers' backend so results stay comparable (e.g. detection cache keys)
+            _, self.name, self.names, self.is_pose = msg
+
+        self._tickets = itertools.count()
+        self._results = {}
+        self._discarded = set()
+        self._inflight = {}                    # ticket -> (worker index, ring slot)
+        self._dead = set()                     # indices of workers that failed or exited
+        self._failure = None                   # set once no worker is left
+        self._cond = threading.Condition()
+        self._closed = False
+        self._collector = threading.Thread(target=self._collect, name="pool-collector", daemon=True)
+        self._collector.start()
+
+    def _finish(self, ticket, kind, payload):
+        """Record the outcome of an in-flight ticket and recycle its slot (caller holds _cond)."""
+        entry = self._inflight.pop(ticket, None)
+        if entry is None:
+            return   # already failed along with its worker
+        self.ring.release(entry[1])
+        if ticket in self._discarded:
+            self._discarded.discard(ticket)
+            return
+        self._results[ticket] = (kind, payload)
+
+    def _worker_failed(self, index, reason):
+        """Fail every ticket held by worker `index` (caller holds _cond)."""
+        if index in self._dead:
+            return
+        self._dead.add(index)
+        for ticket, (worker, _) in list(self._inflight.items()):
+            if worker == index:
+                self._finish(ticket, "error", f"worker {index} {reason}")
+        if len(self._dead) == len(self._workers):
+            self._failure = f"All inference workers have exited (last: worker {index} {reason})"
+        self._cond.notify_all()
+
+    def _collect(self):
+        next_check = 0.0
+        while not self._closed:
+            try:
+                msg = self._result_q.get(timeout=0.1)
+            except queue.Empty:
+                msg = None
+            with self._cond:
+                if msg is not None and msg[0] == "fatal":
+                    self._worker_failed(msg[1], f"failed: {msg[2]}")
+                elif msg is not None:
+                    kind, ticket, _, payload = msg
+                    self._finish(ticket, kind, payload)
+                    self._cond.notify_all()
+
+                # Workers killed without a word (OOM killer, SIGKILL)
+                now = time.monotonic()
+                if now >= next_check:
+                    next_check = now + 0.5
+                    for i, w in enumerate(self._workers):
+                        if i not in self._dead and not w.is_alive():
+                            self._worker_failed(i, f"exited (code {w.exitcode})")
+
+    def submit(self, frame, classes):
+        """Copy `frame` into a ring slot and queue it. Returns a ticket for result()."""
+        slot = self.ring.acquire()
+        self.ring.write(slot, frame)
+        ticket = next(self._tickets)
+        with self._cond:
+            if self._failure is not None:
+                self.ring.release(slot)
+                raise RuntimeError(self._failure)
+            loads = {i: 0 for i in range(len(self._workers)) if i not in self._dead}
+            for worker, _ in self._inflight.values():
+                if worker in loads:
+                    loads[worker] += 1
+            worker = min(loads, key=loads.get)
+            self._inflight[ticket] = (worker, slot)
+        self._task_qs[worker].put((ticket, slot, classes))
+        return ticket
+
+    def result(self, ticket, timeout=None):
+        """Block until the FrameDetections for `ticket` are back."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while ticket not in self._results:
+                if ticket not in self._inflight:
+                    raise RuntimeError(self._failure or f"Unknown inference ticket {ticket}")
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"No inference result for ticket {ticket}")
+                self._cond.wait(timeout=0.5)
+            kind, payload = self._results.pop(ticket)
+        if kind == "error":
+            raise RuntimeError(f"Inference worker error: {payload}")
+        return payload
+
+    def discard(self, ticket):
+        """Forget a submitted frame (e.g. made stale by a seek); its slot is still recycled."""
+        with self._cond:
+            if self._results.pop(ticket, None) is None and ticket in self._inflight:
+                self._discarded.add(ticket)
+
+    def predict(self, frames, classes):
+        tickets = [self.submit(frame, classes) for frame in frames]
+        return [self.result(t) for t in tickets]
+
+    def close(self):
+        self._closed = True
+        for task_q in self._task_qs:
+            task_q.put(None)
+        for w in self._workers:
+            w.join(timeout=2)
+            if w.is_alive():
+                w.terminate()
+        self.ring.close()
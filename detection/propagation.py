@@ -0,0 +1,72 @@
+import numpy as np
+import config
+from detection.detections import Detections
+
+
+class TrackPropagator:
+    """
+    Constant-velocity motion model for frames where the detector is skipped.
+
+    On every detected frame observe() updates a per-track velocity (EMA of
+    box-corner and per-keypoint displacement / dt). On skipped frames
+    predict() extrapolates the last detection to the current timestamp, so
+    boxes and keypoints keep moving instead of freezing and velocity-based
+    conflict signals don't see "zero, zero, jump".
+    """
+
+    def __init__(self, cfg=None):
+        self.cfg = cfg if cfg is not None else config
+        self.reset()
+
+    def reset(self):
+        self._last = None        # last detected Detections
+        self._box_vel = None     # (N, 4) row-aligned with self._last
+        self._kp_vel = None      # (N, 17, 2) or None for detection-only models
+        self._time = None
+
+    def observe(self, detections, timestamp):
+        """Record a detected frame and update per-track velocities."""
+        n = len(detections)
+        has_kp = detections.kp_xy is not None
+        box_vel = np.zeros((n, 4), dtype=np.float32)
+        kp_vel = np.zeros_like(detections.kp_xy) if has_kp else None
+
+        prev = self._last
+        dt = timestamp - self._time if self._time is not None else 0.0
+        if n and prev is not None and len(prev) and dt > 0:
+            prev_row = {tid: i for i, tid in enumerate(prev.ids.tolist())}
+            rows = np.array([prev_row.get(tid, -1) for tid in detections.ids.tolist()])
+            cur = np.flatnonzero(rows >= 0)
+            old = rows[cur]
+            alpha = self.cfg.PROPAGATION_VELOCITY_ALPHA
+
+            if len(cur):
+                inst = (detections.xyxy[cur] - prev.xyxy[old]) / dt
+                box_vel[cur] = alpha * inst + (1 - alpha) * self._box_vel[old]
+
+                if has_kp and prev.kp_xy is not None:
+                    inst_kp = (detections.kp_xy[cur] - prev.kp_xy[old]) / dt
+                    # Low-confidence keypoints jump around — don't let them set a velocity
+                    valid = (detections.kp_conf[cur] >= self.cfg.KP_CONF_MIN)[..., None]
+                    blended = alpha * inst_kp + (1 - alpha) * self._kp_vel[old]
+                    kp_vel[cur] = np.where(valid, blended, 0.0)
+
+        self._last = detections
+        self._box_vel = box_vel
+        self._kp_vel = kp_vel
+        self._time = timestamp
+
+    def predict(self, timestamp):
+        """Extrapolate the last detected objects to `timestamp` (new Detections, marked propagated)."""
+        last = self._last
+        if last is None:
+            return Detections.empty()
+
+        dt = min(max(timestamp - self._time, 0.0), self.cfg.PROPAGATION_MAX_SECONDS)
+        return Detections(
+            last.ids, last.xyxy + self._box_vel * dt, last.cls, last.conf,
+            kp_xy=last.kp_xy + self._kp_vel * dt if last.kp_xy is not None else None,
+            kp_conf=last.kp_conf,
+            names=last.names,
+            propagated=True,
+        )
@@ -0,0 +1,99 @@
+import cv2
+import numpy as np
+
+import config
+
+
+class DetectionScheduler:
+    """
+    Decides, frame by frame, whether the detector needs to run.
+
+    - Base cadence: at most every DETECT_EVERY_N frames.
+    - Motion gate: a downscaled grey frame is diffed against the frame of the
+      last detection; static frames are skipped.
+    - Occupancy: people in view but scene static → re-detect every
+      STATIC_DETECT_EVERY_N frames so tracks stay alive. No person tracked for
+      IDLE_AFTER_SECONDS → only an IDLE_DETECT_EVERY_N heartbeat.
+    Motion or people bring it straight back to the base cadence.
+    With ADAPTIVE_DETECTION off it behaves like the plain DETECT_EVERY_N skip.
+    """
+
+    def __init__(self):
+        self.enabled = config.ADAPTIVE_DETECTION
+        self.frames_total = 0
+        self.frames_detected = 0
+        self.reset()
+
+    def reset(self):
+        """Forget scene/occupancy history (e.g. after a seek jump)."""
+        self._ref_gray = None
+        self._frames_since_detect = None   # None until the first detection
+        self._last_person_time = None
+        self.mode = "ACTIVE"
+
+    def _gate_frame(self, frame):
+        h, w = frame.shape[:2]
+        gate_w = config.MOTION_GATE_WIDTH
+        gate_h = max(1, int(h * gate_w / w))
+        small = cv2.resize(frame, (gate_w, gate_h), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def _has_motion(self, gray):
+        diff = cv2.absdiff(gray, self._ref_gray)
+        _, moving = cv2.threshold(diff, config.MOTION_PIXEL_DELTA, 255, cv2.THRESH_BINARY)
+        return cv2.countNonZero(moving) > config.MOTION_AREA_RATIO * moving.size
+
+    def should_detect(self, frame, timestamp):
+        self.frames_total += 1
+        if self._frames_since_detect is None:
+            if self.enabled:
+                self._ref_gray = self._gate_frame(frame)
+            self._mark_detected()
+            return True
+
+        self._frames_since_detect += 1
+        since = self._frames_since_detect
+
+        if since < config.DETECT_EVERY_N:
+            return False
+        if not self.enabled:
+            self._mark_detected()
+            return True
+
+        idle = (
+            self._last_person_time is None or
+            timestamp - self._last_person_time > config.IDLE_AFTER_SECONDS
+        )
+        self.mode = "IDLE" if idle else "ACTIVE"
+
+        gray = self._gate_frame(frame)
+        if self._has_motion(gray):
+            run = True
+        elif idle:
+            run = since >= config.IDLE_DETECT_EVERY_N
+        else:
+            # People in view, scene static — refresh often enough to keep tracks alive
+            run = since >= config.STATIC_DETECT_EVERY_N
+
+        if run:
+            self._ref_gray = gray
+            self._mark_detected()
+        return run
+
+    def _mark_detected(self):
+        self._frames_since_detect = 0
+        self.frames_detected += 1
+
+    def observe(self, tracked_objects, timestamp):
+        """Feed back the Detections found on a detected frame (drives the idle timer)."""
+        if np.any(tracked_objects.cls == config.PERSON):
+            self._last_person_time = timestamp
+            self.mode = "ACTIVE"
+
+    def summary(self):
+        if self.frames_total == 0:
+            return "Detection scheduler: no frames processed"
+        ratio = 100.0 * self.frames_detected / self.frames_total
+        return (f"Detection scheduler: ran detector on {self.frames_detected}/"
+                f"{self.frames_total} frames ({ratio:.1f}%)")
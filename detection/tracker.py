@@ -0,0 +1,276 @@
+"""
+Standalone ByteTrack-style multi-object tracker.
+
+Fed with raw FrameDetections (any backend, any batch layout) instead of being
+bound to model.track(), so every stream can own its own instance and frames
+where the model is skipped can still advance the motion model (coast()).
+
+Track state is kept as parallel NumPy arrays; Kalman predict/update and IoU
+association run on all tracks at once.
+"""
+import numpy as np
+
+import config
+from utils.geometry import box_iou
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy ships with ultralytics, but the ONNX-only install may not have it
+    linear_sum_assignment = None
+
+_TRACKED = 1
+_LOST = 2
+
+# Kalman noise weights (relative to box height), as in the original ByteTrack
+_STD_POS = 1.0 / 20
+_STD_VEL = 1.0 / 160
+
+# Constant-velocity model on (cx, cy, aspect, h) + their velocities
+_F = np.eye(8, dtype=np.float64)
+_F[:4, 4:] = np.eye(4)
+_H = np.eye(4, 8, dtype=np.float64)
+
+
+def _xyxy_to_xyah(xyxy):
+    w = xyxy[:, 2] - xyxy[:, 0]
+    h = xyxy[:, 3] - xyxy[:, 1]
+    return np.stack([xyxy[:, 0] + w / 2, xyxy[:, 1] + h / 2, w / np.maximum(h, 1e-6), h], axis=1)
+
+
+def _xyah_to_xyxy(xyah):
+    w = xyah[:, 2] * xyah[:, 3]
+    h = xyah[:, 3]
+    return np.stack([xyah[:, 0] - w / 2, xyah[:, 1] - h / 2,
+                     xyah[:, 0] + w / 2, xyah[:, 1] + h / 2], axis=1)
+
+
+def _assign(cost, thresh):
+    """
+    Min-cost one-to-one assignment keeping only pairs with cost <= thresh.
+    Returns (matches (K, 2), unmatched_rows, unmatched_cols).
+    """
+    rows, cols = cost.shape
+    if rows == 0 or cols == 0:
+        return np.empty((0, 2), dtype=int), np.arange(rows), np.arange(cols)
+
+    if linear_sum_assignment is not None:
+        r, c = linear_sum_assignment(cost)
+        keep = cost[r, c] <= thresh
+        matches = np.stack([r[keep], c[keep]], axis=1)
+    else:
+        # Greedy fallback: cheapest admissible pairs first
+        order = np.argsort(cost, axis=None)
+        used_r = np.zeros(rows, dtype=bool)
+        used_c = np.zeros(cols, dtype=bool)
+        pairs = []
+        for flat in order:
+            i, j = divmod(int(flat), cols)
+            if cost[i, j] > thresh:
+                break
+            if used_r[i] or used_c[j]:
+                continue
+            used_r[i] = used_c[j] = True
+            pairs.append((i, j))
+        matches = np.array(pairs, dtype=int).reshape(-1, 2)
+
+    unmatched_rows = np.setdiff1d(np.arange(rows), matches[:, 0])
+    unmatched_cols = np.setdiff1d(np.arange(cols), matches[:, 1])
+    return matches, unmatched_rows, unmatched_cols
+
+
+class ByteTracker:
+    """
+    One instance per stream. update() takes FrameDetections and returns an
+    (M, 8) array of rows [x1, y1, x2, y2, track_id, score, cls, det_index]
+    for the confirmed, currently tracked objects.
+    """
+
+    def __init__(self, frame_rate=None):
+        if frame_rate is None:
+            frame_rate = config.TRACK_FRAME_RATE
+        self.max_time_lost = int(frame_rate / 30.0 * config.TRACK_BUFFER)
+        self.reset()
+
+    def reset(self):
+        self.frame_id = 0
+        self._next_id = 1
+        self.mean = np.empty((0, 8))
+        self.cov = np.empty((0, 8, 8))
+        self.track_id = np.empty(0, dtype=int)
+        self.state = np.empty(0, dtype=int)
+        self.activated = np.empty(0, dtype=bool)
+        self.score = np.empty(0, dtype=np.float32)
+        self.cls = np.empty(0, dtype=int)
+        self.start_frame = np.empty(0, dtype=int)
+        self.end_frame = np.empty(0, dtype=int)
+        self.det_idx = np.empty(0, dtype=int)
+
+    def __len__(self):
+        return len(self.track_id)
+
+    # ── Kalman filter (batched) ─────────────────────────────────────────────
+
+    def _predict(self):
+        if not len(self):
+            return
+        # Lost tracks don't keep growing/shrinking while unseen
+        self.mean[self.state != _TRACKED, 7] = 0
+        h = self.mean[:, 3]
+        std = np.stack([_STD_POS * h, _STD_POS * h, np.full_like(h, 1e-2), _STD_POS * h,
+                        _STD_VEL * h, _STD_VEL * h, np.full_like(h, 1e-5), _STD_VEL * h], axis=1)
+        q = np.zeros_like(self.cov)
+        q[:, np.arange(8), np.arange(8)] = std ** 2
+        self.mean = self.mean @ _F.T
+        self.cov = _F @ self.cov @ _F.T + q
+
+    def _kalman_update(self, rows, xyah):
+        mean, cov = self.mean[rows], self.cov[rows]
+        h = mean[:, 3]
+        std = np.stack([_STD_POS * h, _STD_POS * h, np.full_like(h, 1e-1), _STD_POS * h], axis=1)
+        s = _H @ cov @ _H.T
+        s[:, np.arange(4), np.arange(4)] += std ** 2
+        pht = cov @ _H.T                                           # (K, 8, 4)
+        gain = np.linalg.solve(s, pht.transpose(0, 2, 1)).transpose(0, 2, 1)
+        innovation = xyah - mean @ _H.T
+        self.mean[rows] = mean + np.einsum("kij,kj->ki", gain, innovation)
+        self.cov[rows] = cov - gain @ s @ gain.transpose(0, 2, 1)
+
+    # ── Track bookkeeping ───────────────────────────────────────────────────
+
+    def _boxes(self, rows):
+        return _xyah_to_xyxy(self.mean[rows])
+
+    def _apply_matches(self, rows, det_rows, dets, xyah):
+        if not len(rows):
+            return
+        self._kalman_update(rows, xyah[det_rows])
+        self.state[rows] = _TRACKED
+        self.activated[rows] = True
+        self.score[rows] = dets.conf[det_rows]
+        self.cls[rows] = dets.cls[det_rows]
+        self.end_frame[rows] = self.frame_id
+        self.det_idx[rows] = det_rows
+
+    def _add_tracks(self, det_rows, dets, xyah):
+        n = len(det_rows)
+        if not n:
+            return
+        meas = xyah[det_rows]
+        h = meas[:, 3]
+        mean = np.concatenate([meas, np.zeros((n, 4))], axis=1)
+        std = np.stack([2 * _STD_POS * h, 2 * _STD_POS * h, np.full_like(h, 1e-2), 2 * _STD_POS * h,
+                        10 * _STD_VEL * h, 10 * _STD_VEL * h, np.full_like(h, 1e-5), 10 * _STD_VEL * h],
+                       axis=1)
+        cov = np.zeros((n, 8, 8))
+        cov[:, np.arange(8), np.arange(8)] = std ** 2
+
+        ids = np.arange(self._next_id, self._next_id + n)
+        self._next_id += n
+        self.mean = np.concatenate([self.mean, mean])
+        self.cov = np.concatenate([self.cov, cov])
+        self.track_id = np.concatenate([self.track_id, ids])
+        self.state = np.concatenate([self.state, np.full(n, _TRACKED)])
+        # Only tracks born on the very first frame are confirmed immediately
+        self.activated = np.concatenate([self.activated, np.full(n, self.frame_id == 1)])
+        self.score = np.concatenate([self.score, dets.conf[det_rows]])
+        self.cls = np.concatenate([self.cls, dets.cls[det_rows]])
+        self.start_frame = np.concatenate([self.start_frame, np.full(n, self.frame_id)])
+        self.end_frame = np.concatenate([self.end_frame, np.full(n, self.frame_id)])
+        self.det_idx = np.concatenate([self.det_idx, det_rows])
+
+    def _keep(self, mask):
+        for name in ("mean", "cov", "track_id", "state", "activated", "score", "cls",
+                     "start_frame", "end_frame", "det_idx"):
+            setattr(self, name, getattr(self, name)[mask])
+
+    def _remove_duplicates(self):
+        """A lost track overlapping a tracked one almost perfectly is the same object; keep the older."""
+        tracked = np.flatnonzero(self.state == _TRACKED)
+        lost = np.flatnonzero(self.state == _LOST)
+        if not len(tracked) or not len(lost):
+            return
+        iou = box_iou(self._boxes(tracked), self._boxes(lost))
+        ti, li = np.nonzero(iou > 0.85)
+        if not len(ti):
+            return
+        age = self.frame_id - self.start_frame
+        drop = np.where(age[tracked[ti]] > age[lost[li]], lost[li], tracked[ti])
+        keep = np.ones(len(self), dtype=bool)
+        keep[drop] = False
+        self._keep(keep)
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def coast(self):
+        """
+        Advance one frame without detections (frame skipped by the scheduler).
+        Tracks keep their state — nobody looked — but the motion model moves
+        on, so the next real detection is matched against the right positions.
+        """
+        self.frame_id += 1
+        self._predict()
+        self.det_idx[:] = -1
+
+    def predicted_boxes(self):
+        """Current Kalman boxes of confirmed tracked objects → (track_ids, xyxy)."""
+        rows = np.flatnonzero((self.state == _TRACKED) & self.activated)
+        return self.track_id[rows], self._boxes(rows).astype(np.float32)
+
+    def update(self, dets):
+        self.frame_id += 1
+        self.det_idx[:] = -1
+        self._predict()
+
+        scores = dets.conf
+        xyah = _xyxy_to_xyah(dets.xyxy.astype(np.float64))
+        hi = np.flatnonzero(scores >= config.TRACK_HIGH_THRESH)
+        lo = np.flatnonzero((scores > config.TRACK_LOW_THRESH) & (scores < config.TRACK_HIGH_THRESH))
+
+        pool = np.flatnonzero(self.activated)          # confirmed tracks, tracked or lost
+        unconfirmed = np.flatnonzero(~self.activated)
+
+        # 1) Confirmed + lost tracks ↔ high-score detections
+        cost = 1.0 - box_iou(self._boxes(pool), dets.xyxy[hi])
+        if config.TRACK_FUSE_SCORE:
+            cost = 1.0 - (1.0 - cost) * scores[hi][None, :]
+        m, u_pool, u_hi = _assign(cost, config.TRACK_MATCH_THRESH)
+        self._apply_matches(pool[m[:, 0]], hi[m[:, 1]], dets, xyah)
+
+        # 2) Still-tracked leftovers ↔ low-score detections (occlusion / motion blur)
+        r_tracked = pool[u_pool]
+        r_tracked = r_tracked[self.state[r_tracked] == _TRACKED]
+        cost = 1.0 - box_iou(self._boxes(r_tracked), dets.xyxy[lo])
+        m, u_r, _ = _assign(cost, 0.5)
+        self._apply_matches(r_tracked[m[:, 0]], lo[m[:, 1]], dets, xyah)
+        self.state[r_tracked[u_r]] = _LOST
+
+        # 3) Unconfirmed (one-frame-old) tracks ↔ remaining high-score detections
+        rem_hi = hi[u_hi]
+        cost = 1.0 - box_iou(self._boxes(unconfirmed), dets.xyxy[rem_hi])
+        if config.TRACK_FUSE_SCORE:
+            cost = 1.0 - (1.0 - cost) * scores[rem_hi][None, :]
+        m, u_unconf, u_rem = _assign(cost, 0.7)
+        self._apply_matches(unconfirmed[m[:, 0]], rem_hi[m[:, 1]], dets, xyah)
+
+        keep = np.ones(len(self), dtype=bool)
+        keep[unconfirmed[u_unconf]] = False
+        # Lost for too long → gone
+        keep &= ~((self.state == _LOST) & (self.frame_id - self.end_frame > self.max_time_lost))
+        self._keep(keep)
+
+        # 4) New tracks from confident unmatched detections
+        new = rem_hi[u_rem]
+        self._add_tracks(new[scores[new] >= config.NEW_TRACK_THRESH], dets, xyah)
+
+        self._remove_duplicates()
+
+        out = np.flatnonzero((self.state == _TRACKED) & self.activated & (self.det_idx >= 0))
+        if not len(out):
+            return np.empty((0, 8), dtype=np.float32)
+        return np.concatenate([
+            self._boxes(out),
+            self.track_id[out, None],
+            self.score[out, None],
+            self.cls[out, None],
+            self.det_idx[out, None],
+        ], axis=1).astype(np.float32)
@@ -1,9 +1,280 @@
 """
-One-time script to export yolov8n.pt → yolov8n.onnx at 320px input size.
-Run once: python export_model.py
+Export the pose model to ONNX at IMG_SIZE and (optionally) build a static
+INT8 version calibrated on frames from our own footage, then write a report
+comparing INT8 against FP32 (box/keypoint agreement + per-frame latency).
+
+    python export_model.py                                # MODEL_PATH at IMG_SIZE, INT8 + report
+    python export_model.py --imgsz 416 --calib-source a.mp4 --calib-source b.mp4
+    python export_model.py --no-int8                      # FP32 ONNX only
+
+Both models run through OnnxRuntimeBackend, so the report measures exactly
+what `--backend onnxruntime` will do at runtime.
 """
-from ultralytics import YOLO
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import cv2
+import numpy as np
+
+import config
+from utils.geometry import box_iou
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export + INT8-quantize the pose model.")
+    parser.add_argument("--model", default=config.MODEL_PATH,
+                        help="PyTorch weights to export (default: MODEL_PATH).")
+    parser.add_argument("--imgsz", type=int, default=config.IMG_SIZE,
+                        help="Export input size (default: IMG_SIZE).")
+    parser.add_argument("--calib-source", action="append", default=None,
+                        help="Video used for calibration/evaluation frames; repeatable "
+                             "(default: CAMERA_SOURCE).")
+    parser.add_argument("--calib-frames", type=int, default=200,
+                        help="Frames used for INT8 calibration (default: 200).")
+    parser.add_argument("--eval-frames", type=int, default=100,
+                        help="Held-out frames used for the accuracy/latency report (default: 100).")
+    parser.add_argument("--no-int8", action="store_true",
+                        help="Only export the FP32 ONNX model.")
+    parser.add_argument("--quantize-head", action="store_true",
+                        help="Also quantize the box/keypoint decode head (faster, less accurate).")
+    parser.add_argument("--report", default=None,
+                        help="Report path (default: <model>-int8-report.json).")
+    return parser.parse_args()
+
+
+def export_onnx(model_path, imgsz):
+    from ultralytics import YOLO
+
+    onnx_path = YOLO(model_path).export(format="onnx", imgsz=imgsz, opset=12, simplify=True)
+    print(f"Export complete → {onnx_path}")
+    return str(onnx_path)
+
+
+def sample_frames(sources, count):
+    """Evenly spaced frames across all sources, resized like the runtime pipeline does."""
+    per_source = max(1, int(np.ceil(count / len(sources))))
+    frames = []
+    for source in sources:
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            print(f"Warning: unable to open calibration source: {source}")
+            continue
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        indices = np.linspace(0, max(total - 1, 0), per_source).astype(int) if total > 0 else None
+
+        for i in range(per_source):
+            if indices is not None:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, int(indices[i]))
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(cv2.resize(frame, (config.FRAME_WIDTH, config.FRAME_HEIGHT)))
+        cap.release()
+    return frames[:count]
+
+
+def _head_nodes(onnx_path):
+    """Names of the nodes in the final Pose/Detect block (box + keypoint decode)."""
+    import onnx
+
+    graph = onnx.load(onnx_path).graph
+    blocks = [int(m.group(1)) for m in (re.match(r"/model\.(\d+)/", n.name) for n in graph.node) if m]
+    if not blocks:
+        return []
+    head = f"/model.{max(blocks)}/"
+    # Keep the convolutions quantized; the decode arithmetic after them is what
+    # loses keypoint precision in INT8.
+    return [n.name for n in graph.node if n.name.startswith(head) and n.op_type != "Conv"]
+
+
+def split_frames(frames, eval_count):
+    """
+    Disjoint (calibration, evaluation) frame lists, interleaved so both cover
+    the same footage: every k-th frame is held out for evaluation.
+    """
+    if eval_count <= 0:
+        return list(frames), []
+    eval_every = max(2, round(len(frames) / eval_count))
+    eval_idx = set(range(0, len(frames), eval_every)[:eval_count])
+    calib = [f for i, f in enumerate(frames) if i not in eval_idx]
+    held_out = [f for i, f in enumerate(frames) if i in eval_idx]
+    return calib, held_out
+
+
+def quantize_int8(fp32_path, calib_frames, quantize_head=False):
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                          quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    from detection.backends import OnnxRuntimeBackend
+
+    backend = OnnxRuntimeBackend(fp32_path)
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self._frames = iter(calib_frames)
+
+        def get_next(self):
+            frame = next(self._frames, None)
+            if frame is None:
+                return None
+            blob, _ = backend.preprocess([frame])
+            return {backend.input_name: blob}
+
+    stem, _ = os.path.splitext(fp32_path)
+    prep_path = f"{stem}-prep.onnx"
+    int8_path = f"{stem}-int8.onnx"
+
+    quant_pre_process(fp32_path, prep_path)
+    quantize_static(
+        prep_path,
+        int8_path,
+        FrameReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        nodes_to_exclude=[] if quantize_head else _head_nodes(prep_path),
+    )
+    os.remove(prep_path)
+    print(f"INT8 model written → {int8_path} ({len(calib_frames)} calibration frames)")
+    return int8_path
+
+
+def _match(ref, test, iou_min=0.5):
+    """Greedy one-to-one matching by IoU. Returns [(ref_idx, test_idx, iou), ...]."""
+    if len(ref.xyxy) == 0 or len(test.xyxy) == 0:
+        return []
+    iou = box_iou(ref.xyxy, test.xyxy)
+    pairs, used_ref, used_test = [], set(), set()
+    for flat in np.argsort(iou, axis=None)[::-1]:
+        i, j = np.unravel_index(flat, iou.shape)
+        if iou[i, j] < iou_min:
+            break
+        if i in used_ref or j in used_test:
+            continue
+        used_ref.add(i)
+        used_test.add(j)
+        pairs.append((int(i), int(j), float(iou[i, j])))
+    return pairs
+
+
+def _timed_predict(backend, frames, classes):
+    out, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        out.append(backend.predict([frame], classes)[0])
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return out, np.asarray(latencies)
+
+
+def _latency_stats(ms):
+    return {
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms":  round(float(np.percentile(ms, 50)), 2),
+        "p95_ms":  round(float(np.percentile(ms, 95)), 2),
+        "fps":     round(1000.0 / float(ms.mean()), 1),
+    }
+
+
+def build_report(fp32_path, int8_path, eval_frames):
+    from detection.backends import OnnxRuntimeBackend
+
+    fp32 = OnnxRuntimeBackend(fp32_path)
+    int8 = OnnxRuntimeBackend(int8_path)
+    classes = [config.PERSON] if fp32.is_pose else config.DETECTION_CLASSES
+
+    ref_dets, ref_ms = _timed_predict(fp32, eval_frames, classes)
+    test_dets, test_ms = _timed_predict(int8, eval_frames, classes)
+
+    n_ref = n_test = n_matched = 0
+    ious, kp_err, kp_pck = [], [], []
+    for ref, test in zip(ref_dets, test_dets):
+        n_ref += len(ref.xyxy)
+        n_test += len(test.xyxy)
+        pairs = _match(ref, test)
+        n_matched += len(pairs)
+        for i, j, iou in pairs:
+            ious.append(iou)
+            if ref.kp_xy is None or test.kp_xy is None:
+                continue
+            visible = (ref.kp_conf[i] >= config.KP_CONF_MIN) & (test.kp_conf[j] >= config.KP_CONF_MIN)
+            if not visible.any():
+                continue
+            err = np.linalg.norm(ref.kp_xy[i][visible] - test.kp_xy[j][visible], axis=1)
+            x1, y1, x2, y2 = ref.xyxy[i]
+            # PCK: keypoint counts as agreeing when within 5% of the box diagonal
+            diag = max(float(np.hypot(x2 - x1, y2 - y1)), 1.0)
+            kp_err.extend(err.tolist())
+            kp_pck.extend((err < 0.05 * diag).tolist())
+
+    return {
+        "fp32_model": fp32_path,
+        "int8_model": int8_path,
+        "imgsz": fp32.imgsz,
+        "eval_frames": len(eval_frames),
+        "boxes": {
+            "fp32_count":  n_ref,
+            "int8_count":  n_test,
+            "matched":     n_matched,
+            "recall_vs_fp32":    round(n_matched / n_ref, 4) if n_ref else None,
+            "precision_vs_fp32": round(n_matched / n_test, 4) if n_test else None,
+            "mean_iou":    round(float(np.mean(ious)), 4) if ious else None,
+        },
+        "keypoints": {
+            "compared":      len(kp_err),
+            "mean_error_px": round(float(np.mean(kp_err)), 2) if kp_err else None,
+            "p95_error_px":  round(float(np.percentile(kp_err, 95)), 2) if kp_err else None,
+            "pck_5pct_diag": round(float(np.mean(kp_pck)), 4) if kp_pck else None,
+        },
+        "latency": {
+            "fp32": _latency_stats(ref_ms) if len(ref_ms) else None,
+            "int8": _latency_stats(test_ms) if len(test_ms) else None,
+            "speedup": round(float(ref_ms.mean() / test_ms.mean()), 2) if len(test_ms) else None,
+        },
+    }
+
+
+def main():
+    args = parse_args()
+    onnx_path = export_onnx(args.model, args.imgsz)
+    if args.no_int8:
+        return
+
+    sources = args.calib_source or [config.CAMERA_SOURCE]
+    frames = sample_frames(sources, args.calib_frames + args.eval_frames)
+    if not frames:
+        sys.exit("Error: no frames could be read from the calibration sources")
+
+    calib_frames, eval_frames = split_frames(frames, args.eval_frames)
+    if not calib_frames or not eval_frames:
+        # Calibrating on the evaluation frames would make the accuracy report optimistic
+        sys.exit(f"Error: only {len(frames)} frames could be read; need at least one calibration "
+                 f"and one evaluation frame that do not overlap (add footage with --calib-source)")
+    if len(frames) < args.calib_frames + args.eval_frames:
+        print(f"Warning: {len(frames)} frames read → {len(calib_frames)} calibration / "
+              f"{len(eval_frames)} evaluation frames")
+
+    int8_path = quantize_int8(onnx_path, calib_frames, quantize_head=args.quantize_head)
+    report = build_report(onnx_path, int8_path, eval_frames)
+
+    report_path = args.report or f"{os.path.splitext(onnx_path)[0]}-int8-report.json"
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    boxes, kps, lat = report["boxes"], report["keypoints"], report["latency"]
+    print(f"Boxes      recall {boxes['recall_vs_fp32']} | precision {boxes['precision_vs_fp32']} "
+          f"| mean IoU {boxes['mean_iou']}")
+    print(f"Keypoints  mean err {kps['mean_error_px']}px | p95 {kps['p95_error_px']}px "
+          f"| PCK@5% {kps['pck_5pct_diag']}")
+    if lat["fp32"] and lat["int8"]:
+        print(f"Latency    FP32 {lat['fp32']['mean_ms']}ms ({lat['fp32']['fps']} FPS) "
+              f"| INT8 {lat['int8']['mean_ms']}ms ({lat['int8']['fps']} FPS) | x{lat['speedup']}")
+    print(f"Report written → {report_path}")
+
 
-model = YOLO("yolov8n.pt")
-model.export(format="onnx", imgsz=320, opset=12, simplify=True)
-print("Export complete → yolov8n.onnx")
+if __name__ == "__main__":
+    main()
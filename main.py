@@ -1,6 +1,4 @@
 import cv2
-import numpy as np
-import threading
 import queue
 import os
 import time
@@ -8,18 +6,27 @@ import argparse
 from datetime import datetime
 
 from detection.detector import Detector
-from config import (CAMERA_SOURCE, SHOW_FPS, SAVE_CONFIDENCE, MOVEMENT_THRESHOLD,
-                    WINDOW_NAME, WINDOW_MODE, WINDOW_WIDTH, WINDOW_HEIGHT,
+from detection.process_pool import InferenceProcessPool
+from detection.cache import DetectionCache
+from analysis import FrameAnalyzer, AnalysisPipeline
+from offline.headless import analyze_source, format_summary
+from offline.chunked import run_chunked, format_summary as format_chunked_summary
+from offline.batch import run_batch, format_summary as format_batch_summary
+from utils.pipeline import END
+from config import (CAMERA_SOURCE, SHOW_FPS, SAVE_CONFIDENCE,
+                    WINDOW_NAME, WINDOW_MODE,
                     DISPLAY_SCALE, BOX_THICKNESS, FONT_SCALE, FONT_THICKNESS,
                     FRAME_WIDTH, FRAME_HEIGHT, SEEK_STEP_SECONDS)
 from utils.fps_tracker import FPSTracker
 from utils.drawing import setup_window, draw_keypoints
+from utils.compositor import Compositor
+from utils.renderer import Renderer
+from utils.video_writer import AsyncVideoWriter
+from utils.clip_recorder import AlertClipRecorder
+from utils.snapshot_writer import SnapshotWriter
 from utils.event_logger import EventLogger
+from utils.clock import VideoClock
 from utils.audio import AudioManager
-from behavior.loitering import LoiteringDetector
-from behavior.conflict_detection import ConflictDetector
-from behavior.scoring import ThreatScorer
-from behavior.abandoned_object import AbandonedObjectDetector
 import config
 
 os.environ["QT_QPA_PLATFORM"] = "xcb"
@@ -46,129 +53,121 @@ def parse_args():
         default=None,
         help="Override input source (video path or camera index as string).",
     )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=None,
+        help="Override MODEL_PATH (e.g. yolov8n-pose.onnx).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["auto", "torch", "onnxruntime"],
+        default=None,
+        help="Inference backend (default: INFERENCE_BACKEND from config).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Run inference in N worker processes (default: INFERENCE_WORKERS from config; 0 = in-process).",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="No window: analyze as fast as possible and write events as JSONL.",
+    )
+    parser.add_argument(
+        "--events",
+        type=str,
+        default=None,
+        help="Headless mode: JSONL events path (default: saves/events_<timestamp>.jsonl).",
+    )
+    parser.add_argument(
+        "--render",
+        type=str,
+        default=None,
+        help="Headless mode: also write an annotated video to this path.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Headless mode: split the video into segments analyzed by N processes in parallel "
+             "(with --batch: number of videos analyzed at once).",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Headless/batch: reuse cached detections for this video + model config "
+             "(replay without inference), or fill the cache on the first run.",
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        help="Headless batch: directory of videos or manifest file (one path per line).",
+    )
+    parser.add_argument(
+        "--out-dir",
+        type=str,
+        default=os.path.join("saves", "batch"),
+        help="Batch mode: directory for per-video events and the status manifest (resumable).",
+    )
     return parser.parse_args()
 
 
-def _reset_temporal_state(loiter_detector, abandon_detector, conflict_detector, scorer):
-    """Clear time/history-dependent detector state after a seek jump."""
-    if hasattr(loiter_detector, "person_state"):
-        loiter_detector.person_state.clear()
-    if hasattr(abandon_detector, "bag_state"):
-        abandon_detector.bag_state.clear()
-    if hasattr(conflict_detector, "history"):
-        conflict_detector.history.clear()
-    if hasattr(conflict_detector, "person_kp"):
-        conflict_detector.person_kp.clear()
-    if hasattr(scorer, "instant_scores"):
-        scorer.instant_scores.clear()
-
-
-def inference_worker(cap, detector, loiter_detector, abandon_detector,
-                     conflict_detector, scorer, result_queue, control_queue,
-                     stop_event, completion_event):
-    """
-    Runs in a background thread.
-    Captures frames, runs detection every DETECT_EVERY_N frames (reuses last
-    result on skipped frames), runs behavior analysis on every frame, and
-    pushes results into result_queue (maxsize=1, drop-on-full so display always
-    gets the freshest result).
-    Signals completion_event when video is fully processed.
-    """
-    frame_count = 0
-    last_tracked_objects = []
-
-    while not stop_event.is_set():
-        seek_applied = False
-
-        # Apply queued controls before reading next frame.
-        while True:
-            try:
-                command = control_queue.get_nowait()
-            except queue.Empty:
-                break
-
-            if command.get("type") != "seek":
-                continue
-
-            seek_seconds = float(command.get("seconds", 0.0))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            if fps <= 0:
-                fps = 30.0
-
-            current_frame = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            target_frame = current_frame + int(seek_seconds * fps)
-
-            if total_frames > 0:
-                target_frame = max(0, min(target_frame, total_frames - 1))
-            else:
-                target_frame = max(0, target_frame)
-
-            cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
-            frame_count = target_frame
-            last_tracked_objects = []
-            _reset_temporal_state(loiter_detector, abandon_detector, conflict_detector, scorer)
-            seek_applied = True
+def build_detector(args):
+    """Detector for the CLI options; returns (detector, inference_pool or None)."""
+    workers = config.INFERENCE_WORKERS if args.workers is None else args.workers
+    inference_pool = None
+    if workers > 0:
+        inference_pool = InferenceProcessPool(workers, model_path=args.model, backend=args.backend)
+        print(f"Inference running in {workers} worker processes")
+    detector = Detector(model_path=args.model, backend=inference_pool or args.backend)
+    return detector, inference_pool
+
+
+def run_headless_mode(args, source):
+    os.makedirs("saves", exist_ok=True)
+    events_path = args.events or os.path.join(
+        "saves", f"events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    if args.jobs > 1:
+        if args.render:
+            print("Note: --render is ignored with --jobs (segments are analyzed out of order)")
+        stats = run_chunked(source, events_path, args.jobs, model_path=args.model, backend=args.backend)
+        print(format_chunked_summary(stats))
+        print(f"Events written to: {events_path}")
+        return
 
-            # Flush display queue so stale pre-seek frames are dropped.
-            while True:
-                try:
-                    result_queue.get_nowait()
-                except queue.Empty:
-                    break
+    pools = []
 
-        ret, frame = cap.read()
-        if not ret:
-            # Signal completion when all frames are processed
-            completion_event.set()
-            break
+    def get_detector():
+        detector, inference_pool = build_detector(args)
+        if inference_pool is not None:
+            pools.append(inference_pool)
+        return detector
 
-        frame = cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT))
-
-        # Video timestamp — used by conflict detector for accurate velocity dt
-        # regardless of how fast/slow we process frames
-        video_timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
-
-        if frame_count % config.DETECT_EVERY_N == 0:
-            results = detector.detect(frame)
-            tracked_objects = detector.parse_tracked_objects(results)
-            last_tracked_objects = tracked_objects
-        else:
-            tracked_objects = last_tracked_objects
-
-        frame_count += 1
-
-        suspicious_ids = loiter_detector.update(tracked_objects)
-        suspicious_bags = abandon_detector.update(tracked_objects)
-        conflict_alert, pair_scores = conflict_detector.update(tracked_objects, video_timestamp)
-        instant_scores, session_scores = scorer.update(
-            tracked_objects, suspicious_ids, suspicious_bags, conflict_alert, pair_scores
-        )
-
-        result = {
-            "frame":           frame,
-            "tracked_objects": tracked_objects,
-            "suspicious_ids":  suspicious_ids,
-            "suspicious_bags": suspicious_bags,
-            "conflict_alert":  conflict_alert,
-            # Send per-frame snapshots so display thread does not iterate
-            # over dicts that are being mutated by the worker thread.
-            "instant_scores":  dict(instant_scores),
-            "session_scores":  dict(session_scores),
-            "seek_applied":    seek_applied,
-        }
-
-        # Drop stale result — display always gets the freshest frame
-        try:
-            result_queue.get_nowait()
-        except queue.Empty:
-            pass
-        result_queue.put(result)
+    cache = DetectionCache() if args.cache or config.DETECTION_CACHE else None
+    try:
+        stats = analyze_source(source, events_path, get_detector, cache=cache, render_path=args.render,
+                               model_path=args.model, backend=args.backend)
+    finally:
+        for inference_pool in pools:
+            inference_pool.close()
+    print(format_summary(stats))
+    print(f"Events written to: {events_path}")
 
 
 def main():
     args = parse_args()
 
+    if args.batch:
+        totals = run_batch(args.batch, args.out_dir, max(1, args.jobs),
+                           model_path=args.model, backend=args.backend,
+                           use_cache=args.cache or config.DETECTION_CACHE)
+        print(format_batch_summary(totals))
+        return
+
     if args.source is not None:
         camera_source = int(args.source) if args.source.isdigit() else args.source
         mode_label = "CUSTOM"
@@ -179,8 +178,14 @@ def main():
         camera_source = CAMERA_SOURCE
         mode_label = "OFFLINE"
 
+    if args.headless:
+        mode_label += " HEADLESS"
     print(f"Starting in {mode_label} mode | source={camera_source}")
 
+    if args.headless:
+        run_headless_mode(args, camera_source)
+        return
+
     cap = cv2.VideoCapture(camera_source)
     if not cap.isOpened():
         print(f"Error: Unable to open source: {camera_source}")
@@ -189,120 +194,69 @@ def main():
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
 
-    detector = Detector()
-    loiter_detector = LoiteringDetector()
-    abandon_detector = AbandonedObjectDetector()
-    conflict_detector = ConflictDetector()
-    scorer = ThreatScorer()
-    event_logger = EventLogger()
+    detector, inference_pool = build_detector(args)
+    analyzer = FrameAnalyzer(detector)
+    scorer = analyzer.scorer
+    # Alert cooldowns follow the analyzed timeline, not the display loop's wall clock
+    display_clock = VideoClock()
+    event_logger = EventLogger(clock=display_clock)
     audio_manager = AudioManager()
 
     setup_window()
     save_dir = "saves"
     os.makedirs(save_dir, exist_ok=True)
 
-    # Setup video writer for processed video export (MKV with H.264)
+    # Processed video export (MKV with H.264), encoded on a background thread/process
     fps = cap.get(cv2.CAP_PROP_FPS)
     if fps <= 0:
         fps = 30.0
     output_video_filename = os.path.join(save_dir, f"processed_video_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mkv")
-    # Use FFMPEG codec for MKV format - more reliable than mp4v
-    fourcc = cv2.VideoWriter_fourcc(*'X264')  # H.264 codec for MKV
-    out = cv2.VideoWriter(output_video_filename, fourcc, fps, (WINDOW_WIDTH, WINDOW_HEIGHT))
-    if not out.isOpened():
-        # Fallback to MJPEG if H.264 is not available
-        fourcc = cv2.VideoWriter_fourcc(*'MJPG')
-        out = cv2.VideoWriter(output_video_filename, fourcc, fps, (WINDOW_WIDTH, WINDOW_HEIGHT))
-    print(f"Starting video export to: {output_video_filename}")
+    exporter = None
+    if config.VIDEO_EXPORT_FULL:
+        exporter = AsyncVideoWriter(output_video_filename, fps)
+        print(f"Starting video export to: {output_video_filename} ({exporter.backend})")
+    clip_recorder = AlertClipRecorder() if config.ALERT_CLIPS else None
+    snapshot_writer = SnapshotWriter(save_dir) if config.SAVE_FRAMES else None
 
     fps_tracker = FPSTracker(save_dir=save_dir)
-    object_positions = {}
-    last_save_time = {}
 
     active_alert = None
     alert_start_time = 0
     current_alert_state = "NONE"
-    prev_time = time.time()
 
-    result_queue = queue.Queue(maxsize=1)
     control_queue = queue.Queue(maxsize=8)
-    stop_event = threading.Event()
-    completion_event = threading.Event()  # Signal when video is fully processed
-
-    worker = threading.Thread(
-        target=inference_worker,
-        args=(cap, detector, loiter_detector, abandon_detector,
-              conflict_detector, scorer, result_queue, control_queue, stop_event, completion_event),
-        daemon=True,
-    )
-    worker.start()
+    # Rendering every result (no skipping) paces offline analysis to the GUI instead of dropping results
+    drop_policies = None if config.RENDER_SKIP_UNDER_LOAD or args.live else {"behavior": "block"}
+    pipeline = AnalysisPipeline(cap, analyzer, control_queue, live=args.live, drop_policies=drop_policies)
+    pipeline.start()
 
-    last_result = None
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     # Seeking is useful for offline debug playback, not live camera preview.
     video_seek_enabled = (not args.live) and total_frames > 0
 
-    while True:
-        try:
-            last_result = result_queue.get(timeout=0.1)
-        except queue.Empty:
-            # If worker has finished and queue is empty, exit the display loop
-            if completion_event.is_set():
-                break
-            if last_result is None:
-                continue  # Nothing to show yet
-            # Use last result if queue temporarily empty
-
-        result = last_result
-        frame = result["frame"]
+    controls_text = "Controls: q Quit"
+    if video_seek_enabled:
+        controls_text += f" | a/<- Back {SEEK_STEP_SECONDS}s | d/-> Forward {SEEK_STEP_SECONDS}s"
+
+    # ── Rendering (runs on the Renderer thread) ─────────────────────────────
+    render_state = {"prev_time": time.time()}
+
+    def render(job, compositor):
+        result = job["result"]
         tracked_objects = result["tracked_objects"]
         suspicious_ids = result["suspicious_ids"]
         suspicious_bags = result["suspicious_bags"]
-        conflict_alert = result["conflict_alert"]
         instant_scores = result["instant_scores"]
         session_scores = result["session_scores"]
-        seek_applied = result.get("seek_applied", False)
 
-        frame_copy = frame.copy()
+        # Annotations are drawn straight onto the compositor's canvas
+        frame_copy = compositor.begin(result["frame"])
         current_time = time.time()
 
-        if seek_applied:
-            object_positions.clear()
-            last_save_time.clear()
-            active_alert = None
-            current_alert_state = "NONE"
-            audio_manager.stop_alarm()
-
-        # Alert state machine
-        new_alert_state = "NONE"
-        if conflict_alert:
-            new_alert_state = "CONFLICT"
-        elif suspicious_bags:
-            new_alert_state = "ABANDONED"
-
-        if new_alert_state != current_alert_state:
-            if current_alert_state != "NONE":
-                audio_manager.stop_alarm()
-
-            if new_alert_state == "CONFLICT":
-                active_alert = "POSSIBLE PHYSICAL CONFLICT"
-                alert_start_time = current_time
-                audio_manager.start_alarm()
-                event_logger.log("conflict", "Possible physical conflict detected!", config.ALERT_COOLDOWN)
-            elif new_alert_state == "ABANDONED":
-                active_alert = "ABANDONED OBJECT DETECTED"
-                alert_start_time = current_time
-                audio_manager.start_alarm()
-                event_logger.log("abandon", "Abandoned object detected!", config.ALERT_COOLDOWN)
-            else:
-                active_alert = None
-
-            current_alert_state = new_alert_state
-
         # Draw bounding boxes
-        check_time = time.time()
-        save_frame = False
+        save_ids = []
         detected_objects = []
+        persons_in_frame = [o for o in tracked_objects if o["class"] == config.PERSON]
 
         for obj in tracked_objects:
             x1, y1, x2, y2 = obj["bbox"]
@@ -327,126 +281,126 @@ def main():
 
             # Skeleton + strike-zone overlay
             if config.SHOW_KEYPOINTS and cls == config.PERSON:
-                persons_in_frame = [o for o in tracked_objects if o["class"] == config.PERSON]
                 draw_keypoints(frame_copy, obj, all_persons=persons_in_frame)
 
             if config.SAVE_FRAMES and conf > SAVE_CONFIDENCE:
-                center_x = (x1 + x2) / 2
-                center_y = (y1 + y2) / 2
-                current_pos = (center_x, center_y)
-                is_moving = False
-                if obj_id in object_positions:
-                    prev_pos = object_positions[obj_id]
-                    dist = ((current_pos[0] - prev_pos[0])**2 + (current_pos[1] - prev_pos[1])**2) ** 0.5
-                    if dist > MOVEMENT_THRESHOLD:
-                        is_moving = True
-                object_positions[obj_id] = current_pos
-                last_save_time.setdefault(obj_id, 0)
-                if is_moving or check_time - last_save_time[obj_id] >= 1.0:
-                    save_frame = True
-                    last_save_time[obj_id] = check_time
-                    if class_name not in detected_objects:
-                        detected_objects.append(class_name)
-
-        if config.SAVE_FRAMES and save_frame and detected_objects:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-            filename = os.path.join(save_dir, f"detected_{'_'.join(detected_objects)}_{timestamp}.jpg")
-            cv2.imwrite(filename, frame_copy)
-
-        # FPS counter
+                save_ids.append(obj_id)
+                if class_name not in detected_objects:
+                    detected_objects.append(class_name)
+
+        # Encoded and written by the snapshot workers (rate-limited per track, near-duplicates dropped)
+        if snapshot_writer is not None and save_ids:
+            snapshot_writer.submit(frame_copy, save_ids, detected_objects)
+
+        # FPS counter (rendered frames per second)
         if SHOW_FPS:
-            fps = 1.0 / max(current_time - prev_time, 1e-6)
-            prev_time = current_time
+            fps = 1.0 / max(current_time - render_state["prev_time"], 1e-6)
+            render_state["prev_time"] = current_time
             fps_tracker.update(fps)
             avg_fps = fps_tracker.get_average_fps()
             cv2.putText(frame_copy, f"FPS: {fps:.1f} (Avg: {avg_fps:.1f})", (20, 40),
                         cv2.FONT_HERSHEY_SIMPLEX, FONT_SCALE, (0, 255, 0), FONT_THICKNESS)
 
         # Alert banner
-        if config.SHOW_ALERT_BANNER and active_alert:
-            if current_time - alert_start_time < config.ALERT_BANNER_DURATION:
-                overlay = frame_copy.copy()
-                cv2.rectangle(overlay, (0, 0), (frame_copy.shape[1], 80), (0, 0, 255), -1)
-                cv2.addWeighted(overlay, 0.6, frame_copy, 0.4, 0, frame_copy)
-                cv2.putText(frame_copy, active_alert, (50, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3)
-            else:
-                active_alert = None
+        if job["banner"]:
+            compositor.draw_banner(job["banner"])
 
         # Side panel
-        panel_width = 350
-        h, w, _ = frame_copy.shape
-        extended_frame = np.zeros((h, w + panel_width, 3), dtype=np.uint8)
-        extended_frame[:, :w] = frame_copy
-        extended_frame[:, w:] = (30, 30, 30)
-
-        panel_x = w
-        margin_left = 15
-        y_offset = 35
-
-        cv2.putText(extended_frame, "THREAT ANALYSIS", (panel_x + margin_left, y_offset),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-        y_offset += 10
-        cv2.line(extended_frame,
-                 (panel_x + margin_left, y_offset),
-                 (panel_x + panel_width - margin_left, y_offset),
-                 (100, 100, 100), 1)
-        y_offset += 30
-
-        cv2.putText(extended_frame, "ACTIVE THREATS:", (panel_x + margin_left, y_offset),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
-        y_offset += 25
-
-        for pid, score in instant_scores.items():
-            level = scorer.get_level(score)
-            session_total = session_scores.get(pid, 0)
-            color = (0, 255, 0)
-            if level == "SUSPICIOUS":
-                color = (0, 165, 255)
-            elif level == "HIGH":
-                color = (0, 0, 255)
+        threats = [(pid, scorer.get_level(score), score, session_scores.get(pid, 0))
+                   for pid, score in instant_scores.items()]
+        compositor.draw_panel(threats, job["timeline"])
+
+        # Hand the processed frame to the video exporter and the alert clip buffer
+        # (both copy it; the canvas is reused)
+        if exporter is not None or clip_recorder is not None:
+            if config.VIDEO_EXPORT_SIZE is None:
+                export_frame = compositor.canvas
+            else:
+                export_frame = compositor.export_frame(*config.VIDEO_EXPORT_SIZE)
+            if exporter is not None:
+                exporter.write(export_frame)
+            if clip_recorder is not None:
+                clip_recorder.add(export_frame, result["clock_time"], result["generation"])
 
-            cv2.putText(extended_frame, f"ID {pid}:", (panel_x + margin_left + 10, y_offset),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.55, (200, 200, 200), 1)
-            cv2.putText(extended_frame, level, (panel_x + margin_left + 70, y_offset),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.55, color, 2)
-            cv2.putText(extended_frame, f"({score})", (panel_x + margin_left + 185, y_offset),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (180, 180, 180), 1)
-            y_offset += 22
-            cv2.putText(extended_frame, f"  Session Total: {session_total}",
-                        (panel_x + margin_left + 10, y_offset),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (150, 150, 150), 1)
-            y_offset += 28
-
-        if event_logger.timeline:
-            y_offset = max(y_offset + 20, h - 150)
-            cv2.putText(extended_frame, "EVENT TIMELINE:", (panel_x + margin_left, y_offset),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
-            y_offset += 25
-            for _, msg in event_logger.timeline[-3:]:
-                display_msg = msg[:30] + "..." if len(msg) > 30 else msg
-                cv2.putText(extended_frame, f"• {display_msg}", (panel_x + margin_left + 5, y_offset),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-                y_offset += 20
-
-        controls_text = "Controls: q Quit"
-        if video_seek_enabled:
-            controls_text += f" | a/<- Back {SEEK_STEP_SECONDS}s | d/-> Forward {SEEK_STEP_SECONDS}s"
-        cv2.putText(extended_frame, controls_text, (15, h - 15),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (180, 180, 180), 1)
-
-        display_frame = extended_frame
-        if DISPLAY_SCALE != 1.0:
-            display_frame = cv2.resize(extended_frame, None, fx=DISPLAY_SCALE, fy=DISPLAY_SCALE)
-
-        cv2.imshow(WINDOW_NAME, display_frame)
-        
-        # Write the processed frame to the output video
-        frame_to_write = extended_frame
-        if frame_to_write.shape[1] != WINDOW_WIDTH or frame_to_write.shape[0] != WINDOW_HEIGHT:
-            frame_to_write = cv2.resize(frame_to_write, (WINDOW_WIDTH, WINDOW_HEIGHT))
-        if out.isOpened():
-            out.write(frame_to_write)
+        return compositor.display_frame(DISPLAY_SCALE)
+
+    renderer = Renderer(render, lambda: Compositor(controls_text))
+    renderer.start()
+
+    # ── Display loop: every result drives the alert state machine ───────────
+    while True:
+        finished = False
+        results = []
+        try:
+            item = pipeline.output.get(timeout=0.01)
+            while True:
+                # END: video fully processed (or the pipeline stopped on an error)
+                if item is END:
+                    finished = True
+                    break
+                if not pipeline.is_stale(item):   # stale: produced before the latest seek
+                    results.append(item)
+                item = pipeline.output.get_nowait()
+        except queue.Empty:
+            if pipeline.stop_event.is_set():
+                finished = True
+
+        for result in results:
+            display_clock.set(result["clock_time"])
+            current_time = time.time()
+
+            if result.get("seek_applied", False):
+                active_alert = None
+                current_alert_state = "NONE"
+                audio_manager.stop_alarm()
+                event_logger.last_events.clear()  # cooldowns refer to the old timeline position
+
+            # Alert state machine
+            new_alert_state = "NONE"
+            if result["conflict_alert"]:
+                new_alert_state = "CONFLICT"
+            elif result["suspicious_bags"]:
+                new_alert_state = "ABANDONED"
+
+            if new_alert_state != current_alert_state:
+                if current_alert_state != "NONE":
+                    audio_manager.stop_alarm()
+
+                if new_alert_state == "CONFLICT":
+                    active_alert = "POSSIBLE PHYSICAL CONFLICT"
+                    alert_start_time = current_time
+                    audio_manager.start_alarm()
+                    event_logger.log("conflict", "Possible physical conflict detected!", config.ALERT_COOLDOWN)
+                    if clip_recorder is not None:
+                        clip_recorder.trigger("conflict", result["clock_time"], result["generation"])
+                elif new_alert_state == "ABANDONED":
+                    active_alert = "ABANDONED OBJECT DETECTED"
+                    alert_start_time = current_time
+                    audio_manager.start_alarm()
+                    event_logger.log("abandon", "Abandoned object detected!", config.ALERT_COOLDOWN)
+                    if clip_recorder is not None:
+                        clip_recorder.trigger("abandoned", result["clock_time"], result["generation"])
+                else:
+                    active_alert = None
+
+                current_alert_state = new_alert_state
+
+            banner = None
+            if config.SHOW_ALERT_BANNER and active_alert:
+                if current_time - alert_start_time < config.ALERT_BANNER_DURATION:
+                    banner = active_alert
+                else:
+                    active_alert = None
+
+            renderer.submit({"result": result, "banner": banner,
+                             "timeline": event_logger.timeline[-3:]})
+
+        display_frame = renderer.latest()
+        if display_frame is not None:
+            cv2.imshow(WINDOW_NAME, display_frame)
+
+        if finished or renderer.error is not None:
+            break
 
         key = cv2.waitKeyEx(1)
         key_ascii = key & 0xFF
@@ -477,15 +431,25 @@ def main():
                         pass
                     control_queue.put_nowait({"type": "seek", "seconds": seek_seconds})
 
-    stop_event.set()
-    worker.join(timeout=2)
+    pipeline.stop()
+    renderer.close()
+    if inference_pool is not None:
+        inference_pool.close()
     fps_tracker.finalize()
+    print(analyzer.scheduler.summary())
+    print(pipeline.summary())
+    print(renderer.summary())
     
-    # Properly release and finalize the video writer
-    if out.isOpened():
-        out.release()
-    print(f"Video exported successfully to: {output_video_filename}")
-    print(f"Video file size: {os.path.getsize(output_video_filename) / (1024*1024):.1f} MB")
+    # Encode whatever is still queued and finalize the files
+    if exporter is not None:
+        exporter.close()
+        print(exporter.summary())
+    if clip_recorder is not None:
+        clip_recorder.close()
+        print(clip_recorder.summary())
+    if snapshot_writer is not None:
+        snapshot_writer.close()
+        print(snapshot_writer.summary())
     cap.release()
     cv2.destroyAllWindows()
 
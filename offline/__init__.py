@@ -0,0 +1 @@
+"""Offline (no-display) analysis of recorded footage."""
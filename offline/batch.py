@@ -0,0 +1,182 @@
+"""
+Batch runner: analyze many videos headlessly on a pool of worker processes.
+
+Every worker loads the Detector once (process initializer) and reuses it for
+each file it is handed; per-file state (trackers, behavior timers) is fresh
+for every video. Progress is kept in a status manifest next to the outputs,
+rewritten after every file, so an interrupted batch resumes where it stopped:
+files already "done" are skipped, anything else is run again.
+"""
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".m4v", ".mpg", ".mpeg", ".ts")
+STATUS_FILE = "batch_status.json"
+
+_worker_detector = None   # one per worker process, see _init_worker()
+
+
+def collect_sources(path):
+    """Videos in a directory (recursive), or listed one per line in a manifest file."""
+    if os.path.isdir(path):
+        sources = []
+        for root, _, files in os.walk(path):
+            for name in files:
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    sources.append(os.path.join(root, name))
+        return sorted(sources)
+
+    base = os.path.dirname(os.path.abspath(path))
+    sources = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            sources.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return sources
+
+
+def events_path_for(source, out_dir, root):
+    """Unique, readable output name: path below `root` with separators flattened."""
+    name = os.path.splitext(os.path.relpath(os.path.abspath(source), root))[0]
+    name = name.replace("..", "_").replace(os.sep, "__")
+    return os.path.join(out_dir, name + ".jsonl")
+
+
+def load_status(out_dir):
+    path = os.path.join(out_dir, STATUS_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_status(out_dir, status):
+    # Write-then-rename: a crash mid-write never leaves a truncated manifest
+    path = os.path.join(out_dir, STATUS_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _init_worker(model_path, backend_name, threads):
+    global _worker_detector
+    from detection.detector import Detector
+    from detection.process_pool import create_worker_backend
+
+    backend = create_worker_backend(backend_name, model_path, threads)
+    _worker_detector = Detector(model_path=model_path, backend=backend)
+
+
+def _analyze_file(source, events_path, use_cache, model_path, backend_name):
+    from detection.cache import DetectionCache
+    from offline.headless import analyze_source
+
+    # Events go to a temporary name first so a half-written file is never mistaken for a result
+    tmp = events_path + ".partial"
+    stats = analyze_source(source, tmp, lambda: _worker_detector,
+                           cache=DetectionCache() if use_cache else None,
+                           model_path=model_path, backend=backend_name)
+    if not stats["complete"]:
+        raise RuntimeError("analysis stopped before the end of the video")
+    os.replace(tmp, events_path)
+    del stats["pipeline"], stats["scheduler"]
+    return stats
+
+
+def run_batch(path, out_dir, jobs, model_path=None, backend=None, retry_failed=True, use_cache=False):
+    """
+    Analyze every video of `path` (directory or manifest) into `out_dir`.
+    With `use_cache`, videos already in the detection cache are replayed
+    without inference. Returns aggregate stats over the files processed in this run.
+    """
+    model_path = model_path or config.MODEL_PATH
+    backend = backend or config.INFERENCE_BACKEND
+    os.makedirs(out_dir, exist_ok=True)
+
+    sources = collect_sources(path)
+    root = os.path.abspath(path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path)))
+    status = load_status(out_dir)
+    pending = []
+    for source in sources:
+        entry = status.get(source, {})
+        if entry.get("status") == "done" and os.path.exists(entry.get("events", "")):
+            continue
+        if entry.get("status") == "failed" and not retry_failed:
+            continue
+        pending.append(source)
+    skipped = len(sources) - len(pending)
+    print(f"Batch: {len(sources)} videos, {skipped} already done, {len(pending)} to process")
+
+    totals = {"done": 0, "failed": 0, "frames": 0, "video_seconds": 0.0, "events": 0}
+    wall_start = time.perf_counter()
+    if pending:
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(model_path, backend, config.INFERENCE_WORKER_THREADS)) as pool:
+            futures = {}
+            for source in pending:
+                events_path = events_path_for(source, out_dir, root)
+                status[source] = {"status": "running", "events": events_path}
+                futures[pool.submit(_analyze_file, source, events_path, use_cache, model_path, backend)] = source
+            save_status(out_dir, status)
+
+            try:
+                for future in as_completed(futures):
+                    source = futures[future]
+                    entry = status[source]
+                    try:
+                        stats = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        entry.update(status="failed", error=repr(e))
+                        totals["failed"] += 1
+                        print(f"[Batch Error] {source}: {e!r}")
+                    else:
+                        entry.update(status="done", frames=stats["frames"],
+                                     video_seconds=round(stats["video_seconds"], 3),
+                                     wall_seconds=round(stats["wall_seconds"], 3),
+                                     fps=round(stats["fps"], 2), events_written=stats["events"])
+                        entry.pop("error", None)
+                        totals["done"] += 1
+                        totals["frames"] += stats["frames"]
+                        totals["video_seconds"] += stats["video_seconds"]
+                        totals["events"] += stats["events"]
+                        print(f"[{totals['done'] + totals['failed']}/{len(pending)}] {source}: "
+                              f"{stats['frames']} frames, {stats['fps']:.1f} fps")
+                    save_status(out_dir, status)
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); "running" entries are retried on resume
+                print("[Batch Error] worker process died; rerun the same command to resume")
+                save_status(out_dir, status)
+
+    wall = time.perf_counter() - wall_start
+    totals.update(
+        videos=len(sources),
+        skipped=skipped,
+        wall_seconds=wall,
+        fps=totals["frames"] / wall if wall > 0 else 0.0,
+        realtime_factor=totals["video_seconds"] / wall if wall > 0 else 0.0,
+        status_path=os.path.join(out_dir, STATUS_FILE),
+    )
+    return totals
+
+
+def format_summary(totals):
+    return "\n".join([
+        f"Batch finished: {totals['done']} done, {totals['failed']} failed, "
+        f"{totals['skipped']} skipped (of {totals['videos']} videos) in {totals['wall_seconds']:.1f}s",
+        f"  throughput: {totals['frames']} frames | {totals['fps']:.1f} fps aggregate | "
+        f"{totals['realtime_factor']:.2f}x real time ({totals['video_seconds']:.1f}s of video)",
+        f"  events written: {totals['events']}",
+        f"  status manifest: {totals['status_path']}",
+    ])
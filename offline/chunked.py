@@ -0,0 +1,269 @@
+"""
+Parallel analysis of one long video, split into time segments.
+
+Each segment runs in its own process. It starts CHUNK_WARMUP_SECONDS before
+its nominal start, and those warm-up frames only prime the tracker, the
+scheduler and the behavior timers; their events are discarded. The parent
+then stitches the per-segment results back into one timeline:
+
+- Track ids are made global by matching each segment's boxes on the frame
+  just before it starts (its last warm-up frame) against the boxes the
+  previous segment produced on that same frame (its last frame).
+- An alert still open when a segment ends, followed by a matching alert
+  open at the start of the next segment, is the same alert. The artificial
+  end/start pair at the boundary is dropped and durations are recomputed
+  on the merged timeline.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+
+import cv2
+import numpy as np
+
+import config
+from utils.geometry import box_iou
+
+_worker_detector = None   # loaded once per worker process by _init_worker
+
+
+def plan_chunks(total_frames, fps, chunk_seconds=None, warmup_seconds=None):
+    """Split [0, total_frames) into (warmup_start, start, end) frame ranges."""
+    chunk_seconds = chunk_seconds or config.CHUNK_SECONDS
+    if warmup_seconds is None:
+        warmup_seconds = config.CHUNK_WARMUP_SECONDS
+    chunk_frames = max(1, int(chunk_seconds * fps))
+    warmup_frames = int(warmup_seconds * fps)
+    return [
+        (max(0, start - warmup_frames), start, min(start + chunk_frames, total_frames))
+        for start in range(0, total_frames, chunk_frames)
+    ]
+
+
+def _tracks_snapshot(tracked_objects):
+    return {"ids": np.asarray(tracked_objects.ids, dtype=int).copy(),
+            "xyxy": np.asarray(tracked_objects.xyxy, dtype=np.float32).copy()}
+
+
+def _init_worker(model_path, backend_name, threads):
+    global _worker_detector
+    from detection.detector import Detector
+    from detection.process_pool import create_worker_backend
+
+    backend = create_worker_backend(backend_name, model_path, threads)
+    _worker_detector = Detector(model_path=model_path, backend=backend)
+
+
+def _process_chunk(source, chunk):
+    """Worker: analyze one segment. Returns its events and boundary tracks."""
+    from analysis import FrameAnalyzer
+    from offline.events import BehaviorEventExtractor
+
+    warm_start, start, end = chunk
+    # A new FrameAnalyzer resets the detector's tracker, so segments never share tracks
+    analyzer = FrameAnalyzer(_worker_detector)
+    extractor = BehaviorEventExtractor(analyzer.scorer)
+
+    cap = cv2.VideoCapture(source)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, warm_start)
+    events = []
+    first_tracks = last_tracks = None
+    frames = warmup_frames = 0
+    wall_start = time.perf_counter()
+    for frame_index in range(warm_start, end):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame = cv2.resize(frame, (config.FRAME_WIDTH, config.FRAME_HEIGHT))
+        ts = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        result = analyzer.analyze(analyzer.infer(frame, ts), ts)
+        result["video_timestamp"] = ts
+        result["frame_index"] = frame_index
+        frames += 1
+        if frame_index < start:
+            warmup_frames += 1
+
+        if frame_index == start - 1:
+            first_tracks = _tracks_snapshot(result["tracked_objects"])
+        if frame_index == start:
+            # Whatever is already active now is re-reported as starting here;
+            # merge_chunks() joins it with the previous segment's open alert
+            extractor.reset()
+            for record in extractor.update(result):
+                record["_boundary"] = start > 0
+                events.append(record)
+        elif frame_index > start:
+            events += extractor.update(result)
+        last_tracks = _tracks_snapshot(result["tracked_objects"])
+    cap.release()
+
+    for record in extractor.finish():
+        record["_boundary"] = True   # closed only because the segment ended
+        events.append(record)
+
+    return {
+        "chunk": chunk,
+        "events": events,
+        "first_tracks": first_tracks,
+        "last_tracks": last_tracks,
+        "frames": frames,
+        "warmup_frames": warmup_frames,
+        "wall_seconds": time.perf_counter() - wall_start,
+    }
+
+
+def _match_ids(prev_tracks, tracks):
+    """Greedy IoU match of one frame's boxes from two segments → {local id: previous id}."""
+    if prev_tracks is None or tracks is None or not len(prev_tracks["ids"]) or not len(tracks["ids"]):
+        return {}
+    iou = box_iou(tracks["xyxy"], prev_tracks["xyxy"])
+    mapping = {}
+    used_i, used_j = set(), set()
+    for flat in np.argsort(-iou, axis=None):
+        i, j = divmod(int(flat), iou.shape[1])
+        if iou[i, j] < config.CHUNK_ID_MATCH_IOU:
+            break
+        if i in used_i or j in used_j:
+            continue
+        mapping[int(tracks["ids"][i])] = int(prev_tracks["ids"][j])
+        used_i.add(i)
+        used_j.add(j)
+    return mapping
+
+
+def _remap(record, id_map):
+    if "track_id" in record:
+        record["track_id"] = id_map(record["track_id"])
+    if "pairs" in record:
+        for pair in record["pairs"]:
+            pair["ids"] = sorted(id_map(pid) for pid in pair["ids"])
+    if "tracks" in record:
+        record["tracks"] = {str(id_map(int(pid))): v for pid, v in record["tracks"].items()}
+
+
+def _alert_key(record):
+    kind = record["event"].rsplit("_", 1)[0]
+    return kind, record.get("track_id")
+
+
+def merge_chunks(chunk_results):
+    """Global track ids, boundary de-duplication and recomputed durations → one timeline."""
+    chunk_results = sorted(chunk_results, key=lambda r: r["chunk"][1])
+    merged = []
+    offset = 0          # ids new in a segment are shifted past every global id used before
+    prev_map = {}
+    prev_last = None
+    for result in chunk_results:
+        # Local ids seen at the boundary inherit the previous segment's global id
+        local_map = {
+            local: prev_map[prev_local]
+            for local, prev_local in _match_ids(prev_last, result["first_tracks"]).items()
+            if prev_local in prev_map
+        }
+
+        def id_map(local_id, local_map=local_map, offset=offset):
+            local_id = int(local_id)
+            if local_id not in local_map:
+                local_map[local_id] = local_id + offset
+            return local_map[local_id]
+
+        for record in result["events"]:
+            _remap(record, id_map)
+            merged.append(record)
+        if result["last_tracks"] is not None:
+            for local_id in result["last_tracks"]["ids"]:
+                id_map(local_id)
+        if local_map:
+            offset = max(offset, max(local_map.values()))
+        prev_map = local_map
+        prev_last = result["last_tracks"]
+
+    # Drop end/start pairs that only exist because of a segment boundary
+    merged.sort(key=lambda r: (r["video_timestamp"], not r["event"].endswith("_end")))
+    timeline = []
+    pending_end = {}
+    for record in merged:
+        boundary = record.pop("_boundary", False)
+        if record["event"] == "scores":
+            timeline.append(record)
+            continue
+        key = _alert_key(record)
+        if record["event"].endswith("_end") and boundary:
+            pending_end[key] = record
+            timeline.append(record)
+        elif record["event"].endswith("_start") and boundary and key in pending_end:
+            timeline.remove(pending_end.pop(key))
+        else:
+            pending_end.pop(key, None)
+            timeline.append(record)
+
+    # Durations relative to the merged start of each alert
+    open_since = {}
+    for record in timeline:
+        if record["event"] == "scores":
+            continue
+        key = _alert_key(record)
+        if record["event"].endswith("_start"):
+            open_since[key] = record["video_timestamp"]
+        elif key in open_since:
+            record["duration"] = round(record["video_timestamp"] - open_since.pop(key), 3)
+    return timeline
+
+
+def run_chunked(source, events_path, jobs, model_path=None, backend=None):
+    """Analyze `source` in `jobs` processes and write the merged JSONL timeline."""
+    from offline.events import JsonlEventWriter
+
+    model_path = model_path or config.MODEL_PATH
+    backend = backend or config.INFERENCE_BACKEND
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"Unable to open source: {source}")
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if fps <= 0:
+        fps = 30.0
+    cap.release()
+    if total_frames <= 0:
+        raise ValueError(f"Chunked mode needs a seekable file with a known frame count: {source}")
+
+    chunks = plan_chunks(total_frames, fps)
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=mp.get_context("spawn"), initializer=_init_worker,
+                             initargs=(model_path, backend, config.INFERENCE_WORKER_THREADS)) as pool:
+        futures = [pool.submit(_process_chunk, source, chunk) for chunk in chunks]
+        chunk_results = [f.result() for f in futures]
+    wall = time.perf_counter() - wall_start
+
+    timeline = merge_chunks(chunk_results)
+    writer = JsonlEventWriter(events_path)
+    writer.write(timeline)
+    writer.close()
+
+    # Frames actually decoded and analyzed (warm-up included; undecodable frames are not)
+    frames = sum(r["frames"] for r in chunk_results)
+    warmup_frames = sum(r["warmup_frames"] for r in chunk_results)
+    video_seconds = (frames - warmup_frames) / fps
+    return {
+        "source": str(source),
+        "frames": frames,
+        "total_frames": total_frames,
+        "chunks": len(chunks),
+        "warmup_frames": warmup_frames,
+        "wall_seconds": wall,
+        "video_seconds": video_seconds,
+        "fps": frames / wall if wall > 0 else 0.0,
+        "realtime_factor": video_seconds / wall if wall > 0 else 0.0,
+        "events": writer.count,
+    }
+
+
+def format_summary(stats):
+    return "\n".join([
+        f"Processed {stats['frames']} frames of {stats['source']} in {stats['wall_seconds']:.1f}s "
+        f"({stats['chunks']} segments; {stats['warmup_frames']} of them warm-up, "
+        f"{stats['frames'] - stats['warmup_frames']}/{stats['total_frames']} of the video)",
+        f"  throughput: {stats['fps']:.1f} fps | {stats['realtime_factor']:.2f}x real time "
+        f"({stats['video_seconds']:.1f}s of video)",
+        f"  events written: {stats['events']}",
+    ])
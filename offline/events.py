@@ -0,0 +1,128 @@
+"""
+Turn per-frame analysis results into discrete, timestamped behavior events.
+
+Each alert type produces a *_start record when it appears and a *_end record
+(with its duration) when it clears, so a whole video reduces to a short
+timeline. Per-track threat scores are sampled every SCORE_EVENT_INTERVAL
+seconds of video. All times are video timestamps, never wall clock.
+"""
+import json
+
+import config
+
+
+class BehaviorEventExtractor:
+    def __init__(self, scorer, source=None):
+        self.scorer = scorer
+        self.source = source
+        self.reset()
+
+    def reset(self):
+        """Forget open alerts (e.g. after a seek); nothing is closed retroactively."""
+        self._conflict_since = None
+        self._abandoned_since = {}
+        self._loiter_since = {}
+        self._last_scores_time = None
+        self._last_time = None
+        self._last_frame = None
+
+    def _record(self, event, result, **fields):
+        record = {
+            "event": event,
+            "video_timestamp": round(result["video_timestamp"], 3),
+            "frame_index": result.get("frame_index"),
+        }
+        if self.source is not None:
+            record["source"] = self.source
+        record.update(fields)
+        return record
+
+    def update(self, result):
+        """Returns the list of event records triggered by this frame's result."""
+        events = []
+        ts = result["video_timestamp"]
+
+        # ── Conflict (one global alert, reported with the pairs involved) ──
+        if result["conflict_alert"] and self._conflict_since is None:
+            self._conflict_since = ts
+            pairs = [
+                {"ids": [int(a), int(b)], "fight_score": round(float(score), 2)}
+                for (a, b), score in result["pair_scores"].items()
+            ]
+            events.append(self._record("conflict_start", result, pairs=pairs))
+        elif not result["conflict_alert"] and self._conflict_since is not None:
+            events.append(self._record("conflict_end", result,
+                                       duration=round(ts - self._conflict_since, 3)))
+            self._conflict_since = None
+
+        # ── Per-track alerts ──
+        events += self._track_alerts("abandoned", result["suspicious_bags"], self._abandoned_since, result)
+        events += self._track_alerts("loiter", result["suspicious_ids"], self._loiter_since, result)
+
+        # ── Sampled per-track scores ──
+        if (self._last_scores_time is None or
+                ts - self._last_scores_time >= config.SCORE_EVENT_INTERVAL):
+            if result["instant_scores"]:
+                self._last_scores_time = ts
+                tracks = {
+                    str(pid): {
+                        "instant": score,
+                        "session": result["session_scores"].get(pid, 0),
+                        "level": self.scorer.get_level(score),
+                    }
+                    for pid, score in result["instant_scores"].items()
+                }
+                events.append(self._record("scores", result, tracks=tracks))
+
+        self._last_time = ts
+        self._last_frame = result.get("frame_index")
+        return events
+
+    def _track_alerts(self, name, active_ids, open_since, result):
+        events = []
+        ts = result["video_timestamp"]
+        active_ids = set(active_ids)
+        for track_id in active_ids:
+            if track_id not in open_since:
+                open_since[track_id] = ts
+                events.append(self._record(f"{name}_start", result, track_id=int(track_id)))
+        for track_id in list(open_since):
+            if track_id not in active_ids:
+                events.append(self._record(f"{name}_end", result, track_id=int(track_id),
+                                           duration=round(ts - open_since.pop(track_id), 3)))
+        return events
+
+    def finish(self):
+        """Close every alert still open at the end of the video."""
+        if self._last_time is None:
+            return []
+        last = {"video_timestamp": self._last_time, "frame_index": self._last_frame}
+        events = []
+        if self._conflict_since is not None:
+            events.append(self._record("conflict_end", last,
+                                       duration=round(self._last_time - self._conflict_since, 3)))
+        for name, open_since in (("abandoned", self._abandoned_since), ("loiter", self._loiter_since)):
+            for track_id, since in open_since.items():
+                events.append(self._record(f"{name}_end", last, track_id=int(track_id),
+                                           duration=round(self._last_time - since, 3)))
+        self.reset()
+        return events
+
+
+class JsonlEventWriter:
+    """Appends one JSON object per line; flushed per batch so a crash loses little."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, records):
+        for record in records:
+            self._file.write(json.dumps(record) + "\n")
+        self.count += len(records)
+        if records:
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
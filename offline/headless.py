@@ -0,0 +1,201 @@
+"""
+Headless batch analysis: no window, no panel, no imshow/waitKey.
+
+Runs the same AnalysisPipeline as the GUI (capture → preprocess → inference
+→ behavior) with every queue blocking, so no frame is dropped and the CPU
+goes only to decoding, detection and the behavior stack. Alerts and sampled
+per-track scores are written as JSONL; an annotated video is optional.
+"""
+import os
+import queue
+import time
+
+import cv2
+
+import config
+from analysis import FrameAnalyzer, AnalysisPipeline
+from detection.cache import DetectionRecorder
+from offline.events import BehaviorEventExtractor, JsonlEventWriter
+from utils.drawing import draw_keypoints
+from utils.pipeline import END
+
+
+def annotate(frame, result, scorer):
+    """Boxes, ids, threat levels and skeletons — the video part of the GUI, without the panel."""
+    tracked_objects = result["tracked_objects"]
+    flagged = set(result["suspicious_ids"]) | set(result["suspicious_bags"])
+    persons = [o for o in tracked_objects if o["class"] == config.PERSON]
+    for obj in tracked_objects:
+        x1, y1, x2, y2 = (int(v) for v in obj["bbox"])
+        color = (0, 0, 255) if obj["id"] in flagged else (0, 255, 0)
+        label = f"{obj['name']} ID:{obj['id']}"
+        if obj["id"] in result["instant_scores"]:
+            label += f" | {scorer.get_level(result['instant_scores'][obj['id']])}"
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, config.BOX_THICKNESS)
+        cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX,
+                    config.FONT_SCALE, color, config.FONT_THICKNESS)
+        if config.SHOW_KEYPOINTS and obj["class"] == config.PERSON:
+            draw_keypoints(frame, obj, all_persons=persons)
+    if result["conflict_alert"]:
+        cv2.putText(frame, "POSSIBLE PHYSICAL CONFLICT", (20, 40), cv2.FONT_HERSHEY_SIMPLEX,
+                    1.0, (0, 0, 255), 2)
+    return frame
+
+
+def run_headless(source, detector, events_path, render_path=None, recorder=None):
+    """
+    Analyze `source` as fast as possible. Returns a stats dict
+    (frames, wall/video seconds, fps, events written). With a
+    DetectionRecorder, every frame's inference output is recorded for the
+    detection cache.
+    """
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"Unable to open source: {source}")
+
+    analyzer = FrameAnalyzer(detector)
+    analyzer.recorder = recorder
+    # Offline: every stage blocks, nothing is ever dropped
+    pipeline = AnalysisPipeline(cap, analyzer, drop_policies={"behavior": "block"})
+    extractor = BehaviorEventExtractor(analyzer.scorer)
+    writer = JsonlEventWriter(events_path)
+
+    out = None
+    if render_path:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if fps <= 0:
+            fps = 30.0
+        out = cv2.VideoWriter(render_path, cv2.VideoWriter_fourcc(*"MJPG"), fps,
+                              (config.FRAME_WIDTH, config.FRAME_HEIGHT))
+
+    frames = 0
+    first_ts = last_ts = None
+    start = time.perf_counter()
+    pipeline.start()
+    try:
+        while True:
+            try:
+                result = pipeline.output.get(timeout=0.5)
+            except queue.Empty:
+                if pipeline.stop_event.is_set():
+                    break
+                continue
+            if result is END:
+                break
+
+            frames += 1
+            if first_ts is None:
+                first_ts = result["video_timestamp"]
+            last_ts = result["video_timestamp"]
+            writer.write(extractor.update(result))
+            if out is not None:
+                out.write(annotate(result["frame"], result, analyzer.scorer))
+    finally:
+        pipeline.stop()
+        writer.write(extractor.finish())
+        writer.close()
+        if out is not None:
+            out.release()
+        cap.release()
+
+    wall = time.perf_counter() - start
+    video_seconds = (last_ts - first_ts) if frames else 0.0
+    return {
+        "source": str(source),
+        "frames": frames,
+        "wall_seconds": wall,
+        "video_seconds": video_seconds,
+        "fps": frames / wall if wall > 0 else 0.0,
+        "realtime_factor": video_seconds / wall if wall > 0 else 0.0,
+        "events": writer.count,
+        "complete": not any(stage.error for stage in pipeline.pipeline.stages),
+        "scheduler": analyzer.scheduler.summary(),
+        "pipeline": pipeline.summary(),
+    }
+
+
+def replay_events(cached, cfg=None):
+    """
+    Behavior analysis of cached detections (no decoding, no model), yielding
+    each frame's event records. Skipped frames are propagated as in the
+    original run. `cfg` overrides the behavior settings.
+    """
+    analyzer = FrameAnalyzer(None, cfg=cfg)
+    extractor = BehaviorEventExtractor(analyzer.scorer)
+    for frame_index, ts, tracked_objects in cached:
+        result = analyzer.analyze(analyzer.apply_tracked(tracked_objects, ts), ts)
+        result["video_timestamp"] = ts
+        result["frame_index"] = frame_index
+        yield extractor.update(result)
+    yield extractor.finish()
+
+
+def replay_cached(cached, events_path, source=None):
+    """Write the events of a detection-cache replay to `events_path`."""
+    writer = JsonlEventWriter(events_path)
+    start = time.perf_counter()
+    try:
+        for records in replay_events(cached):
+            writer.write(records)
+    finally:
+        writer.close()
+
+    wall = time.perf_counter() - start
+    frames = len(cached)
+    video_seconds = float(cached.timestamps[-1] - cached.timestamps[0]) if frames else 0.0
+    return {
+        "source": str(source),
+        "frames": frames,
+        "wall_seconds": wall,
+        "video_seconds": video_seconds,
+        "fps": frames / wall if wall > 0 else 0.0,
+        "realtime_factor": video_seconds / wall if wall > 0 else 0.0,
+        "events": writer.count,
+        "complete": True,
+        "scheduler": "Detection scheduler: replayed from detection cache",
+        "pipeline": "Pipeline: not used (cache replay)",
+    }
+
+
+def analyze_source(source, events_path, get_detector, cache=None, render_path=None,
+                   model_path=None, backend=None):
+    """
+    Headless analysis through the detection cache (detection/cache.py): a hit
+    replays the cached detections, a miss runs the model and fills the cache.
+    `get_detector()` is only called when the model is actually needed.
+    """
+    if cache is None:
+        return run_headless(source, get_detector(), events_path, render_path=render_path)
+    if not isinstance(source, str) or not os.path.isfile(source):
+        # Camera index or stream URL: no file content to key the cache on
+        stats = run_headless(source, get_detector(), events_path, render_path=render_path)
+        stats["cache"] = "n/a"
+        return stats
+
+    key = cache.key(source, model_path, backend)
+    cached = cache.load(key)
+    if cached is not None and not render_path:   # rendering needs the decoded frames
+        stats = replay_cached(cached, events_path, source)
+        stats["cache"] = "hit"
+        return stats
+
+    recorder = DetectionRecorder()
+    stats = run_headless(source, get_detector(), events_path, render_path=render_path, recorder=recorder)
+    if stats["complete"]:
+        cache.save(key, recorder)
+        stats["cache"] = "miss (saved)"
+    else:
+        stats["cache"] = "miss (run incomplete, not saved)"
+    return stats
+
+
+def format_summary(stats):
+    cache = f" | detection cache: {stats['cache']}" if "cache" in stats else ""
+    return "\n".join([
+        f"Processed {stats['frames']} frames of {stats['source']} in {stats['wall_seconds']:.1f}s{cache}",
+        f"  throughput: {stats['fps']:.1f} fps | {stats['realtime_factor']:.2f}x real time "
+        f"({stats['video_seconds']:.1f}s of video)",
+        f"  events written: {stats['events']}",
+        stats["scheduler"],
+        stats["pipeline"],
+    ])
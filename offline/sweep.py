@@ -0,0 +1,234 @@
+"""
+Behavior threshold sweep over replayed detections.
+
+Takes videos already in the detection cache (run them once with
+`main.py --headless --cache`) and a labels file of ground-truth event
+intervals, replays the cached detections through ConflictDetector,
+LoiteringDetector, AbandonedObjectDetector and ThreatScorer once per
+parameter set of a grid, in parallel processes, and reports precision,
+recall and detection delay for each set. No frame is decoded and no model
+is loaded.
+
+    python -m offline.sweep --labels labels.json --grid grid.json --jobs 8
+
+labels.json:
+    {"videos": [{"source": "clips/a.mp4",
+                 "events": [{"type": "conflict", "start": 12.0, "end": 18.5},
+                            {"type": "abandoned", "start": 40.0, "end": 95.0}]}]}
+    ("type" is conflict, abandoned or loiter; times in video seconds; an entry may
+    give "detections": <cache .npz> instead of relying on the cache lookup)
+
+grid.json:
+    {"PROXIMITY_DISTANCE": [120, 150, 180], "CONFLICT_CONFIRM_FRAMES": [2, 3, 4]}
+"""
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from detection.cache import KEY_SETTINGS, DetectionCache, load_cached_run
+
+EVENT_TYPES = ("conflict", "abandoned", "loiter")
+
+# Baked into the cached detections: changing them needs a new inference run
+_NOT_SWEEPABLE = KEY_SETTINGS + ("MODEL_PATH", "INFERENCE_BACKEND")
+
+_worker_videos = None   # [(source, CachedRun, labels)] per worker process
+
+
+def make_cfg(overrides):
+    """Snapshot of the config module with `overrides` applied, for one detector set."""
+    settings = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+    for name in overrides:
+        if name not in settings:
+            raise ValueError(f"Unknown config setting in grid: {name}")
+        if name in _NOT_SWEEPABLE:
+            raise ValueError(f"{name} changes the detections themselves and cannot be swept on replay")
+    settings.update(overrides)
+    return types.SimpleNamespace(**settings)
+
+
+def expand_grid(grid):
+    """{"A": [1, 2], "B": [3]} → [{"A": 1, "B": 3}, {"A": 2, "B": 3}]"""
+    names = list(grid)
+    values = [v if isinstance(v, list) else [v] for v in grid.values()]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def load_labels(path, model_path=None, backend=None):
+    """Labels file → [(source, cache .npz path, labels)], relative paths resolved against the file."""
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    cache = DetectionCache()
+    videos, missing = [], []
+    for entry in spec["videos"]:
+        source = entry["source"]
+        if not os.path.isabs(source):
+            source = os.path.join(base, source)
+        detections = entry.get("detections")
+        if detections:
+            detections = detections if os.path.isabs(detections) else os.path.join(base, detections)
+        else:
+            detections = cache.path(cache.key(source, model_path, backend))
+        if not os.path.exists(detections):
+            missing.append(source)
+            continue
+        labels = []
+        for event in entry.get("events", []):
+            if event["type"] not in EVENT_TYPES:
+                raise ValueError(f"Unknown event type in {path}: {event['type']}")
+            labels.append((event["type"], float(event["start"]), float(event["end"])))
+        videos.append((source, detections, labels))
+    if missing:
+        raise FileNotFoundError(
+            "No cached detections for: " + ", ".join(missing) +
+            " — run `python main.py --headless --cache --source <video>` first")
+    return videos
+
+
+def predicted_intervals(events):
+    """Event records → [(type, start, end)] from matching *_start / *_end pairs."""
+    open_since = {}
+    intervals = []
+    for record in events:
+        kind, _, edge = record["event"].rpartition("_")
+        if kind not in EVENT_TYPES:
+            continue
+        key = (kind, record.get("track_id"))
+        if edge == "start":
+            open_since[key] = record["video_timestamp"]
+        elif key in open_since:
+            intervals.append((kind, open_since.pop(key), record["video_timestamp"]))
+    return intervals
+
+
+def match_events(predicted, labels, tolerance):
+    """Per-type counts: predictions overlapping a label, labels hit, and each hit's delay."""
+    stats = {kind: {"predicted": 0, "true_positive": 0, "labels": 0, "detected": 0, "delays": []}
+             for kind in EVENT_TYPES}
+    for kind, start, end in predicted:
+        stats[kind]["predicted"] += 1
+        if any(k == kind and start <= le + tolerance and end >= ls - tolerance for k, ls, le in labels):
+            stats[kind]["true_positive"] += 1
+    for kind, ls, le in labels:
+        stats[kind]["labels"] += 1
+        hits = [start for k, start, end in predicted
+                if k == kind and start <= le + tolerance and end >= ls - tolerance]
+        if hits:
+            stats[kind]["detected"] += 1
+            stats[kind]["delays"].append(max(0.0, min(hits) - ls))
+    return stats
+
+
+def _summarize(stats):
+    predicted = stats["predicted"]
+    labels = stats["labels"]
+    precision = stats["true_positive"] / predicted if predicted else None
+    recall = stats["detected"] / labels if labels else None
+    f1 = None
+    if precision is not None and recall is not None and precision + recall > 0:
+        f1 = 2 * precision * recall / (precision + recall)
+    delays = stats["delays"]
+    return {
+        "precision": precision, "recall": recall, "f1": f1,
+        "mean_delay": sum(delays) / len(delays) if delays else None,
+        "max_delay": max(delays) if delays else None,
+        "predicted": predicted, "labels": labels,
+    }
+
+
+def _init_worker(videos):
+    global _worker_videos
+    _worker_videos = [(source, load_cached_run(path), labels) for source, path, labels in videos]
+
+
+def _evaluate(overrides, tolerance):
+    from offline.headless import replay_events
+
+    cfg = make_cfg(overrides)
+    totals = {kind: {"predicted": 0, "true_positive": 0, "labels": 0, "detected": 0, "delays": []}
+              for kind in EVENT_TYPES}
+    for _, cached, labels in _worker_videos:
+        events = [record for records in replay_events(cached, cfg) for record in records]
+        for kind, stats in match_events(predicted_intervals(events), labels, tolerance).items():
+            for name in ("predicted", "true_positive", "labels", "detected"):
+                totals[kind][name] += stats[name]
+            totals[kind]["delays"] += stats["delays"]
+
+    overall = {name: sum(t[name] for t in totals.values())
+               for name in ("predicted", "true_positive", "labels", "detected")}
+    overall["delays"] = [d for t in totals.values() for d in t["delays"]]
+    return {
+        "params": overrides,
+        "overall": _summarize(overall),
+        "per_type": {kind: _summarize(t) for kind, t in totals.items() if t["labels"] or t["predicted"]},
+    }
+
+
+def run_sweep(labels_path, grid, jobs, tolerance=None, model_path=None, backend=None):
+    """Evaluate every parameter set of `grid`; results sorted best F1 first."""
+    if tolerance is None:
+        tolerance = config.SWEEP_MATCH_TOLERANCE
+    videos = load_labels(labels_path, model_path, backend)
+    param_sets = expand_grid(grid)
+    for overrides in param_sets:
+        make_cfg(overrides)   # fail fast on typos before starting workers
+
+    print(f"Sweep: {len(param_sets)} parameter sets × {len(videos)} videos on {jobs} processes")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=mp.get_context("spawn"),
+                             initializer=_init_worker, initargs=(videos,)) as pool:
+        results = list(pool.map(_evaluate, param_sets, itertools.repeat(tolerance)))
+    print(f"Sweep finished in {time.perf_counter() - start:.1f}s")
+
+    results.sort(key=lambda r: (r["overall"]["f1"] or 0.0, -(r["overall"]["mean_delay"] or 0.0)),
+                 reverse=True)
+    return results
+
+
+def _fmt(value, pattern="{:.2f}"):
+    return "-" if value is None else pattern.format(value)
+
+
+def format_results(results, top=None):
+    lines = [f"{'F1':>5} {'prec':>5} {'recall':>6} {'delay':>6}  params"]
+    for r in results[:top]:
+        o = r["overall"]
+        params = ", ".join(f"{k}={v}" for k, v in r["params"].items())
+        lines.append(f"{_fmt(o['f1']):>5} {_fmt(o['precision']):>5} {_fmt(o['recall']):>6} "
+                     f"{_fmt(o['mean_delay'], '{:.1f}s'):>6}  {params}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep behavior thresholds over cached detections.")
+    parser.add_argument("--labels", required=True, help="Labels JSON (videos + ground-truth event intervals).")
+    parser.add_argument("--grid", required=True, help="JSON object: config setting → list of values.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="Seconds a prediction may fall outside a label and still match "
+                             "(default: SWEEP_MATCH_TOLERANCE).")
+    parser.add_argument("--model", default=None, help="MODEL_PATH the detections were cached with.")
+    parser.add_argument("--backend", default=None, help="Backend the detections were cached with.")
+    parser.add_argument("--top", type=int, default=20, help="Rows to print.")
+    parser.add_argument("--report", default=None, help="Write all results as JSON to this path.")
+    args = parser.parse_args()
+
+    with open(args.grid, encoding="utf-8") as f:
+        grid = json.load(f)
+    results = run_sweep(args.labels, grid, args.jobs, args.tolerance, args.model, args.backend)
+    print(format_results(results, args.top))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Report written to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
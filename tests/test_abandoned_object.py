@@ -0,0 +1,37 @@
+import config
+from behavior.abandoned_object import AbandonedObjectDetector
+from detection.detections import Detections
+from utils.clock import VideoClock
+
+
+def frame(bag_x, person_x):
+    objects = [{"id": 5, "class": config.BACKPACK, "bbox": (bag_x, 300, bag_x + 40, 340), "conf": 0.8}]
+    if person_x is not None:
+        objects.append({"id": 1, "class": config.PERSON, "bbox": (person_x, 200, person_x + 60, 360), "conf": 0.9})
+    return objects
+
+
+def run(as_container):
+    clock = VideoClock(0.0)
+    detector = AbandonedObjectDetector(clock=clock)
+    flagged = []
+    for step in range(80):
+        t = step * 0.1
+        clock.set(t)
+        # Owner next to the bag for 1 s, then walks out of range
+        objects = frame(100, 120 if t < 1.0 else 600)
+        if as_container:
+            objects = Detections.from_dicts(objects)
+        flagged.append(detector.update(objects))
+    return flagged
+
+
+def test_bag_flagged_once_owner_is_away_long_enough():
+    flagged = run(as_container=True)
+    first = next(i for i, bags in enumerate(flagged) if bags)
+    assert flagged[first] == [5]
+    assert 0.9 + config.ABANDON_TIME <= first * 0.1 <= 1.1 + config.ABANDON_TIME
+
+
+def test_dict_rows_and_container_give_the_same_result():
+    assert run(as_container=False) == run(as_container=True)
@@ -0,0 +1,22 @@
+import shutil
+
+import pytest
+
+from detection.cache import video_fingerprint
+
+
+def test_fingerprint_follows_content_not_name(tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(bytes(range(256)) * 100)
+    copy = tmp_path / "b.mp4"
+    shutil.copy(video, copy)
+    assert video_fingerprint(str(video)) == video_fingerprint(str(copy))
+
+    copy.write_bytes(bytes(range(256)) * 99)
+    assert video_fingerprint(str(video)) != video_fingerprint(str(copy))
+
+
+def test_fingerprint_rejects_camera_index():
+    # 0 would otherwise be read as file descriptor 0 (stdin)
+    with pytest.raises(TypeError):
+        video_fingerprint(0)
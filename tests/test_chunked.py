@@ -0,0 +1,95 @@
+import numpy as np
+
+from offline.chunked import _match_ids, merge_chunks, plan_chunks
+
+BOX_A = [100, 100, 160, 260]
+BOX_B = [400, 120, 460, 280]
+
+
+def tracks(ids, boxes):
+    return {"ids": np.array(ids, dtype=int), "xyxy": np.array(boxes, dtype=np.float32).reshape(-1, 4)}
+
+
+def event(name, ts, track_id, boundary=None, **extra):
+    record = {"event": name, "video_timestamp": ts, **extra}
+    if track_id is not None:
+        record["track_id"] = track_id
+    if boundary is not None:
+        record["_boundary"] = boundary
+    return record
+
+
+def chunk(bounds, events, first, last):
+    return {"chunk": bounds, "events": events, "first_tracks": first, "last_tracks": last}
+
+
+def test_plan_chunks_warmup_and_tail():
+    assert plan_chunks(250, 10, chunk_seconds=10, warmup_seconds=2) == [
+        (0, 0, 100), (80, 100, 200), (180, 200, 250)]
+
+
+def test_match_ids_greedy_iou_with_threshold():
+    prev = tracks([7, 9], [BOX_A, BOX_B])
+    cur = tracks([1, 2, 3], [BOX_B, [102, 98, 162, 258], [600, 300, 650, 400]])
+    assert _match_ids(prev, cur) == {1: 9, 2: 7}
+    assert _match_ids(None, cur) == {}
+    assert _match_ids(prev, tracks([], [])) == {}
+
+
+def test_alert_carried_across_boundary_is_merged():
+    first = chunk((0, 0, 100), [
+        event("abandoned_start", 3.0, 2),
+        event("abandoned_end", 9.9, 2, boundary=True, duration=6.9),
+    ], None, tracks([2], [BOX_A]))
+    # The same bag is local id 1 in the next segment; its alert is re-reported at the boundary
+    second = chunk((80, 100, 200), [
+        event("abandoned_start", 10.0, 1, boundary=True),
+        event("abandoned_end", 19.9, 1, boundary=True, duration=9.9),
+    ], tracks([1], [BOX_A]), tracks([1], [BOX_A]))
+
+    timeline = merge_chunks([second, first])   # any completion order
+
+    assert [(r["event"], r["video_timestamp"], r["track_id"]) for r in timeline] == [
+        ("abandoned_start", 3.0, 2), ("abandoned_end", 19.9, 2)]
+    assert timeline[-1]["duration"] == 16.9
+    assert all("_boundary" not in r for r in timeline)
+
+
+def test_real_end_then_start_at_boundary_is_kept():
+    first = chunk((0, 0, 100), [
+        event("loiter_start", 2.0, 1),
+        event("loiter_end", 5.0, 1),
+    ], None, tracks([1], [BOX_A]))
+    second = chunk((80, 100, 200), [
+        event("loiter_start", 10.0, 1, boundary=True),
+        event("loiter_end", 12.0, 1),
+    ], tracks([1], [BOX_A]), tracks([1], [BOX_A]))
+
+    timeline = merge_chunks([first, second])
+
+    assert [r["event"] for r in timeline] == ["loiter_start", "loiter_end", "loiter_start", "loiter_end"]
+    assert [r.get("duration") for r in timeline if r["event"] == "loiter_end"] == [3.0, 2.0]
+
+
+def test_new_local_ids_never_collide_with_global_ids():
+    # Segment 1 ends with global ids 1 and 2
+    first = chunk((0, 0, 100), [event("loiter_start", 1.0, 2)], None, tracks([1, 2], [BOX_A, BOX_B]))
+    # Segment 2: local 1 is the old track 2; local 2 is a new person that must not become global 2
+    second = chunk((80, 100, 200), [
+        event("loiter_start", 11.0, 2),
+        event("conflict_start", 12.0, None, pairs=[{"ids": [1, 2]}]),
+    ], tracks([1], [BOX_B]), tracks([1, 2], [BOX_B, BOX_A]))
+    # Segment 3: local 1 continues segment 2's new person, local 3 is new again
+    third = chunk((180, 200, 300), [
+        event("loiter_start", 21.0, 1),
+        event("loiter_start", 22.0, 3),
+    ], tracks([1], [BOX_A]), tracks([1, 3], [BOX_A, BOX_B]))
+
+    timeline = merge_chunks([first, second, third])
+    ids = {r["video_timestamp"]: r.get("track_id") for r in timeline}
+
+    new_person = ids[11.0]
+    assert new_person not in (1, 2)
+    assert timeline[2]["pairs"][0]["ids"] == sorted([2, new_person])
+    assert ids[21.0] == new_person
+    assert ids[22.0] not in (1, 2, new_person)
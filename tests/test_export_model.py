@@ -0,0 +1,15 @@
+from export_model import split_frames
+
+
+def test_calibration_and_evaluation_frames_never_overlap():
+    for total, eval_count in [(300, 100), (10, 100), (2, 1), (7, 3)]:
+        calib, held_out = split_frames(list(range(total)), eval_count)
+        assert not set(calib) & set(held_out)
+        assert calib and held_out
+        assert len(held_out) <= eval_count
+        assert sorted(calib + held_out) == list(range(total))
+
+
+def test_too_few_frames_leave_no_calibration_set():
+    calib, held_out = split_frames([0], 5)
+    assert (calib, held_out) == ([], [0])
@@ -0,0 +1,33 @@
+import itertools
+import time
+
+from utils.pipeline import END, Pipeline
+
+
+def test_empty_returns_are_not_counted_as_processed():
+    counter = itertools.count()
+
+    def source():
+        i = next(counter)
+        if i >= 10:
+            return END
+        if i % 2:
+            time.sleep(0.01)    # e.g. a capture timeout: no frame, nothing forwarded
+            return None
+        return i
+
+    pipeline = Pipeline()
+    pipeline.add_stage("capture", source, queue_size=16)
+    out = pipeline.add_stage("double", lambda x: x * 2, queue_size=16)
+    pipeline.start()
+    results = []
+    while (item := out.get(timeout=5)) is not END:
+        results.append(item)
+    pipeline.stop()
+
+    capture, double = pipeline.stages
+    assert results == [0, 4, 8, 12, 16]
+    assert (capture.processed, capture.empty) == (5, 5)
+    assert capture.busy_time < 0.04     # the idle waits are not busy time
+    assert (double.processed, double.empty) == (5, 0)
+    assert "5 items (5 empty)" in pipeline.summary()
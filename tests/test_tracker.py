@@ -0,0 +1,109 @@
+import numpy as np
+
+from detection.backends import FrameDetections
+from detection.tracker import _LOST, _TRACKED, ByteTracker
+
+
+def dets(boxes, conf=0.9, cls=0):
+    xyxy = np.array(boxes, dtype=np.float32).reshape(-1, 4)
+    n = len(xyxy)
+    return FrameDetections(xyxy, np.full(n, conf, dtype=np.float32), np.full(n, cls, dtype=int), None, None)
+
+
+def box(x, y=100, w=60, h=160):
+    return [x, y, x + w, y + h]
+
+
+def ids(rows):
+    return sorted(int(i) for i in rows[:, 4])
+
+
+def test_moving_objects_keep_their_ids():
+    tracker = ByteTracker(frame_rate=30)
+    first = tracker.update(dets([box(100), box(400)]))
+    assert ids(first) == [1, 2]
+    for step in range(1, 15):
+        rows = tracker.update(dets([box(100 + 4 * step), box(400 - 3 * step)]))
+        assert ids(rows) == [1, 2]
+        # det_index points back at the detection row each track was matched to
+        for row in rows:
+            assert int(row[4]) == (1 if row[7] == 0 else 2)
+
+
+def test_track_born_later_needs_a_second_frame():
+    tracker = ByteTracker(frame_rate=30)
+    tracker.update(dets([box(100)]))
+    rows = tracker.update(dets([box(100), box(400)]))
+    assert ids(rows) == [1]                 # new track not confirmed yet
+    rows = tracker.update(dets([box(100), box(400)]))
+    assert ids(rows) == [1, 2]
+
+
+def test_coasted_track_reassociates_at_its_predicted_position():
+    tracker = ByteTracker(frame_rate=30)
+    for step in range(10):
+        tracker.update(dets([box(100 + 12 * step)]))
+    # Detector skipped for five frames: the motion model keeps moving the box
+    for _ in range(5):
+        tracker.coast()
+    track_ids, predicted = tracker.predicted_boxes()
+    assert track_ids.tolist() == [1]
+    assert predicted[0, 0] > 100 + 12 * 9
+    # No overlap with the last detected box any more; only the prediction can match it
+    rows = tracker.update(dets([box(100 + 12 * 15)]))
+    assert ids(rows) == [1]
+
+
+def test_lost_track_recovers_within_buffer():
+    tracker = ByteTracker(frame_rate=30)
+    for _ in range(5):
+        tracker.update(dets([box(200)]))
+    for _ in range(10):                     # occluded: detector ran, saw nothing
+        assert len(tracker.update(dets([]))) == 0
+    assert tracker.state.tolist() == [_LOST]
+    rows = tracker.update(dets([box(200)]))
+    assert ids(rows) == [1]
+
+
+def test_lost_track_expires_after_buffer():
+    tracker = ByteTracker(frame_rate=30)
+    for _ in range(5):
+        tracker.update(dets([box(200)]))
+    for _ in range(tracker.max_time_lost + 1):
+        tracker.update(dets([]))
+    assert len(tracker) == 0
+    tracker.update(dets([box(200)]))
+    rows = tracker.update(dets([box(200)]))
+    assert ids(rows) == [2]
+
+
+def test_low_score_detection_keeps_a_tracked_object():
+    tracker = ByteTracker(frame_rate=30)
+    for _ in range(3):
+        tracker.update(dets([box(200)]))
+    rows = tracker.update(dets([box(202)], conf=0.15))   # below TRACK_HIGH_THRESH
+    assert ids(rows) == [1]
+    assert tracker.state.tolist() == [_TRACKED]
+
+
+def test_remove_duplicates_keeps_the_older_track():
+    tracker = ByteTracker(frame_rate=30)
+    tracker.update(dets([box(100), box(400)]))
+    for _ in range(3):
+        tracker.update(dets([box(100), box(400)]))
+    # Track 2 goes lost exactly on top of track 1, which is younger
+    tracker.mean[1] = tracker.mean[0]
+    tracker.state[1] = _LOST
+    tracker.start_frame[:] = [3, 1]
+    tracker._remove_duplicates()
+    assert tracker.track_id.tolist() == [2]
+
+    # The other way round: the lost duplicate is the younger one and is dropped
+    tracker = ByteTracker(frame_rate=30)
+    for _ in range(4):
+        tracker.update(dets([box(100), box(400)]))
+    tracker.mean[1] = tracker.mean[0]
+    tracker.state[1] = _LOST
+    tracker.start_frame[:] = [1, 3]
+    tracker._remove_duplicates()
+    assert tracker.track_id.tolist() == [1]
@@ -0,0 +1,81 @@
+"""
+Latest-frame grabber for live cameras.
+
+OpenCV/V4L2 keep a queue of frames behind the device; reading only when the
+pipeline is ready means detecting on frames that are already stale. The
+grabber thread drains the device continuously and keeps just the newest frame
+(with the time it was grabbed), so consumers always get the freshest one.
+Frames overwritten before anyone read them are counted as dropped.
+"""
+import threading
+import time
+
+import cv2
+
+
+class LatestFrameGrabber:
+    def __init__(self, cap):
+        self.cap = cap
+        # Ask the driver for the smallest queue it supports (ignored by some backends)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._cond = threading.Condition()
+        self._frame = None
+        self._video_timestamp = 0.0
+        self._capture_time = 0.0
+        self._seq = 0
+        self._read_seq = 0
+        self._ended = False
+        self._stop = threading.Event()
+        self.grabbed = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name="frame-grabber", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            ret, frame = self.cap.read()
+            capture_time = time.monotonic()
+            if not ret:
+                break
+            video_timestamp = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            with self._cond:
+                if self._seq > self._read_seq:
+                    self.dropped += 1   # previous frame was never consumed
+                self._frame = frame
+                self._video_timestamp = video_timestamp
+                self._capture_time = capture_time
+                self._seq += 1
+                self.grabbed += 1
+                self._cond.notify_all()
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+
+    def read(self, timeout=0.5):
+        """
+        Wait for a frame newer than the last one returned.
+        Returns (ok, frame, video_timestamp, capture_time); ok is False once the
+        device stops delivering, and frame is None on timeout.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > self._read_seq or self._ended, timeout=timeout)
+            if self._seq == self._read_seq:
+                return not self._ended, None, None, None
+            self._read_seq = self._seq
+            self.delivered += 1
+            return True, self._frame, self._video_timestamp, self._capture_time
+
+    def stop(self, timeout=2):
+        self._stop.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=timeout)
+
+    def summary(self):
+        if self.grabbed == 0:
+            return "Frame grabber: no frames grabbed"
+        ratio = 100.0 * self.dropped / self.grabbed
+        return (f"Frame grabber: {self.grabbed} grabbed, {self.delivered} processed, "
+                f"{self.dropped} dropped as stale ({ratio:.1f}%)")
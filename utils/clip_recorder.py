@@ -0,0 +1,181 @@
+"""
+Alert clips: a pre/post-event ring buffer of rendered frames.
+
+Rendered frames are JPEG-compressed into an in-memory ring holding the last
+CLIP_PRE_SECONDS (capped at CLIP_MEMORY_BUDGET_MB). When the alert state
+machine enters CONFLICT or ABANDONED, trigger() opens a clip with the ring's
+pre-event frames; frames keep being appended until CLIP_POST_SECONDS after
+the event (a new alert inside that window extends the clip), and the clip is
+then decoded and encoded to CLIP_DIR on a background thread.
+
+add() and trigger() only enqueue: compression, ring bookkeeping and clip
+writing all happen on the recorder's threads, in the order the calls were
+made. Timestamps are the results' clock_time (video time offline, capture
+time live). Seek generations only grow: a newer one closes the open clip and
+empties the ring, and frames still arriving from an older one are ignored.
+"""
+import os
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+import config
+from utils.video_writer import AsyncVideoWriter
+
+_FRAME_SLOTS = 8
+
+
+class _Clip:
+    def __init__(self, kind, event_time, frames, post_seconds):
+        self.kind = kind
+        self.event_time = event_time
+        self.end = event_time + post_seconds
+        self.frames = list(frames)   # (timestamp, jpeg bytes)
+        self.created = datetime.now()
+
+
+class AlertClipRecorder:
+    def __init__(self, out_dir=None, pre_seconds=None, post_seconds=None, budget_mb=None, quality=None):
+        self.out_dir = out_dir or config.CLIP_DIR
+        self.pre_seconds = config.CLIP_PRE_SECONDS if pre_seconds is None else pre_seconds
+        self.post_seconds = config.CLIP_POST_SECONDS if post_seconds is None else post_seconds
+        self.budget = int((budget_mb or config.CLIP_MEMORY_BUDGET_MB) * 1024 * 1024)
+        self.quality = quality or config.CLIP_JPEG_QUALITY
+        os.makedirs(self.out_dir, exist_ok=True)
+
+        self._free = queue.Queue()       # preallocated frame slots, created on the first frame
+        self._shape = None
+        self._messages = queue.Queue()   # ("frame", slot, ts, gen) / ("trigger", kind, ts, gen) / None
+        self._clips_out = queue.Queue()  # finished _Clip objects for the writer thread (None = end)
+        self._ring = deque()             # (timestamp, jpeg bytes), oldest first
+        self._ring_bytes = 0
+        self._generation = 0
+        self._active = None              # clip still collecting post-event frames
+        self.dropped = 0
+        self.evicted = 0                 # frames pushed out of the ring by the memory budget
+        self.clips = []                  # paths of written clips
+        self._threads = [threading.Thread(target=self._run, name="clip-buffer", daemon=True),
+                         threading.Thread(target=self._write_clips, name="clip-writer", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    # ── Callers (render thread / display loop) ──────────────────────────────
+
+    def add(self, frame, timestamp, generation=0):
+        """Queue a rendered frame (copied); returns False if it was dropped."""
+        if self._shape is None:
+            self._shape = frame.shape
+            for _ in range(_FRAME_SLOTS):
+                self._free.put(np.empty(frame.shape, dtype=np.uint8))
+        if frame.shape != self._shape:
+            return False
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        np.copyto(slot, frame)
+        self._messages.put(("frame", slot, timestamp, generation))
+        return True
+
+    def trigger(self, kind, timestamp, generation=0):
+        """An alert of `kind` started at `timestamp`: clip the seconds around it."""
+        self._messages.put(("trigger", kind, timestamp, generation))
+
+    def close(self):
+        """Finish the open clip with the frames it has and write every pending clip."""
+        self._messages.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    # ── Ring buffer (clip-buffer thread) ────────────────────────────────────
+
+    def _finish_active(self):
+        if self._active is not None:
+            self._clips_out.put(self._active)
+            self._active = None
+
+    def _current(self, generation):
+        """False for messages from before the latest seek."""
+        if generation > self._generation:
+            # Seek: the buffered frames belong to another part of the timeline
+            self._generation = generation
+            self._finish_active()
+            self._ring.clear()
+            self._ring_bytes = 0
+        return generation == self._generation
+
+    def _on_frame(self, slot, timestamp, generation):
+        if not self._current(generation):
+            self._free.put(slot)
+            return
+        ok, jpeg = cv2.imencode(".jpg", slot, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        self._free.put(slot)
+        if not ok:
+            return
+        jpeg = jpeg.tobytes()
+
+        if self._active is not None:
+            if timestamp > self._active.end:
+                self._finish_active()
+            elif not self._active.frames or timestamp >= self._active.frames[-1][0]:
+                self._active.frames.append((timestamp, jpeg))
+
+        self._ring.append((timestamp, jpeg))
+        self._ring_bytes += len(jpeg)
+        while self._ring and (self._ring[0][0] < timestamp - self.pre_seconds or self._ring_bytes > self.budget):
+            if self._ring[0][0] >= timestamp - self.pre_seconds:
+                self.evicted += 1
+            self._ring_bytes -= len(self._ring.popleft()[1])
+
+    def _on_trigger(self, kind, timestamp, generation):
+        if not self._current(generation):
+            return
+        if self._active is not None and timestamp <= self._active.end:
+            # Another alert while the clip is still recording: extend it
+            self._active.end = max(self._active.end, timestamp + self.post_seconds)
+            return
+        self._finish_active()
+        frames = [(ts, jpeg) for ts, jpeg in self._ring if timestamp - self.pre_seconds <= ts <= timestamp]
+        self._active = _Clip(kind, timestamp, frames, self.post_seconds)
+
+    def _run(self):
+        while True:
+            message = self._messages.get()
+            if message is None:
+                break
+            if message[0] == "frame":
+                self._on_frame(*message[1:])
+            else:
+                self._on_trigger(*message[1:])
+        self._finish_active()
+        self._clips_out.put(None)
+
+    # ── Clip encoding (clip-writer thread) ──────────────────────────────────
+
+    def _write_clips(self):
+        while True:
+            clip = self._clips_out.get()
+            if clip is None:
+                break
+            if len(clip.frames) < 2:
+                continue
+            # Rendered frames are not evenly spaced (skip-under-load), so derive the rate
+            span = clip.frames[-1][0] - clip.frames[0][0]
+            fps = min(max((len(clip.frames) - 1) / span, 1.0), 60.0) if span > 0 else 30.0
+            path = os.path.join(self.out_dir, f"{clip.kind}_{clip.created.strftime('%Y%m%d_%H%M%S_%f')}.mkv")
+            writer = AsyncVideoWriter(path, fps, block=True)
+            for _, jpeg in clip.frames:
+                writer.write(cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR))
+            writer.close()
+            self.clips.append(path)
+            print(f"[Clip] {clip.kind}: {len(clip.frames)} frames, {span:.1f}s → {path}")
+
+    def summary(self):
+        return (f"Alert clips: {len(self.clips)} written to {self.out_dir} | "
+                f"{self.dropped} frames dropped (buffer busy), {self.evicted} evicted by the "
+                f"{self.budget / (1024 * 1024):.0f} MB budget")
@@ -0,0 +1,37 @@
+"""
+Clocks for the behavior detectors and the event logger.
+
+Time thresholds (loitering, abandonment, conflict duration, alert cooldown)
+must be measured on the timeline of the footage, not on the wall clock of the
+machine analyzing it — otherwise a video processed at 4x real time needs 4x
+as long to look "abandoned". Detectors read `clock.now()`; whoever feeds them
+frames sets a VideoClock to the frame's timestamp.
+"""
+import time
+
+
+class SystemClock:
+    """Wall clock; the default when no clock is injected."""
+
+    def now(self):
+        return time.time()
+
+    def set(self, timestamp):
+        pass
+
+
+class VideoClock:
+    """
+    Clock driven by the frames being analyzed: the video timestamp for files,
+    the capture timestamp for live feeds. Falls back to the wall clock until
+    the first frame sets it.
+    """
+
+    def __init__(self, timestamp=None):
+        self._now = timestamp
+
+    def now(self):
+        return self._now if self._now is not None else time.time()
+
+    def set(self, timestamp):
+        self._now = timestamp
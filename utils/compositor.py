@@ -0,0 +1,125 @@
+"""
+Display compositor: annotated frame + threat side panel on one reused canvas.
+
+The canvas, the banner color block and the resize targets are allocated once
+per frame size instead of on every displayed frame. The static panel chrome
+(background, title, separator, section header) is rendered once into a layer
+that is copied in per frame. Only the dynamic parts (threat list, event
+timeline, controls line over the video) are drawn each frame, and the alert
+banner is blended into its own strip only.
+
+Arrays returned by begin(), display_frame() and export_frame() are reused:
+they are only valid until the next begin().
+"""
+import cv2
+import numpy as np
+
+PANEL_WIDTH = 350
+PANEL_BACKGROUND = (30, 30, 30)
+BANNER_HEIGHT = 80
+_MARGIN = 15
+
+
+class Compositor:
+    def __init__(self, controls_text, panel_width=PANEL_WIDTH):
+        self.controls_text = controls_text
+        self.panel_width = panel_width
+        self._shape = None
+
+    # ── Buffers (rebuilt only when the frame size changes) ──────────────────
+
+    def _allocate(self, h, w):
+        self._shape = (h, w)
+        self.canvas = np.empty((h, w + self.panel_width, 3), dtype=np.uint8)
+        self.frame = self.canvas[:, :w]
+        self.panel = self.canvas[:, w:]
+        self._display = None
+        self._export = None
+
+        # Static panel chrome
+        self._chrome = np.empty((h, self.panel_width, 3), dtype=np.uint8)
+        self._chrome[:] = PANEL_BACKGROUND
+        cv2.putText(self._chrome, "THREAT ANALYSIS", (_MARGIN, 35),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+        cv2.line(self._chrome, (_MARGIN, 45), (self.panel_width - _MARGIN, 45), (100, 100, 100), 1)
+        cv2.putText(self._chrome, "ACTIVE THREATS:", (_MARGIN, 75),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
+
+        # Banner color block, blended into the top strip of the frame
+        rows = min(BANNER_HEIGHT + 1, h)
+        self._banner_color = np.empty((rows, w, 3), dtype=np.uint8)
+        self._banner_color[:] = (0, 0, 255)
+
+    # ── Per-frame composition ───────────────────────────────────────────────
+
+    def begin(self, frame):
+        """Copy `frame` into the canvas; returns the canvas region to annotate in place."""
+        h, w = frame.shape[:2]
+        if self._shape != (h, w):
+            self._allocate(h, w)
+        self.frame[:] = frame
+        return self.frame
+
+    def draw_banner(self, text):
+        """Blend the red alert banner into the top strip and write `text` over it."""
+        roi = self.frame[:len(self._banner_color)]
+        cv2.addWeighted(self._banner_color, 0.6, roi, 0.4, 0, roi)
+        cv2.putText(self.frame, text, (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3)
+
+    def draw_panel(self, threats, timeline):
+        """
+        Side panel contents. threats: (pid, level, score, session_total) rows;
+        timeline: EventLogger.timeline entries (the last three are shown).
+        """
+        self.panel[:] = self._chrome
+        canvas = self.canvas
+        panel_x = self._shape[1]
+        x = panel_x + _MARGIN
+        y_offset = 100
+
+        for pid, level, score, session_total in threats:
+            color = (0, 255, 0)
+            if level == "SUSPICIOUS":
+                color = (0, 165, 255)
+            elif level == "HIGH":
+                color = (0, 0, 255)
+
+            cv2.putText(canvas, f"ID {pid}:", (x + 10, y_offset),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.55, (200, 200, 200), 1)
+            cv2.putText(canvas, level, (x + 70, y_offset),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.55, color, 2)
+            cv2.putText(canvas, f"({score})", (x + 185, y_offset),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (180, 180, 180), 1)
+            y_offset += 22
+            cv2.putText(canvas, f"  Session Total: {session_total}", (x + 10, y_offset),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.45, (150, 150, 150), 1)
+            y_offset += 28
+
+        if timeline:
+            y_offset = max(y_offset + 20, self._shape[0] - 150)
+            cv2.putText(canvas, "EVENT TIMELINE:", (x, y_offset),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
+            y_offset += 25
+            for _, msg in timeline[-3:]:
+                display_msg = msg[:30] + "..." if len(msg) > 30 else msg
+                cv2.putText(canvas, f"• {display_msg}", (x + 5, y_offset),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+                y_offset += 20
+
+        # Over the video itself (anti-aliased against it), so not part of the cached chrome
+        cv2.putText(canvas, self.controls_text, (_MARGIN, self._shape[0] - 15),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (180, 180, 180), 1)
+
+    def display_frame(self, scale):
+        """The canvas scaled by `scale` for imshow (the canvas itself at 1.0)."""
+        if scale == 1.0:
+            return self.canvas
+        self._display = cv2.resize(self.canvas, None, dst=self._display, fx=scale, fy=scale)
+        return self._display
+
+    def export_frame(self, width, height):
+        """The canvas at `width`×`height` for the video writer."""
+        if self.canvas.shape[1] == width and self.canvas.shape[0] == height:
+            return self.canvas
+        self._export = cv2.resize(self.canvas, (width, height), dst=self._export)
+        return self._export
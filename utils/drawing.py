@@ -105,11 +105,11 @@ def draw_keypoints(frame, obj, all_persons=None):
         return max(15.0, (y2 - y1) * 0.12)
 
     # ── Active signal state for this person ──
-    active_signals = obj.get("_signals", [])
+    active_signals = obj.get("_signals")   # PoseSignals; labels are only built when iterated
     rel_wrist_vel  = obj.get("_rel_wrist_vel", 0.0)
-    arm_raised     = any("ARM RAISED"   in s for s in active_signals)
-    strike_self    = any("STRIKE ZONE"  in s for s in active_signals)
-    suppressed     = any("SUPPRESS"     in s for s in active_signals)
+    arm_raised     = active_signals is not None and active_signals.has("arm_raised")
+    strike_self    = active_signals is not None and active_signals.has("strike")
+    suppressed     = active_signals is not None and active_signals.has("suppress")
 
     # ── Collect nose positions of all OTHER persons for strike-zone check ──
     other_noses = []
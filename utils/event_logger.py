@@ -1,18 +1,18 @@
-import time
+from utils.clock import SystemClock
 
 
 class EventLogger:
-    def __init__(self):
+    def __init__(self, clock=None):
+        # Cooldowns and timeline entries follow the injected clock (video time in replays)
+        self.clock = clock if clock is not None else SystemClock()
         self.last_events = {}
         self.timeline = []
 
     def log(self, event_type, message, cooldown=5):
-        current_time = time.time()
+        current_time = self.clock.now()
 
-        if event_type not in self.last_events:
-            self.last_events[event_type] = 0
-
-        if current_time - self.last_events[event_type] > cooldown:
+        last_time = self.last_events.get(event_type)
+        if last_time is None or current_time - last_time > cooldown:
             print(f"[ALERT] {message}")
             self.last_events[event_type] = current_time
             self.timeline.append((current_time, message))
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 
 def get_center(bbox):
@@ -7,4 +8,70 @@ def get_center(bbox):
 
 
 def distance(p1, p2):
-    return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
\ No newline at end of file
+    return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
+
+def box_iou(a, b):
+    """IoU matrix between (N, 4) and (M, 4) xyxy box arrays → (N, M)."""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-7)
+
+
+_GRID_STRIDE = 1 << 32   # packs (cell_x, cell_y) into one sortable int64 key
+
+
+class PointGrid:
+    """
+    Uniform grid over a frame's 2-D points for fixed-radius queries.
+
+    Built once per frame (one sort); a query only looks at the 3x3 cells
+    around it, so the cost follows the local crowd density instead of the
+    total number of points. All queries of a call are answered together.
+    """
+
+    def __init__(self, points, radius):
+        self.radius = float(radius)
+        self.cell = max(self.radius, 1.0)
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        keys = self._keys(np.floor(points / self.cell).astype(np.int64))
+        order = np.argsort(keys, kind="stable")
+        self._sorted_keys = keys[order]
+        self._points = points[order]
+
+    @staticmethod
+    def _keys(cells):
+        return cells[:, 0] * _GRID_STRIDE + cells[:, 1]
+
+    def nearest_distance(self, queries):
+        """
+        Distance from each (M, 2) query point to its nearest grid point, or
+        inf when no point lies within `radius` → (M,) float64.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, 2)
+        nearest = np.full(len(queries), np.inf)
+        if not len(queries) or not len(self._points):
+            return nearest
+
+        cells = np.floor(queries / self.cell).astype(np.int64)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                keys = self._keys(cells + (dx, dy))
+                lo = np.searchsorted(self._sorted_keys, keys, side="left")
+                counts = np.searchsorted(self._sorted_keys, keys, side="right") - lo
+                total = counts.sum()
+                if not total:
+                    continue
+                # Expand each query's [lo, lo + count) run of points
+                query_idx = np.repeat(np.arange(len(queries)), counts)
+                starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+                point_idx = starts + np.arange(total)
+                delta = (queries[query_idx] - self._points[point_idx]).astype(np.float64)
+                np.minimum.at(nearest, query_idx, np.hypot(delta[:, 0], delta[:, 1]))
+
+        nearest[nearest > self.radius] = np.inf
+        return nearest
@@ -0,0 +1,174 @@
+"""
+Minimal staged pipeline: one worker thread per stage, bounded queues between
+stages, per-queue drop policy and per-stage timing.
+
+Drop policies (what a full output queue does with a new item):
+  "block"        — producer waits (backpressure propagates upstream)
+  "drop_oldest"  — evict the oldest queued item (consumer always gets the freshest)
+  "drop_newest"  — discard the new item
+"""
+import queue
+import threading
+import time
+
+END = object()  # end-of-stream marker, forwarded through every stage
+
+DROP_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+
+class StageQueue:
+    def __init__(self, maxsize, drop_policy="block", name=""):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Invalid drop policy: {drop_policy}")
+        self.name = name
+        self.drop_policy = drop_policy
+        self._q = queue.Queue(maxsize=maxsize)
+        self.put_count = 0
+        self.dropped = 0
+        self.blocked_time = 0.0   # seconds producers spent waiting on a full queue
+
+    def put(self, item, stop_event=None):
+        """Returns False if the item was dropped (or the pipeline stopped while waiting)."""
+        # END is never dropped, whatever the policy
+        if item is END or self.drop_policy == "block":
+            start = time.perf_counter()
+            while True:
+                try:
+                    self._q.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    if stop_event is not None and stop_event.is_set():
+                        return False
+            self.blocked_time += time.perf_counter() - start
+
+        elif self.drop_policy == "drop_newest":
+            try:
+                self._q.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+                return False
+
+        else:  # drop_oldest
+            while True:
+                try:
+                    self._q.put_nowait(item)
+                    break
+                except queue.Full:
+                    try:
+                        self._q.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+        self.put_count += 1
+        return True
+
+    def get(self, timeout=None):
+        return self._q.get(timeout=timeout)
+
+    def get_nowait(self):
+        return self._q.get_nowait()
+
+    def clear(self):
+        while True:
+            try:
+                self._q.get_nowait()
+            except queue.Empty:
+                break
+
+    def qsize(self):
+        return self._q.qsize()
+
+
+class Stage:
+    """
+    Worker thread calling `fn` on every item of `in_queue` and putting the
+    return value on `out_queue` (None = nothing to forward). A source stage
+    has no input queue; `fn()` is called repeatedly and returns END when done.
+    Only forwarded items count as processed and busy time; None returns (a
+    capture timeout, a stale packet) are counted as `empty`.
+    """
+
+    def __init__(self, name, fn, in_queue, out_queue, stop_event):
+        self.name = name
+        self.fn = fn
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.processed = 0
+        self.empty = 0
+        self.busy_time = 0.0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name=f"stage-{name}", daemon=True)
+
+    def _run(self):
+        try:
+            while not self.stop_event.is_set():
+                if self.in_queue is None:
+                    start = time.perf_counter()
+                    item = self.fn()
+                else:
+                    try:
+                        item = self.in_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if item is END:
+                        break
+                    start = time.perf_counter()
+                    item = self.fn(item)
+
+                if item is END:
+                    break
+                if item is None:
+                    self.empty += 1
+                    continue
+                self.busy_time += time.perf_counter() - start
+                self.processed += 1
+                self.out_queue.put(item, self.stop_event)
+        except Exception as e:
+            self.error = e
+            print(f"[Pipeline Error] stage '{self.name}': {e!r}")
+            self.stop_event.set()
+        finally:
+            # Not delivered if the pipeline was stopped — consumers check stop_event too
+            self.out_queue.put(END, self.stop_event)
+
+
+class Pipeline:
+    def __init__(self, stop_event=None):
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.stages = []
+        self.queues = []
+
+    def add_stage(self, name, fn, queue_size, drop_policy="block"):
+        """Append a stage; the first stage added is the source. Returns its output queue."""
+        in_queue = self.queues[-1] if self.queues else None
+        out_queue = StageQueue(queue_size, drop_policy, name=name)
+        self.stages.append(Stage(name, fn, in_queue, out_queue, self.stop_event))
+        self.queues.append(out_queue)
+        return out_queue
+
+    @property
+    def output(self):
+        return self.queues[-1]
+
+    def start(self):
+        for stage in self.stages:
+            stage.thread.start()
+
+    def stop(self, timeout=2):
+        self.stop_event.set()
+        for stage in self.stages:
+            stage.thread.join(timeout=timeout)
+
+    def summary(self):
+        lines = ["Pipeline stages:"]
+        for stage, q in zip(self.stages, self.queues):
+            avg_ms = 1000.0 * stage.busy_time / stage.processed if stage.processed else 0.0
+            empty = f" ({stage.empty} empty)" if stage.empty else ""
+            lines.append(
+                f"  {stage.name:<10} {stage.processed:>7} items{empty} | {avg_ms:6.1f} ms/item | "
+                f"out queue: {q.dropped} dropped ({q.drop_policy}), "
+                f"{q.blocked_time:.1f}s blocked"
+            )
+        return "\n".join(lines)
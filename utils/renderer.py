@@ -0,0 +1,120 @@
+"""
+Render thread for the GUI display loop.
+
+The display loop runs the alert state machine for every analysis result and
+submits it here. Composition (boxes, skeletons, side panel, video export) runs
+on this thread, at most RENDER_TARGET_FPS times a second. With
+RENDER_SKIP_UNDER_LOAD a newer result replaces one that has not been rendered
+yet, so a slow GUI never holds back analysis; without it every result is
+rendered and the display loop waits when the renderer falls behind.
+
+imshow/waitKey stay on the main thread (HighGUI wants the thread that owns the
+window): it only shows the newest finished frame and polls the keyboard.
+Finished frames are triple-buffered — the thread draws into the back buffer,
+the newest finished one waits as "ready", the main thread shows the "front"
+one — so a buffer is never drawn into while it is on screen.
+"""
+import threading
+import time
+from collections import deque
+
+import config
+
+
+class Renderer:
+    def __init__(self, render_fn, make_buffer, target_fps=None, skip_under_load=None):
+        """
+        render_fn(job, buffer) draws one job and returns the frame to show, an
+        array owned by `buffer`; make_buffer() builds one buffer (e.g. a Compositor).
+        """
+        self.render_fn = render_fn
+        self.target_fps = config.RENDER_TARGET_FPS if target_fps is None else target_fps
+        self.skip_under_load = config.RENDER_SKIP_UNDER_LOAD if skip_under_load is None else skip_under_load
+        self._interval = 1.0 / self.target_fps if self.target_fps > 0 else 0.0
+
+        self._back, self._ready, self._front = make_buffer(), make_buffer(), make_buffer()
+        self._ready_frame = None
+        self._ready_seq = 0
+        self._shown_seq = 0
+
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._closing = False
+        self.error = None
+        self.submitted = 0
+        self.rendered = 0
+        self.skipped = 0
+        self.shown = 0
+        self.busy_time = 0.0
+        self._thread = threading.Thread(target=self._run, name="renderer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, job):
+        with self._cond:
+            if self.skip_under_load:
+                self.skipped += len(self._pending)
+                self._pending.clear()
+            else:
+                while len(self._pending) >= 2 and self.error is None:
+                    self._cond.wait(0.1)
+            self._pending.append(job)
+            self.submitted += 1
+            self._cond.notify_all()
+
+    def latest(self):
+        """Newest finished frame not shown yet, else None. Valid until the next call."""
+        with self._cond:
+            if self._ready_seq == self._shown_seq:
+                return None
+            self._front, self._ready = self._ready, self._front
+            self._shown_seq = self._ready_seq
+            self.shown += 1
+            return self._ready_frame
+
+    def _run(self):
+        next_due = 0.0
+        while True:
+            delay = next_due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)   # target frame rate; newer jobs may replace the pending one meanwhile
+
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                job = self._pending.popleft()
+                self._cond.notify_all()
+
+            start = time.monotonic()
+            next_due = start + self._interval
+            try:
+                frame = self.render_fn(job, self._back)
+            except Exception as e:
+                print(f"[Render Error] {e!r}")
+                with self._cond:
+                    self.error = e
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self._back, self._ready = self._ready, self._back
+                self._ready_frame = frame
+                self._ready_seq += 1
+                self.rendered += 1
+                self.busy_time += time.monotonic() - start
+
+    def close(self, timeout=5):
+        """Render whatever is still pending, then stop the thread."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def summary(self):
+        avg_ms = 1000.0 * self.busy_time / self.rendered if self.rendered else 0.0
+        mode = "skip under load" if self.skip_under_load else "render every result"
+        return (f"Display: {self.submitted} results produced | {self.rendered} rendered "
+                f"({avg_ms:.1f} ms/frame, {self.skipped} skipped, {mode}) | {self.shown} shown")
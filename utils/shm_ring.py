@@ -0,0 +1,54 @@
+"""
+Fixed-size ring of preallocated frame slots in shared memory.
+
+The coordinator writes a frame into a free slot and sends only the slot
+index to a worker process, which reads the pixels in place — nothing is
+pickled. Slot bookkeeping (acquire/release) lives in the owning process;
+workers only attach() and read.
+"""
+import queue
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedFrameRing:
+    def __init__(self, slots, shape, name=None, create=True):
+        self.slots = slots
+        self.shape = tuple(shape)
+        nbytes = slots * int(np.prod(self.shape))
+        self._owner = create
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=nbytes if create else 0)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        self._free = queue.Queue()
+        if create:
+            for i in range(slots):
+                self._free.put(i)
+
+    @classmethod
+    def attach(cls, name, slots, shape):
+        """Open an existing ring from another process (read side)."""
+        return cls(slots, shape, name=name, create=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def acquire(self, timeout=None):
+        """Reserve a free slot; blocks when every slot is in flight (backpressure)."""
+        return self._free.get(timeout=timeout)
+
+    def write(self, slot, frame):
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match ring slot shape {self.shape}")
+        np.copyto(self.frames[slot], frame)
+
+    def release(self, slot):
+        self._free.put(slot)
+
+    def close(self):
+        # Drop the NumPy view before closing, or the buffer stays exported
+        self.frames = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
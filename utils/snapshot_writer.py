@@ -0,0 +1,142 @@
+"""
+Background snapshot writer for SAVE_FRAMES.
+
+submit() runs on the render thread and stays cheap: it applies a per-track
+rate limit (SNAPSHOT_TRACK_INTERVAL), drops near-duplicates of recent
+snapshots by difference hash (dHash: 64 bits from a 9×8 grayscale thumbnail,
+duplicates are within SNAPSHOT_HASH_DISTANCE bits), then copies the frame into
+a free slot of a bounded pool. SNAPSHOT_WORKERS threads drain the queue in
+batches of up to SNAPSHOT_BATCH_SIZE, JPEG-encode and write them under
+<root>/YYYY-MM-DD/. When every slot is taken the snapshot is dropped.
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+import config
+
+_RECENT_HASHES = 16
+
+
+def dhash(frame):
+    """64-bit difference hash: brightness gradients of a 9×8 grayscale thumbnail."""
+    small = cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = (gray[:, 1:] > gray[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+class SnapshotWriter:
+    def __init__(self, root, workers=None, queue_size=None, track_interval=None, hash_distance=None,
+                 batch_size=None, quality=None):
+        self.root = root
+        self.track_interval = config.SNAPSHOT_TRACK_INTERVAL if track_interval is None else track_interval
+        self.hash_distance = config.SNAPSHOT_HASH_DISTANCE if hash_distance is None else hash_distance
+        self.batch_size = batch_size or config.SNAPSHOT_BATCH_SIZE
+        self.quality = quality or config.SNAPSHOT_JPEG_QUALITY
+        self.queue_size = queue_size or config.SNAPSHOT_QUEUE_SIZE
+
+        self._free = queue.Queue()       # preallocated frame slots, created on the first snapshot
+        self._shape = None
+        self._jobs = queue.Queue()       # (slot, filename stem, wall time, slot pool) / None
+        self._last_saved = {}            # track id -> monotonic time of its last snapshot
+        self._recent = deque(maxlen=_RECENT_HASHES)
+        self._dirs = set()
+        self._lock = threading.Lock()    # written counter, shared by the workers
+        self.written = 0
+        self.rate_limited = 0
+        self.duplicates = 0
+        self.dropped = 0
+        self._threads = [threading.Thread(target=self._run, name=f"snapshot-writer-{i}", daemon=True)
+                         for i in range(workers or config.SNAPSHOT_WORKERS)]
+        for thread in self._threads:
+            thread.start()
+
+    # ── Producer side (render thread) ───────────────────────────────────────
+
+    def submit(self, frame, track_ids, labels):
+        """Queue a snapshot of `frame` for `track_ids`; returns False if it was skipped."""
+        now = time.monotonic()
+        due = [tid for tid in track_ids if now - self._last_saved.get(tid, -np.inf) >= self.track_interval]
+        if not due:
+            self.rate_limited += 1
+            return False
+
+        frame_hash = dhash(frame)
+        if any(bin(frame_hash ^ h).count("1") <= self.hash_distance for h in self._recent):
+            self.duplicates += 1
+            return False
+
+        if self._shape != frame.shape:
+            # First snapshot (or a new frame size): (re)build the slot pool
+            self._shape = frame.shape
+            self._free = queue.Queue()
+            for _ in range(self.queue_size):
+                self._free.put(np.empty(frame.shape, dtype=np.uint8))
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        np.copyto(slot, frame)
+
+        for tid in due:
+            self._last_saved[tid] = now
+        self._recent.append(frame_hash)
+        self._jobs.put((slot, f"detected_{'_'.join(labels)}", datetime.now(), self._free))
+        return True
+
+    def close(self):
+        """Write every queued snapshot, then stop the workers."""
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    # ── Workers ─────────────────────────────────────────────────────────────
+
+    def _next_batch(self):
+        batch = [self._jobs.get()]
+        while batch[-1] is not None and len(batch) < self.batch_size:
+            try:
+                batch.append(self._jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            done = batch[-1] is None
+            if done:
+                batch.pop()
+            for slot, stem, stamp, pool in batch:
+                day_dir = os.path.join(self.root, stamp.strftime("%Y-%m-%d"))
+                if day_dir not in self._dirs:
+                    os.makedirs(day_dir, exist_ok=True)
+                    self._dirs.add(day_dir)
+                ok, jpeg = cv2.imencode(".jpg", slot, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                pool.put(slot)
+                if not ok:
+                    continue
+                path = os.path.join(day_dir, f"{stem}_{stamp.strftime('%Y%m%d_%H%M%S_%f')}.jpg")
+                try:
+                    with open(path, "wb") as f:
+                        f.write(jpeg.tobytes())
+                except OSError as e:
+                    print(f"[Snapshot Error] {path}: {e!r}")
+                    continue
+                with self._lock:
+                    self.written += 1
+            if done:
+                return
+
+    def summary(self):
+        return (f"Snapshots: {self.written} written to {self.root}/<date>/ | {self.rate_limited} rate-limited, "
+                f"{self.duplicates} near-duplicates, {self.dropped} dropped (queue full)")
@@ -0,0 +1,157 @@
+"""
+Background video export.
+
+The render thread hands each composed frame to write(), which only copies it
+into a free slot of a small preallocated frame pool and returns; encoding and
+disk I/O happen on the writer thread. Two encoders:
+
+  "ffmpeg" — raw BGR frames piped into an ffmpeg subprocess (libx264 with
+             VIDEO_EXPORT_PRESET / VIDEO_EXPORT_CRF); encoding runs in another
+             process, off the GIL entirely
+  "opencv" — cv2.VideoWriter (X264, falling back to MJPG) on the writer thread
+
+"auto" uses ffmpeg when it is on PATH. The file is opened on the first frame
+at that frame's size. When every slot is taken (the encoder is behind) a frame
+is dropped, or with VIDEO_EXPORT_BLOCK the caller waits for a slot; both are
+counted in summary().
+"""
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import config
+
+
+class AsyncVideoWriter:
+    def __init__(self, path, fps, backend=None, queue_size=None, block=None, preset=None, crf=None):
+        self.path = path
+        self.fps = fps
+        backend = backend or config.VIDEO_EXPORT_BACKEND
+        if backend == "auto":
+            backend = "ffmpeg" if shutil.which("ffmpeg") else "opencv"
+        if backend not in ("ffmpeg", "opencv"):
+            raise ValueError(f"Unknown video export backend: {backend}")
+        self.backend = backend
+        self.queue_size = queue_size or config.VIDEO_EXPORT_QUEUE_SIZE
+        self.block = config.VIDEO_EXPORT_BLOCK if block is None else block
+        self.preset = preset or config.VIDEO_EXPORT_PRESET
+        self.crf = config.VIDEO_EXPORT_CRF if crf is None else crf
+
+        self._free = queue.Queue()      # preallocated frame slots, created on the first frame
+        self._frames = queue.Queue()    # filled slots waiting for the encoder (None = end)
+        self._shape = None
+        self._encoder = None            # cv2.VideoWriter or ffmpeg Popen
+        self._failed = False
+        self.written = 0
+        self.dropped = 0
+        self.blocked_time = 0.0
+        self.encode_time = 0.0
+        self._thread = threading.Thread(target=self._run, name="video-writer", daemon=True)
+        self._thread.start()
+
+    # ── Producer side (render thread) ───────────────────────────────────────
+
+    def write(self, frame):
+        """Queue a copy of `frame`; returns False if it was dropped."""
+        if self._failed:
+            self.dropped += 1
+            return False
+        if self._shape is None:
+            self._shape = frame.shape
+            for _ in range(self.queue_size):
+                self._free.put(np.empty(frame.shape, dtype=np.uint8))
+        elif frame.shape != self._shape:
+            frame = cv2.resize(frame, (self._shape[1], self._shape[0]))
+
+        try:
+            if self.block:
+                start = time.monotonic()
+                slot = self._free.get()
+                self.blocked_time += time.monotonic() - start
+            else:
+                slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        np.copyto(slot, frame)
+        self._frames.put(slot)
+        return True
+
+    def close(self):
+        """Encode every queued frame, then finalize the file."""
+        self._frames.put(None)
+        self._thread.join()
+
+    # ── Encoder side (writer thread) ────────────────────────────────────────
+
+    def _open(self, shape):
+        h, w = shape[:2]
+        if self.backend == "ffmpeg":
+            cmd = ["ffmpeg", "-loglevel", "error", "-y",
+                   "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{w}x{h}", "-r", str(self.fps), "-i", "-",
+                   # yuv420p needs even dimensions
+                   "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                   "-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf),
+                   "-pix_fmt", "yuv420p", self.path]
+            return subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+        writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*"X264"), self.fps, (w, h))
+        if not writer.isOpened():
+            # Fallback to MJPEG if H.264 is not available
+            writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*"MJPG"), self.fps, (w, h))
+        if not writer.isOpened():
+            raise RuntimeError("cv2.VideoWriter could not be opened")
+        return writer
+
+    def _encode(self, frame):
+        if self.backend == "ffmpeg":
+            self._encoder.stdin.write(memoryview(frame).cast("B"))
+        else:
+            self._encoder.write(frame)
+
+    def _finalize(self):
+        if self._encoder is None:
+            return
+        if self.backend == "ffmpeg":
+            try:
+                self._encoder.stdin.close()
+            except OSError:
+                pass
+            self._encoder.wait()
+        else:
+            self._encoder.release()
+
+    def _run(self):
+        while True:
+            slot = self._frames.get()
+            if slot is None:
+                break
+            if not self._failed:
+                start = time.monotonic()
+                try:
+                    if self._encoder is None:
+                        self._encoder = self._open(slot.shape)
+                    self._encode(slot)
+                    self.written += 1
+                except (OSError, RuntimeError) as e:
+                    print(f"[Export Error] {self.backend}: {e!r} — video export stopped")
+                    self._failed = True
+                self.encode_time += time.monotonic() - start
+            if self._failed:
+                self.dropped += 1
+            self._free.put(slot)
+        self._finalize()
+
+    def summary(self):
+        avg_ms = 1000.0 * self.encode_time / self.written if self.written else 0.0
+        size_mb = os.path.getsize(self.path) / (1024 * 1024) if os.path.exists(self.path) else 0.0
+        shape = f"{self._shape[1]}x{self._shape[0]}" if self._shape else "-"
+        return (f"Video export ({self.backend}, {shape}): {self.written} frames written, "
+                f"{self.dropped} dropped, {self.blocked_time:.1f}s blocked, "
+                f"{avg_ms:.1f} ms/frame encode | {size_mb:.1f} MB → {self.path}")